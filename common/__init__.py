@@ -9,15 +9,44 @@ Provide application functionality.
 
 import string
 
-from .key_generator import KeyGenerator
+from .key_generator import KeyGenerator, SortableKeyGenerator
 
 __all__ = (
+    'RANDOM_KEYS',
+    'SORTABLE_KEYS',
     'generate_public_key',
+    'generate_public_keys',
     )
 
+PUBLIC_KEY_LENGTH = 20
 
-def generate_public_key():
-    gen = KeyGenerator(length=20)
+# The public_id schemes a model may choose with PUBLIC_ID_SCHEME.
+RANDOM_KEYS = 'random'
+SORTABLE_KEYS = 'sortable'
+_GENERATORS = {
+    RANDOM_KEYS: lambda: KeyGenerator(length=PUBLIC_KEY_LENGTH),
+    SORTABLE_KEYS: SortableKeyGenerator,
+    }
+
+
+def _key_generator(scheme):
+    try:
+        return _GENERATORS[scheme]()
+    except KeyError:
+        raise ValueError(f"Unknown public key scheme {scheme!r}.")
+
+
+def generate_public_key(scheme=RANDOM_KEYS):
+    gen = _key_generator(scheme)
     return gen.generate()
 
 
+def generate_public_keys(count, scheme=RANDOM_KEYS):
+    """
+    Return *count* public keys, for records created in bulk.
+    """
+    gen = _key_generator(scheme)
+    return gen.generate_many(count)
+
+
+
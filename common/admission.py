@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/admission.py
+#
+
+"""
+Admission control: a bounded number of requests of a kind run at once in
+a worker process, the others wait their turn in a FIFO queue.
+
+Queues are declared in the ``ADMISSION_QUEUES`` setting::
+
+    ADMISSION_QUEUES = {
+        'enrollment': {'limit': 8, 'queue_size': 200, 'timeout': 10},
+    }
+
+``limit`` requests run at once, ``queue_size`` more wait at most
+``timeout`` seconds for one of them to finish. A request finding the queue
+full, or still waiting at the timeout, is answered 429 with a Retry-After.
+A name missing from the setting admits every request.
+
+Every admission, rejection and timeout is traced with the queue depth and
+the wait, and ``get_admission_stats`` sums them up per process, served to
+the staff by the ``admission-stats`` endpoint.
+"""
+
+import collections
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import Throttled
+
+from .tracing import Tracer
+
+__all__ = (
+    'AdmissionQueue',
+    'AdmissionRejected',
+    'admit',
+    'get_admission_stats',
+    )
+
+tracer = Tracer(__name__)
+
+
+class AdmissionRejected(Throttled):
+    default_detail = _('Too many requests are in progress.')
+    default_code = 'admission_rejected'
+
+
+class _Waiter:
+    __slots__ = ('event', 'admitted')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.admitted = False
+
+
+class AdmissionQueue:
+    """
+    A semaphore of *limit* slots handed to the waiting threads in their
+    order of arrival. A released slot goes straight to the oldest waiter,
+    a thread arriving meanwhile cannot take it.
+    """
+
+    def __init__(self, name, limit, queue_size=0, timeout=0):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+        self.active = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.released = 0
+
+    def acquire(self):
+        """
+        Take a slot, waiting in line for one, or raise
+        ``AdmissionRejected``.
+        """
+        start = time.perf_counter()
+
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                self._admit(0.0)
+                return
+
+            if len(self._waiters) >= self.queue_size:
+                self.rejected += 1
+                wait = self._retry_after()
+                tracer.count(f'{self.name}.rejected')
+                tracer.event('rejected', queue=self.name,
+                             waiting=len(self._waiters))
+                raise AdmissionRejected(wait)
+
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+            self.max_waiting = max(self.max_waiting, len(self._waiters))
+
+        waiter.event.wait(self.timeout)
+
+        with self._lock:
+            # Handed a slot, maybe as the timeout ran out.
+            if waiter.admitted:
+                self._admit(time.perf_counter() - start)
+                return
+
+            self._waiters.remove(waiter)
+            self.timed_out += 1
+            wait = self._retry_after()
+
+        tracer.count(f'{self.name}.timed_out')
+        tracer.event('timed_out', queue=self.name,
+                     wait_ms=round((time.perf_counter() - start) * 1000, 3))
+        raise AdmissionRejected(wait)
+
+    def release(self, held=0.0):
+        """
+        Give the slot taken by ``acquire`` back, to the oldest waiter if
+        any. *held* is the time it was held, in seconds.
+        """
+        with self._lock:
+            self.hold_total += held
+            self.released += 1
+
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.admitted = True
+                waiter.event.set()
+            else:
+                self.active -= 1
+
+    @contextmanager
+    def admit(self):
+        self.acquire()
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def _admit(self, wait):
+        # Called with the lock held.
+        self.admitted += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        tracer.event('admitted', queue=self.name,
+                     wait_ms=round(wait * 1000, 3),
+                     waiting=len(self._waiters))
+
+    def _retry_after(self):
+        # Called with the lock held: the time the line ahead takes to
+        # drain at the mean hold time so far, at least a second.
+        hold = self.hold_total / self.released if self.released else 1.0
+        return max(math.ceil(hold * (len(self._waiters) + 1) / self.limit),
+                   1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'active': self.active,
+                'waiting': len(self._waiters),
+                'max_waiting': self.max_waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'wait_ms_mean': round(
+                    self.wait_total * 1000 / self.admitted, 3)
+                if self.admitted else 0.0,
+                'wait_ms_max': round(self.wait_max * 1000, 3),
+                }
+
+
+_queues = {}
+_pid = None
+_queues_lock = threading.Lock()
+
+
+def _get_queue(name):
+    global _pid
+
+    config = getattr(settings, 'ADMISSION_QUEUES', {}).get(name)
+
+    if config is None:
+        return None
+
+    with _queues_lock:
+        # Every worker process admits its own requests.
+        if _pid != os.getpid():
+            _queues.clear()
+            _pid = os.getpid()
+
+        queue = _queues.get(name)
+        options = (config['limit'], config.get('queue_size', 0),
+                   config.get('timeout', 0))
+
+        if queue is None or (
+                queue.limit, queue.queue_size, queue.timeout) != options:
+            queue = _queues[name] = AdmissionQueue(name, *options)
+
+    return queue
+
+
+@contextmanager
+def admit(name):
+    """
+    Run the block holding a slot of the admission queue *name*.
+    """
+    queue = _get_queue(name)
+
+    if queue is None:
+        yield
+        return
+
+    with queue.admit():
+        yield
+
+
+def get_admission_stats():
+    """
+    Return the queue depth, wait times and counts of the admission queues
+    of this process, by name.
+    """
+    with _queues_lock:
+        queues = list(_queues.values()) if _pid == os.getpid() else []
+
+    return {queue.name: queue.stats() for queue in queues}
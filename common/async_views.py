@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/async_views.py
+#
+
+"""
+Async read-only API views.
+
+DRF views are synchronous, under ASGI every request to one of them waits
+for a thread. ``AsyncReadView`` answers GET requests on the event loop
+instead: the token is checked against the token cache, the compiled
+permissions run on the user it carries, and the rows are read with the
+async ORM. Django 4.2 still runs each ORM call in a thread, but a request
+only holds one for the call, and a 304 or a rejected request for none.
+
+The responses match those of the DRF list and detail views for JSON
+clients. Only tokens are accepted, see ``CachedTokenAuthentication``.
+"""
+
+import hashlib
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import CachedTokenAuthentication
+from .counting import acount_rows
+from .model_versions import get_model_version
+from .permission_engine import compile_permissions
+
+__all__ = (
+    'AsyncReadView',
+    )
+
+
+class AsyncReadView:
+    """
+    A read-only view running on the event loop. Subclasses set
+    ``queryset``, ``serializer_class`` and ``permission_classes`` and
+    implement ``get``, usually with ``alist`` or ``aretrieve``.
+
+    With ``condition_models`` set, responses carry an ETag made from their
+    versions and a request whose copy is current gets a 304 before any
+    query runs.
+    """
+    queryset = None
+    serializer_class = None
+    permission_classes = ()
+    condition_models = ()
+    lookup_field = 'pk'
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    limit_query_param = 'limit'
+    offset_query_param = 'offset'
+    exact_count_query_param = 'exact_count'
+    max_limit = 1000
+    authentication = CachedTokenAuthentication()
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        async def view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.dispatch(request, *args, **kwargs)
+
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return self.error_response(exceptions.MethodNotAllowed(
+                request.method))
+
+        try:
+            await self.authenticate(request)
+            self.check_permissions(request)
+
+            if self.condition_models:
+                etag = quote_etag(self.get_etag(request))
+                response = get_conditional_response(request, etag=etag)
+
+                if response is None:
+                    response = await self.get(request, *args, **kwargs)
+
+                if response.status_code in (200, 304):
+                    response['ETag'] = etag
+
+                return response
+
+            return await self.get(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(exc)
+
+    async def get(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    async def authenticate(self, request):
+        request.user = AnonymousUser()
+        request.auth = None
+        header = get_authorization_header(request).split()
+
+        if not header or header[0].lower() != b'token':
+            return
+
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed(
+                'Invalid token header. Token string should not contain '
+                'spaces.')
+
+        try:
+            key = header[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                'Invalid token header. Token string should not contain '
+                'invalid characters.')
+
+        request.user, request.auth = (
+            await self.authentication.aauthenticate_credentials(key))
+
+    def check_permissions(self, request):
+        # The user comes with its group names, the checks run no query.
+        permission = compile_permissions(tuple(self.permission_classes))
+
+        if not permission.has_permission(request, self):
+            if request.auth is None:
+                raise exceptions.NotAuthenticated()
+
+            raise exceptions.PermissionDenied()
+
+    def error_response(self, exc):
+        response = self.render(exc.detail
+                               if isinstance(exc.detail, (list, dict))
+                               else {'detail': exc.detail},
+                               status=exc.status_code)
+
+        if isinstance(exc, (exceptions.NotAuthenticated,
+                            exceptions.AuthenticationFailed)):
+            response['WWW-Authenticate'] = (
+                self.authentication.authenticate_header(self.request))
+        elif isinstance(exc, exceptions.MethodNotAllowed):
+            response['Allow'] = 'GET, HEAD'
+
+        return response
+
+    def render(self, data, status=200):
+        return JsonResponse(
+            data, status=status, safe=False, encoder=DjangoJSONEncoder,
+            json_dumps_params={'ensure_ascii': False,
+                               'separators': (',', ':')})
+
+    def get_etag(self, request):
+        versions = ':'.join(str(get_model_version(model))
+                            for model in self.condition_models)
+        key = f'{request.get_full_path()}|json|{versions}'
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def get_queryset(self):
+        queryset = self.queryset.all()
+
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+
+        return queryset
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', {'request': self.request, 'view': self})
+        return self.get_serializer_class()(*args, **kwargs)
+
+    async def aget_representations(self, objs):
+        """
+        Return the representations of *objs*, in order.
+        """
+        return self.get_serializer(objs, many=True).data
+
+    async def aget_object(self):
+        queryset = self.get_queryset()
+
+        try:
+            return await queryset.aget(
+                **{self.lookup_field: self.kwargs[self.lookup_field]})
+        except queryset.model.DoesNotExist:
+            raise exceptions.NotFound()
+
+    async def aretrieve(self):
+        objs = await self.aget_representations([await self.aget_object()])
+        return self.render(objs[0])
+
+    async def alist(self, queryset):
+        """
+        Render a limit/offset page of *queryset* like ``KeysetPagination``
+        does without a cursor.
+        """
+        request = self.request
+        limit = self.get_limit(request)
+        offset = self.get_offset(request)
+        exact = request.GET.get(self.exact_count_query_param) in ('1', 'true')
+        count = await acount_rows(queryset, exact=exact)
+        rows = [obj async for obj in
+                queryset[offset:offset + limit + 1].aiterator()]
+        results = await self.aget_representations(rows[:limit])
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+
+        if len(rows) > limit:
+            next_url = replace_query_param(
+                replace_query_param(url, self.limit_query_param, limit),
+                self.offset_query_param, offset + limit)
+
+        if offset > 0:
+            previous_url = replace_query_param(
+                url, self.limit_query_param, limit)
+            previous_url = (
+                replace_query_param(previous_url, self.offset_query_param,
+                                    offset - limit)
+                if offset > limit else
+                remove_query_param(previous_url, self.offset_query_param))
+
+        return self.render({'count': count, 'next': next_url,
+                            'previous': previous_url, 'results': results})
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.GET[self.limit_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+        return min(limit, self.max_limit) if limit > 0 else (
+            api_settings.PAGE_SIZE)
+
+    def get_offset(self, request):
+        try:
+            return max(int(request.GET[self.offset_query_param]), 0)
+        except (KeyError, ValueError):
+            return 0
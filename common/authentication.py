@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/authentication.py
+#
+
+"""
+Token authentication without a query per request.
+
+``CachedTokenAuthentication`` keeps what the permission checks read of a
+token's user (the id, the username, the flags and the group names) in a
+bounded in-process LRU for ``TOKEN_AUTH_CACHE_TIMEOUT`` seconds, keyed by a
+hash of the token, so the keys themselves are never held. With
+``TOKEN_AUTH_SHARED_CACHE`` naming one of the ``CACHES``, the processes
+also share the entries they load.
+
+Deleting a token and saving, deleting or regrouping a user revokes the
+entries at once in the process making the change and in the shared cache.
+The LRUs of other processes keep them until they expire, which bounds how
+long a revoked token is still accepted there.
+
+``parse_basic_credentials`` reads the credentials of a Basic header
+without touching the database.
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+__all__ = (
+    'CachedTokenAuthentication',
+    'clear_token_cache',
+    'parse_basic_credentials',
+    'revoke_token',
+    'revoke_user',
+    )
+
+_KEY_PREFIX = 'token-auth'
+_USER_KEY_PREFIX = 'token-auth-user'
+# The user fields an entry holds, the others load on first access.
+_USER_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+# The scheme and the credentials, RFC 7617 parameters after them are
+# ignored. Long enough for a 150 character username and a 50 character
+# password of 4 byte characters.
+_BASIC_RE = re.compile(r'Basic +([A-Za-z0-9+/]{1,1072}={0,2})(?: .*)?',
+                       re.IGNORECASE)
+
+
+def parse_basic_credentials(header):
+    """
+    Return the username and password of a Basic ``Authorization`` header,
+    or None if the header is missing or malformed.
+    """
+    match = _BASIC_RE.fullmatch(header or '')
+
+    if match is None:
+        return None
+
+    try:
+        credentials = base64.b64decode(match.group(1), validate=True)
+        username, sep, password = credentials.decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+    if not (sep and username):
+        return None
+
+    return username, password
+
+
+def _hash(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _timeout():
+    return getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', 30)
+
+
+def _shared_cache():
+    alias = getattr(settings, 'TOKEN_AUTH_SHARED_CACHE', None)
+    return caches[alias] if alias else None
+
+
+class _TokenCache:
+    """
+    A thread-safe LRU of token entries by token hash, each one expiring
+    after *timeout* seconds.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_hash):
+        with self._lock:
+            item = self._entries.get(token_hash)
+
+            if item is None:
+                return None
+
+            expires, entry = item
+
+            if expires <= time.monotonic():
+                self._remove(token_hash)
+                return None
+
+            self._entries.move_to_end(token_hash)
+            return entry
+
+    def set(self, token_hash, entry, timeout, maxsize):
+        with self._lock:
+            self._remove(token_hash)
+            self._entries[token_hash] = (time.monotonic() + timeout, entry)
+            self._by_user.setdefault(entry['id'], set()).add(token_hash)
+
+            while len(self._entries) > maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, token_hash):
+        item = self._entries.pop(token_hash, None)
+
+        if item is not None:
+            hashes = self._by_user.get(item[1]['id'])
+            hashes.discard(token_hash)
+
+            if not hashes:
+                del self._by_user[item[1]['id']]
+
+    def revoke_token(self, token_hash):
+        with self._lock:
+            self._remove(token_hash)
+
+    def revoke_user(self, user_id):
+        with self._lock:
+            for token_hash in list(self._by_user.get(user_id, ())):
+                self._remove(token_hash)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_token_cache = _TokenCache()
+
+
+def _revoke_token(token_hash):
+    _token_cache.revoke_token(token_hash)
+    shared = _shared_cache()
+
+    if shared is not None:
+        shared.delete(f'{_KEY_PREFIX}:{token_hash}')
+
+
+def _revoke_user(user_id):
+    _token_cache.revoke_user(user_id)
+    shared = _shared_cache()
+
+    if shared is not None:
+        # Shared entries hold the generation of their user they were
+        # loaded under, a new one retires all of them.
+        shared.set(f'{_USER_KEY_PREFIX}:{user_id}', time.time_ns(),
+                   timeout=_timeout())
+
+
+def revoke_token(key):
+    """
+    Forget the token *key*, now and once the current transaction commits.
+    """
+    token_hash = _hash(key)
+    _revoke_token(token_hash)
+    transaction.on_commit(lambda: _revoke_token(token_hash))
+
+
+def revoke_user(user_id):
+    """
+    Forget the tokens of the user *user_id*, now and once the current
+    transaction commits.
+    """
+    _revoke_user(user_id)
+    transaction.on_commit(lambda: _revoke_user(user_id))
+
+
+def clear_token_cache():
+    """
+    Empty the in-process LRU.
+    """
+    _token_cache.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` answering from the token cache, a token missing
+    from it costs the usual query. The user it returns carries the cached
+    group names, its other fields are loaded when first read.
+    """
+
+    def authenticate_credentials(self, key):
+        token_hash = _hash(key)
+        entry = _token_cache.get(token_hash)
+
+        if entry is None:
+            entry = self._get_shared(token_hash)
+
+            if entry is None:
+                entry = self._load(key, token_hash)
+
+            _token_cache.set(
+                token_hash, entry, _timeout(),
+                getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000))
+
+        return self._accept(key, entry)
+
+    async def aauthenticate_credentials(self, key):
+        """
+        The async ``authenticate_credentials``, a token missing from the
+        LRU is loaded in a thread.
+        """
+        entry = _token_cache.get(_hash(key))
+
+        if entry is None:
+            return await sync_to_async(self.authenticate_credentials)(key)
+
+        return self._accept(key, entry)
+
+    def _accept(self, key, entry):
+        if not entry['is_active']:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        user = self._build_user(entry)
+        token = self.get_model()(key=key, user=user)
+        token._state.adding = False
+        return (user, token)
+
+    def _get_shared(self, token_hash):
+        shared = _shared_cache()
+
+        if shared is None:
+            return None
+
+        key = f'{_KEY_PREFIX}:{token_hash}'
+        entry = shared.get(key)
+
+        if entry is None:
+            return None
+
+        generation = shared.get(f"{_USER_KEY_PREFIX}:{entry['id']}")
+
+        if generation != entry['generation']:
+            shared.delete(key)
+            return None
+
+        return entry
+
+    def _load(self, key, token_hash):
+        model = self.get_model()
+
+        try:
+            token = model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        user = token.user
+        entry = {name: getattr(user, name) for name in _USER_FIELDS}
+        entry['groups'] = user.get_group_names()
+        shared = _shared_cache()
+
+        if shared is not None:
+            user_key = f'{_USER_KEY_PREFIX}:{user.pk}'
+            shared.add(user_key, time.time_ns(), timeout=_timeout())
+            entry['generation'] = shared.get(user_key)
+            shared.set(f'{_KEY_PREFIX}:{token_hash}', entry,
+                       timeout=_timeout())
+
+        return entry
+
+    def _build_user(self, entry):
+        model = get_user_model()
+        fields = [field.attname for field in model._meta.concrete_fields
+                  if field.attname in entry]
+        user = model.from_db(router.db_for_read(model), fields,
+                             [entry[name] for name in fields])
+        user._group_names = entry['groups']
+        return user
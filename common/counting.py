@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/counting.py
+#
+
+"""
+Row counts for paginated responses.
+
+Counting a large table costs more than reading a page of it. The count of
+an unfiltered PostgreSQL table is taken from the planner statistics, other
+counts are cached for ``COUNT_CACHE_TIMEOUT`` seconds under the model
+version, so a write to the model makes them count again.
+"""
+
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from .model_versions import get_model_version
+
+__all__ = (
+    'acount_rows',
+    'count_rows',
+    'estimate_table_rows',
+    )
+
+# Tables estimated to hold fewer rows are counted exactly.
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Return the planner's estimate of the rows of *model*'s table, or None
+    when the database keeps none.
+    """
+    connection = connections[using]
+
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table])
+        row = cursor.fetchone()
+
+    # Tables never analyzed have no (-1, or 0 before PostgreSQL 14) estimate.
+    return int(row[0]) if row and row[0] > 0 else None
+
+
+def _is_whole_table(queryset):
+    query = queryset.query
+    return (not query.where and not query.distinct and not query.combinator
+            and query.low_mark == 0 and query.high_mark is None)
+
+
+def _count_key(queryset):
+    """
+    Return the cache key of the count of *queryset*, or None when it
+    matches nothing.
+    """
+    model = queryset.model
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+
+    digest = hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    return f'count:{model._meta.label_lower}:{get_model_version(model)}:{digest}'
+
+
+def count_rows(queryset, exact=False):
+    """
+    Return the number of rows of *queryset*, exact when *exact* is true,
+    otherwise estimated for a large whole table or cached.
+    """
+    if exact:
+        return queryset.count()
+
+    if _is_whole_table(queryset):
+        estimate = estimate_table_rows(queryset.model, queryset.db)
+
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+
+    key = _count_key(queryset)
+
+    if key is None:
+        return 0
+
+    count = cache.get(key)
+
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'COUNT_CACHE_TIMEOUT', 30))
+
+    return count
+
+
+async def acount_rows(queryset, exact=False):
+    """
+    The async ``count_rows``.
+    """
+    if exact:
+        return await queryset.acount()
+
+    if (_is_whole_table(queryset)
+            and connections[queryset.db].vendor == 'postgresql'):
+        estimate = await sync_to_async(estimate_table_rows)(
+            queryset.model, queryset.db)
+
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+
+    key = _count_key(queryset)
+
+    if key is None:
+        return 0
+
+    count = await cache.aget(key)
+
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(
+            key, count, getattr(settings, 'COUNT_CACHE_TIMEOUT', 30))
+
+    return count
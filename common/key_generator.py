@@ -7,75 +7,164 @@
 Generates public keys used throughout the system.
 """
 
-import random
+import functools
+import os
+import threading
+import time
 from string import ascii_lowercase, ascii_uppercase, digits
 
 from django.utils.translation import gettext, gettext_lazy as _
 
 
+@functools.lru_cache(maxsize=16)
+def _byte_tables(domain):
+    """
+    Return the ``bytes.translate`` arguments mapping random bytes onto
+    *domain*. Bytes at or above the largest multiple of the domain size are
+    deleted instead of wrapped around, so every character is equally likely.
+    """
+    size = len(domain)
+    limit = 256 - 256 % size
+    encoded = domain.encode('ascii')
+    table = bytes(encoded[byte % size] if byte < limit else 0
+                  for byte in range(256))
+    return table, bytes(range(limit, 256)), limit
+
+
 class KeyGenerator:
-     """
-     Create various keys used in the system
-     """
-     _ERROR_MSGS = {
-         'invalid_length': _("Invalid key length value."),
-         }
-     _UNKNOWN_MSG = _("Unknown")
-     _KEY_DOMAIN = ascii_lowercase + ascii_uppercase + digits
-
-     def __init__(self, length):
-         """
-         Set the key *length*.
-         """
-         self._length = length
-         self.__key = ''
-
-     @property
-     def _generator(self):
-         """
-         Try to access the system random number generator if exists else
-         return the pseudo random number generator.
-         """
-         try:
-             rand = random.SystemRandom()
-         except NotImplementedError: 
-             rand = random
-
-         return rand
-
-     def generate(self, length=0, regen=False, domain=_KEY_DOMAIN):
-         """
-         Generates a key of the given length using the default domain and
-         random number generator.
-         """
-         if not self.__key or regen:
-             if not length:
-                 length = self._length
-             else:
-                 self._length = length
-
-             if not isinstance(length, int):
-                 msg = self._ERROR_MSGS.get('invalid_length', self._UNKNOWN_MSG)
-                 raise ValueError(msg)
-
-             if length <= 0:
-                 msg = self._ERROR_MSGS.get('invalid_length', self._UNKNOWN_MSG)
-                 raise ValueError(msg)
-
-             self.__key = ''.join(self._generator.choice(domain)
-                                  for i in range(length))
-
-         return self.__key
-
-     @property
-     def length(self):
-         """
-         Length of the key
-         """
-         return self._length
-
-
-
-         
-    
-    
+    """
+    Create various keys used in the system
+    """
+    _ERROR_MSGS = {
+        'invalid_length': _("Invalid key length value."),
+        'invalid_domain': _("The key domain must hold 1 to 256 ASCII "
+                            "characters."),
+        }
+    _UNKNOWN_MSG = _("Unknown")
+    _KEY_DOMAIN = ascii_lowercase + ascii_uppercase + digits
+
+    def __init__(self, length):
+        """
+        Set the key *length*.
+        """
+        self._length = length
+        self.__key = ''
+
+    def _error(self, code):
+        return ValueError(self._ERROR_MSGS.get(code, self._UNKNOWN_MSG))
+
+    def _check_length(self, length):
+        if not isinstance(length, int) or length <= 0:
+            raise self._error('invalid_length')
+
+    def _draw(self, count, domain):
+        """
+        Return *count* random characters of *domain*. The entropy is read
+        with a single ``os.urandom`` call, a second one is only needed in
+        the unlikely case too many bytes were rejected.
+        """
+        if not 0 < len(domain) <= 256:
+            raise self._error('invalid_domain')
+
+        try:
+            table, delete, limit = _byte_tables(domain)
+        except UnicodeEncodeError:
+            raise self._error('invalid_domain')
+
+        chars = b''
+
+        while len(chars) < count:
+            missing = count - len(chars)
+            # Over-read by the expected rejection rate and a margin.
+            size = missing * 256 // limit + missing // 16 + 8
+            chars += os.urandom(size).translate(table, delete)
+
+        return chars[:count].decode('ascii')
+
+    def generate(self, length=0, regen=False, domain=_KEY_DOMAIN):
+        """
+        Generates a key of the given length using the default domain and
+        the system random number generator.
+        """
+        if not self.__key or regen:
+            if not length:
+                length = self._length
+            else:
+                self._length = length
+
+            self._check_length(length)
+            self.__key = self._draw(length, domain)
+
+        return self.__key
+
+    def generate_many(self, count, length=0, domain=_KEY_DOMAIN):
+        """
+        Return a list of *count* new keys drawing their entropy at once, to
+        be used when creating records in bulk.
+        """
+        length = length or self._length
+        self._check_length(length)
+        chars = self._draw(count * length, domain)
+        return [chars[idx:idx + length]
+                for idx in range(0, count * length, length)]
+
+    @property
+    def length(self):
+        """
+        Length of the key
+        """
+        return self._length
+
+
+class SortableKeyGenerator:
+    """
+    Create fixed width keys that sort in creation order, like ULIDs: a
+    millisecond timestamp in 10 characters followed by 16 random ones, all
+    in Crockford's base 32, which sorts the same as the numbers it encodes.
+    New keys land at the end of an index instead of all over it. Keys made
+    by a process within the same millisecond increase the random part by
+    one, so they keep sorting in creation order. Next to random keys they
+    sort before nearly all of them, the timestamps starting with ``0``.
+    """
+    DOMAIN = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+    LENGTH = 26
+    RANDOM_BITS = 80
+    _SHIFTS = tuple(range(5 * (LENGTH - 1), -1, -5))
+    _lock = threading.Lock()
+    # The timestamp and random part of the last key made.
+    _last = (0, 0)
+
+    def generate(self):
+        """
+        Return a new key.
+        """
+        return self.generate_many(1)[0]
+
+    def generate_many(self, count):
+        """
+        Return a list of *count* new keys, sorted.
+        """
+        with self._lock:
+            now = time.time_ns() // 1000000
+            last_time, last_random = SortableKeyGenerator._last
+
+            if now <= last_time:
+                now, start = last_time, last_random + 1
+            else:
+                # Half the range is left to the following keys.
+                start = int.from_bytes(os.urandom(10), 'big') >> 1
+
+            if start + count >= 1 << self.RANDOM_BITS:
+                now += 1
+                start = int.from_bytes(os.urandom(10), 'big') >> 1
+
+            SortableKeyGenerator._last = (now, start + count - 1)
+
+        prefix = now << self.RANDOM_BITS
+        return [self._encode(prefix | random)
+                for random in range(start, start + count)]
+
+    def _encode(self, value):
+        domain = self.DOMAIN
+        return ''.join([domain[(value >> shift) & 31]
+                        for shift in self._SHIFTS])
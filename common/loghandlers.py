@@ -10,8 +10,13 @@ Global log handlers
 __docformat__ = "restructuredtext en"
 
 from logging import FileHandler
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, RotatingFileHandler
+import atexit
 import os
+import queue
+import threading
+
+from django.utils.module_loading import import_string
 
 
 ## class DeferredFileHandler(FileHandler):
@@ -36,3 +41,198 @@ class DeferredRotatingFileHandler(RotatingFileHandler):
     def _open(self):
         self.baseFilename = self.filename
         return RotatingFileHandler._open(self)
+
+
+#
+# Overflow policies of a full QueueingHandler queue.
+#
+# Wait for room, never lose a record.
+OVERFLOW_BLOCK = 'block'
+# Drop the record being logged.
+OVERFLOW_DROP_NEW = 'drop_new'
+# Drop the oldest queued record to make room.
+OVERFLOW_DROP_OLD = 'drop_old'
+
+_OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEW, OVERFLOW_DROP_OLD)
+_STOP = object()
+
+
+class QueueingHandler(QueueHandler):
+    """
+    Format records in the calling thread and hand them to a background
+    thread, which writes them with the handler built from *target*, a dict
+    with the ``class`` of the handler and its arguments. The target handler
+    writes the formatted message as is.
+
+    The queue holds at most *maxsize* records, what happens to the records
+    logged while it is full is set by *overflow*. The background thread
+    writes up to *batch_size* queued records to a stream handler before
+    flushing it, and rotates a rotating file handler itself. Queued records
+    are written when the handler is closed, at the latest at exit.
+    """
+
+    def __init__(self, target, maxsize=10000, overflow=OVERFLOW_BLOCK,
+                 batch_size=100):
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow!r}")
+
+        target = dict(target)
+        self.target = import_string(target.pop('class'))(**target)
+        super().__init__(queue.Queue(maxsize))
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def emit(self, record):
+        # Threads do not survive a fork, start one in every worker.
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self._start()
+
+        super().emit(record)
+
+    def enqueue(self, record):
+        if self.overflow == OVERFLOW_BLOCK:
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == OVERFLOW_DROP_OLD:
+            try:
+                oldest = self.queue.get_nowait()
+                self.queue.task_done()
+                # Closing the handler outranks the record.
+                self.queue.put_nowait(_STOP if oldest is _STOP else record)
+            except (queue.Empty, queue.Full):
+                pass
+
+        # Not worth a lock, the count is a hint.
+        self.dropped += 1
+
+    def _start(self):
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._listen, name=f'{type(self).__name__}-listener',
+            daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _listen(self):
+        stopping = False
+
+        while not stopping:
+            batch = [self.queue.get()]
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            size = len(batch)
+
+            if _STOP in batch:
+                batch.remove(_STOP)
+                stopping = True
+
+            self._write(batch)
+
+            for idx in range(size):
+                self.queue.task_done()
+
+    def _write(self, records):
+        target = self.target
+        records = [record for record in records
+                   if record.levelno >= target.level]
+
+        if not records:
+            return
+
+        if not hasattr(target, 'stream'):
+            for record in records:
+                target.handle(record)
+
+            return
+
+        max_bytes = getattr(target, 'maxBytes', 0)
+        rotating = max_bytes > 0
+        # The size of the file is looked up once per batch, not per record.
+        position = None
+
+        with target.lock:
+            for record in records:
+                try:
+                    message = target.format(record) + target.terminator
+
+                    if target.stream is None:
+                        target.stream = target._open()
+                        position = None
+
+                    if rotating and position is None:
+                        # Only regular files are rotated, as by
+                        # shouldRollover, never /dev/null.
+                        rotating = os.path.isfile(target.baseFilename)
+                        position = target.stream.seek(0, 2) if rotating else 0
+
+                    if rotating:
+                        if position and position + len(message) >= max_bytes:
+                            target.doRollover()
+
+                            if target.stream is None:
+                                target.stream = target._open()
+
+                            position = 0
+
+                        position += len(message)
+
+                    target.stream.write(message)
+                except Exception:
+                    target.handleError(record)
+
+            try:
+                target.flush()
+            except Exception:
+                target.handleError(records[-1])
+
+    def flush(self):
+        """
+        Wait until the queued records are written.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            self.queue.join()
+
+    def close(self):
+        if self._thread is not None and self._pid == os.getpid():
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+            self._pid = None
+
+        self.target.close()
+        super().close()
+
+
+class AsyncRotatingFileHandler(QueueingHandler):
+    """
+    A ``DeferredRotatingFileHandler`` writing and rotating in a background
+    thread, so the threads logging never wait on the disk.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None,
+                 **options):
+        super().__init__({
+            'class': 'common.loghandlers.DeferredRotatingFileHandler',
+            'filename': filename,
+            'maxBytes': maxBytes,
+            'backupCount': backupCount,
+            'encoding': encoding,
+            }, **options)
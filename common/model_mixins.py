@@ -7,6 +7,14 @@
 Mixins used in Django models.
 """
 
+import contextlib
+import contextvars
+
+import django
+from django.db import IntegrityError, transaction
+
+from .tracing import Tracer
+
 # from datetime import datetime
 # from dateutil.tz import tzutc
 
@@ -15,6 +23,47 @@ Mixins used in Django models.
 # from django.utils.translation import gettext_lazy as _
 # from django.conf import settings
 
+#
+# Validation levels
+#
+# Run every check of full_clean, uniqueness included.
+VALIDATE_FULL = 'full'
+# Run the field validators and clean(), leave uniqueness to the database.
+VALIDATE_FIELDS = 'fields'
+# Only run clean(), for data already validated by a serializer or trusted
+# internal writes; the database constraints still apply.
+VALIDATE_DB = 'db'
+
+tracer = Tracer(__name__)
+
+_validation_level = contextvars.ContextVar(
+    'validation_level', default=VALIDATE_FULL)
+
+# The full_clean() arguments skipping the checks that query the database.
+if django.VERSION >= (4, 1):
+    _NO_DB_CHECKS = {'validate_unique': False, 'validate_constraints': False}
+else:
+    _NO_DB_CHECKS = {'validate_unique': False}
+
+
+def get_validation_level():
+    return _validation_level.get()
+
+
+@contextlib.contextmanager
+def validation_level(level):
+    """
+    Save the ``ValidateOnSaveMixin`` models with the given validation level
+    within the block.
+    """
+    token = _validation_level.set(level)
+
+    try:
+        yield
+    finally:
+        _validation_level.reset(token)
+
+
 #
 # ValidateOnSaveMixin
 #
@@ -22,8 +71,39 @@ class ValidateOnSaveMixin:
 
     def save(self, *args, **kwargs):
         """
-        Execute ``full_clean``.
+        Execute ``full_clean``, or the part of it the current validation
+        level asks for. When uniqueness is left to the database its
+        ``IntegrityError`` is turned into the ``ValidationError`` the full
+        check would have raised.
+        """
+        level = get_validation_level()
+        tracer.event('validate', model=type(self).__name__, level=level)
 
+        if level == VALIDATE_FULL:
+            self.full_clean()
+            super().save(*args, **kwargs)
+            return
+
+        if level == VALIDATE_FIELDS:
+            self.full_clean(**_NO_DB_CHECKS)
+        else:
+            self.clean()
+
+        try:
+            # A savepoint keeps the transaction usable after a violation.
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            tracer.count('integrity_errors')
+            self.validate_database_rules()
+            raise
+
+    def validate_database_rules(self):
         """
-        self.full_clean()
-        super().save(*args, **kwargs)
+        Run the uniqueness and constraint checks full_clean skipped, raising
+        their ``ValidationError``.
+        """
+        self.validate_unique()
+
+        if hasattr(self, 'validate_constraints'):
+            self.validate_constraints()
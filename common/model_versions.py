@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/model_versions.py
+#
+
+"""
+Per-model version counters, kept in Django's cache.
+
+The version of a model changes whenever one of its rows is saved or
+deleted, so anything derived from the table can be cached under a key
+holding the version and is never read back once stale. Writes bypassing
+the model signals (``update()``, ``bulk_create()``, ``bulk_update()``) call
+``bump_model_version`` themselves.
+
+Single rows can be versioned as well, with ``get_object_versions`` and
+``bump_object_versions``, for things derived from one row and its
+relations. Nothing bumps those automatically.
+
+With a per-process cache backend other processes only see their own writes,
+use a shared backend in production.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+
+__all__ = (
+    'VersionedQuerySetMixin',
+    'bump_model_version',
+    'bump_object_versions',
+    'get_model_modified',
+    'get_model_version',
+    'get_object_versions',
+    'track_model_versions',
+    )
+
+_KEY_PREFIX = 'model-version'
+_MODIFIED_KEY_PREFIX = 'model-modified'
+_OBJECT_KEY_PREFIX = 'object-version'
+
+
+def _key(model):
+    return f'{_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def _modified_key(model):
+    return f'{_MODIFIED_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def _object_key(model, pk):
+    return f'{_OBJECT_KEY_PREFIX}:{model._meta.label_lower}:{pk}'
+
+
+def get_model_version(model):
+    """
+    Return the current version of *model*.
+    """
+    key = _key(model)
+    version = cache.get(key)
+
+    if version is None:
+        # A clock reading never repeats a version lost with an evicted key.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_model_modified(model):
+    """
+    Return the POSIX time of the last write to *model*, as recorded by
+    ``bump_model_version``, or else the latest ``updated_at`` of its rows.
+    """
+    key = _modified_key(model)
+    modified = cache.get(key)
+
+    if modified is None:
+        try:
+            model._meta.get_field('updated_at')
+        except FieldDoesNotExist:
+            latest = None
+        else:
+            latest = model._default_manager.aggregate(
+                latest=Max('updated_at'))['latest']
+
+        modified = latest.timestamp() if latest else time.time()
+        cache.add(key, modified, timeout=None)
+
+    return modified
+
+
+def _bump(model):
+    try:
+        cache.incr(_key(model))
+    except ValueError:
+        cache.add(_key(model), time.time_ns(), timeout=None)
+
+    cache.set(_modified_key(model), time.time(), timeout=None)
+
+
+def bump_model_version(model):
+    """
+    Give *model* a new version, and another one once the current
+    transaction commits, so nothing read before the commit outlives it.
+    """
+    _bump(model)
+    transaction.on_commit(lambda: _bump(model))
+
+
+def get_object_versions(model, pks):
+    """
+    Return the versions of the *model* rows with the primary keys *pks*,
+    keyed by primary key.
+    """
+    keys = {_object_key(model, pk): pk for pk in pks}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, timeout=None)
+
+        found.update(cache.get_many(missing))
+
+    return {pk: found.get(key) for key, pk in keys.items()}
+
+
+def _bump_objects(model, pks):
+    version = time.time_ns()
+    cache.set_many({_object_key(model, pk): version for pk in pks},
+                   timeout=None)
+
+
+def bump_object_versions(model, pks):
+    """
+    Give the *model* rows with the primary keys *pks* new versions, again
+    once the current transaction commits.
+    """
+    pks = {pk for pk in pks if pk is not None}
+
+    if pks:
+        _bump_objects(model, pks)
+        transaction.on_commit(lambda: _bump_objects(model, pks))
+
+
+def _bump_sender(sender, **kwargs):
+    bump_model_version(sender)
+
+
+def track_model_versions(*models):
+    """
+    Bump the version of *models* on every save and delete of their rows.
+    """
+    for model in models:
+        for name, signal in (('save', post_save), ('delete', post_delete)):
+            signal.connect(_bump_sender, sender=model,
+                           dispatch_uid=f'{_key(model)}:{name}')
+
+
+class VersionedQuerySetMixin:
+    """
+    Bump the model version on the queryset writes sending no signals.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+
+        if rows:
+            bump_model_version(self.model)
+
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+
+        if objs:
+            bump_model_version(self.model)
+
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        rows = super().bulk_update(objs, *args, **kwargs)
+
+        if rows or rows is None and objs:
+            bump_model_version(self.model)
+
+        return rows
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/pagination.py
+#
+
+"""
+Pagination classes.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .counting import count_rows
+
+__all__ = (
+    'KeysetPagination',
+    )
+
+
+def keyset_after(ordering, position):
+    """
+    Return the ``Q`` matching the rows after *position*, the values of the
+    *ordering* fields of the last row seen.
+    """
+    condition = Q()
+    equal = Q()
+
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+
+    return condition
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination, or keyset pagination when the request has a
+    ``cursor`` parameter and the view declares a ``keyset_ordering``, a
+    tuple of fields ending with a unique one.
+
+    Keyset pages start after the row the cursor points to, so deep pages
+    cost as much as the first one. They link to the next page only and only
+    count the rows with ``?count=1``.
+
+    Counts are estimated or cached, see ``common.counting``, and exact with
+    ``?exact_count=1``.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    exact_count_query_param = 'exact_count'
+    keyset_max_limit = 1000
+    invalid_cursor_message = _("Invalid cursor")
+
+    keyset = False
+    has_next = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'keyset_ordering', None)
+
+        if not ordering or self.cursor_query_param not in request.query_params:
+            return self.paginate_offset(queryset, request)
+
+        self.keyset = True
+        self.request = request
+        self.limit = min(self.get_limit(request), self.keyset_max_limit)
+        wants_count = any(
+            request.query_params.get(param) in ('1', 'true')
+            for param in (self.count_query_param,
+                          self.exact_count_query_param))
+        self.count = self.get_count(queryset) if wants_count else None
+        position = self.decode_cursor(request, len(ordering))
+        names = [f'keyset_{idx}' for idx in range(len(ordering))]
+        queryset = queryset.annotate(**{
+            name: F(field.lstrip('-')) for name, field in zip(names, ordering)
+            }).order_by(*ordering)
+
+        try:
+            if position is not None:
+                queryset = queryset.filter(keyset_after(ordering, position))
+
+            rows = list(queryset[:self.limit + 1])
+        except (ValueError, TypeError, ValidationError):
+            # A cursor holding values the fields do not take.
+            raise NotFound(self.invalid_cursor_message)
+        self.next_position = None
+
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.next_position = [getattr(rows[-1], name) for name in names]
+
+        return rows
+
+    def paginate_offset(self, queryset, request):
+        """
+        Limit/offset pagination deciding whether there is a next page from
+        the rows read, not from the count, which may be estimated.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+
+        if self.limit is None:
+            return None
+
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[:self.limit]
+
+    def get_count(self, queryset):
+        exact = self.request.query_params.get(
+            self.exact_count_query_param) in ('1', 'true')
+        return count_rows(queryset, exact=exact)
+
+    def decode_cursor(self, request, size):
+        cursor = request.query_params[self.cursor_query_param]
+
+        if not cursor:
+            return None
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != size:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, cls=DjangoJSONEncoder).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def get_next_link(self):
+        if not self.keyset:
+            if not self.has_next:
+                return None
+
+            url = replace_query_param(self.request.build_absolute_uri(),
+                                      self.limit_query_param, self.limit)
+            return replace_query_param(url, self.offset_query_param,
+                                       self.offset + self.limit)
+
+        if self.next_position is None:
+            return None
+
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param,
+            self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        fields = [('next', self.get_next_link()), ('results', data)]
+
+        if self.count is not None:
+            fields.insert(0, ('count', self.count))
+
+        return Response(OrderedDict(fields))
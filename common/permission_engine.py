@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/permission_engine.py
+#
+
+"""
+Compile the permission trees of views into flat predicates.
+
+The ``rest_condition`` trees of ``permission_classes`` are flattened once
+per view class, the cheap request and flag checks of every level are moved
+before the checks reading the user's groups, and the result of every
+permission is kept on the request, so a permission appearing in several
+branches, or checked again for an object, runs only once.
+"""
+
+import functools
+import inspect
+import operator
+
+from django.conf import settings
+from django.db import connection
+
+from rest_condition import Condition
+from rest_framework import permissions
+
+__all__ = (
+    'FLAG_COST',
+    'ROLE_COST',
+    'compile_permissions',
+    'get_permission_db_hits',
+    )
+
+# Checks of the request method and of user flags.
+FLAG_COST = 0
+# Checks reading the user's groups.
+ROLE_COST = 1
+# Conditions the engine can not see into.
+OPAQUE_COST = 2
+
+_FLAG_PERMISSIONS = (
+    permissions.AllowAny,
+    permissions.IsAdminUser,
+    permissions.IsAuthenticated,
+    permissions.IsAuthenticatedOrReadOnly,
+    )
+_MEMO_ATTR = '_permission_memo'
+_DB_HITS_ATTR = '_permission_db_hits'
+
+
+def get_permission_db_hits(request):
+    """
+    Return the number of queries permission checks made for *request*,
+    only counted when DEBUG is on.
+    """
+    return getattr(request, _DB_HITS_ATTR, 0)
+
+
+class _Leaf:
+    """
+    A permission class or instance, or a condition the engine can not
+    flatten, evaluated at most once per request and object.
+    """
+
+    def __init__(self, permission, cost):
+        self.permission = permission
+        self.cost = cost
+
+    def evaluate(self, method, args, memo, key):
+        memo_key = (self.permission, method, key)
+        result = memo.get(memo_key)
+
+        if result is None:
+            permission = self.permission
+
+            if inspect.isclass(permission) or inspect.isfunction(permission):
+                permission = permission()
+
+            result = memo[memo_key] = bool(getattr(permission, method)(*args))
+
+        return result
+
+
+class _Node:
+    """
+    All or any of the children, cheapest first, optionally negated.
+    """
+
+    def __init__(self, children, any_of, negated=False):
+        self.children = sorted(children, key=operator.attrgetter('cost'))
+        self.any_of = any_of
+        self.negated = negated
+        self.cost = sum(child.cost for child in children)
+
+    def evaluate(self, method, args, memo, key):
+        # rest_condition denies an empty condition.
+        if not self.children:
+            return False
+
+        children = (child.evaluate(method, args, memo, key)
+                    for child in self.children)
+        result = any(children) if self.any_of else all(children)
+        return result != self.negated
+
+
+def _compile(permission):
+    if not isinstance(permission, Condition):
+        cost = (FLAG_COST if permission in _FLAG_PERMISSIONS
+                else getattr(permission, 'permission_cost', ROLE_COST))
+        return _Leaf(permission, cost)
+
+    if permission.reduce_op is operator.and_ and permission.lazy_until in (
+            False, None):
+        any_of = False
+    elif permission.reduce_op is operator.or_ and permission.lazy_until in (
+            True, None):
+        any_of = True
+    else:
+        return _Leaf(permission, OPAQUE_COST)
+
+    children = []
+
+    for child in map(_compile, permission.perms_or_conds):
+        # And(And(a, b), c) is And(a, b, c), likewise for Or.
+        if (isinstance(child, _Node) and child.any_of == any_of
+                and not child.negated):
+            children.extend(child.children)
+        else:
+            children.append(child)
+
+    return _Node(children, any_of, bool(permission.negated))
+
+
+class _QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class CompiledPermission(permissions.BasePermission):
+    """
+    Grant access when every permission of a view's ``permission_classes``
+    does, evaluating the compiled tree.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def has_permission(self, request, view):
+        return self._evaluate('has_permission', (request, view), request,
+                              None)
+
+    def has_object_permission(self, request, view, obj):
+        key = (type(obj), obj.pk) if getattr(obj, 'pk', None) else id(obj)
+        return self._evaluate('has_object_permission', (request, view, obj),
+                              request, key)
+
+    def _evaluate(self, method, args, request, key):
+        memo = getattr(request, _MEMO_ATTR, None)
+
+        if memo is None:
+            memo = {}
+            setattr(request, _MEMO_ATTR, memo)
+
+        # DRF lets everybody in when a view lists no permission.
+        if not self.root.children:
+            return True
+
+        if not settings.DEBUG:
+            return self.root.evaluate(method, args, memo, key)
+
+        counter = _QueryCounter()
+
+        with connection.execute_wrapper(counter):
+            result = self.root.evaluate(method, args, memo, key)
+
+        setattr(request, _DB_HITS_ATTR,
+                get_permission_db_hits(request) + counter.count)
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def compile_permissions(permission_classes):
+    """
+    Return a ``CompiledPermission`` checking the tuple of permission
+    classes and conditions of a view. Compiled once per tuple.
+    """
+    return CompiledPermission(_compile(Condition(*permission_classes)))
@@ -7,11 +7,15 @@ Authorization permissions.
 """
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
 
 from rest_framework import permissions
 
+from .permission_engine import FLAG_COST
+from .roles import get_roles
+from .tracing import Tracer
+
 UserModel = get_user_model()
+tracer = Tracer(__name__)
 
 
 def get_user(request):
@@ -29,12 +33,14 @@ class IsAdminSuperUser(permissions.BasePermission):
     Allows access only to admin super users.
     """
 
+    permission_cost = FLAG_COST
+
     def has_permission(self, request, view):
         result = False
         user = get_user(request)
         if user and user.is_superuser:
             result = True
-        print("IsAdminSuperuser:", result)
+        tracer.event("permission", name="IsAdminSuperUser", result=result)
         return result
 
 
@@ -47,9 +53,9 @@ class IsAdministrator(permissions.BasePermission):
         result = False
         user = get_user(request)
 
-        if user and hasattr(user, "groups") and "Admin" in user.get_group():
+        if user and "Admin" in get_roles(request, user):
             result = True
-        print("IsAdministrator:", result)
+        tracer.event("permission", name="IsAdministrator", result=result)
         return result
 
 
@@ -62,9 +68,9 @@ class IsStudent(permissions.BasePermission):
         result = False
         user = get_user(request)
 
-        if user and hasattr(user, "groups") and "Student" in user.get_group():
+        if user and "Student" in get_roles(request, user):
             result = True
-        print("IsStudent:", result)
+        tracer.event("permission", name="IsStudent", result=result)
         return result
 
 
@@ -77,13 +83,9 @@ class IsInstructor(permissions.BasePermission):
         result = False
         user = get_user(request)
 
-        if (
-            user
-            and hasattr(user, "groups")
-            and "Instructor" in user.get_group()
-        ):
+        if user and "Instructor" in get_roles(request, user):
             result = True
-        print("IsInstructor:", result)
+        tracer.event("permission", name="IsInstructor", result=result)
         return result
 
 
@@ -96,9 +98,9 @@ class IsStaff(permissions.BasePermission):
         result = False
         user = get_user(request)
 
-        if user and hasattr(user, "groups") and "Staff" in user.get_group():
+        if user and "Staff" in get_roles(request, user):
             result = True
-        print("IsStaff:", result)
+        tracer.event("permission", name="IsStaff", result=result)
         return result
 
 
@@ -110,15 +112,9 @@ class IsAnyUser(permissions.BasePermission):
     def has_permission(self, request, view):
         result = False
         user = get_user(request)
-        groups = set(Group.objects.all().values_list("name"))
-        # This permission is broken
-        if (
-            user
-            and hasattr(user, "groups")
-            and (user.is_superuser or user.get_group().intersection(groups))
-        ):
+        if user and (user.is_superuser or get_roles(request, user)):
             result = True
-        print("IsAnyuser:", result)
+        tracer.event("permission", name="IsAnyUser", result=result)
         return result
 
 
@@ -128,27 +124,25 @@ class IsSelf(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        print("in has permission")
         return super().has_permission(request, view)
 
     def has_object_permission(self, request, view, obj):
         result = False
         user = get_user(request)
-        print("user:", user.username)
-        print("obj", obj)
         if obj == user:
             result = True
-        print("IsSelf:", result)
+        tracer.event(
+            "permission", name="IsSelf", user=user.pk, obj=obj.pk, result=result
+        )
         return result
 
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         result = False
-        print(obj)
         if obj.student == request.user:
             result = True
-        print("IsOwner:", result)
+        tracer.event("permission", name="IsOwner", obj=obj.pk, result=result)
         return result
 
 
@@ -162,12 +156,14 @@ class IsReadOnly(permissions.BasePermission):
     The request is authenticated as a user, or is a read-only request.
     """
 
+    permission_cost = FLAG_COST
+
     def has_permission(self, request, view):
         result = False
 
         if request.method in permissions.SAFE_METHODS:
             result = True
-        print("IsReadonly:", result)
+        tracer.event("permission", name="IsReadOnly", result=result)
         return result
 
 
@@ -176,13 +172,15 @@ class IsUserActive(permissions.BasePermission):
     The request is authenticated if user is active.
     """
 
+    permission_cost = FLAG_COST
+
     def has_permission(self, request, view):
         result = False
         user = get_user(request)
 
         if user and user.is_active:
             result = True
-        print("IsActive:", result)
+        tracer.event("permission", name="IsUserActive", result=result)
         return result
 
 
@@ -209,12 +207,14 @@ class CanDelete(permissions.BasePermission):
     Allows deletion of records.
     """
 
+    permission_cost = FLAG_COST
+
     def has_permission(self, request, view):
         result = False
 
         if request.method == "DELETE":
             result = True
-        print("CanDelete:", result)
+        tracer.event("permission", name="CanDelete", result=result)
         return result
 
 
@@ -223,10 +223,12 @@ class IsPostOnly(permissions.BasePermission):
     The request is authenticated as a user, or is a read-only request.
     """
 
+    permission_cost = FLAG_COST
+
     def has_permission(self, request, view):
         result = False
 
         if request.method == "POST":
             result = True
-        print("IsPostonly:", result)
+        tracer.event("permission", name="IsPostOnly", result=result)
         return result
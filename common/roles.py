@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/roles.py
+#
+
+"""
+Resolve user roles (group names) once per request.
+"""
+
+__all__ = (
+    'get_roles',
+    )
+
+_ROLE_CACHE_ATTR = '_role_cache'
+
+
+def get_roles(request, user):
+    """
+    Return a frozenset of the group names *user* belongs to.
+
+    The names are kept on *request* keyed by the user's primary key, so
+    every permission class and serializer validator consulted during the
+    same request shares a single lookup, even when they hold different
+    instances of the same user.
+    """
+    if user is None or not getattr(user, 'pk', None):
+        return frozenset()
+
+    if request is None:
+        return user.get_group_names()
+
+    cache = getattr(request, _ROLE_CACHE_ATTR, None)
+
+    if cache is None:
+        cache = {}
+        setattr(request, _ROLE_CACHE_ATTR, cache)
+
+    roles = cache.get(user.pk)
+
+    if roles is None:
+        roles = cache[user.pk] = user.get_group_names()
+
+    return roles
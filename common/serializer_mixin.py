@@ -10,6 +10,9 @@ from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
 
+from .model_mixins import VALIDATE_DB, validation_level
+from .roles import get_roles
+
 UserModel = get_user_model()
 
 
@@ -17,6 +20,13 @@ UserModel = get_user_model()
 # SerializerMixin
 #
 class SerializerMixin:
+    # The data is validated by the serializer, models saved through it only
+    # run clean() and leave uniqueness to the database.
+    model_validation_level = VALIDATE_DB
+
+    def save(self, **kwargs):
+        with validation_level(self.model_validation_level):
+            return super().save(**kwargs)
 
     def get_request(self):
         return self.context.get('request', None)
@@ -29,3 +39,52 @@ class SerializerMixin:
             user = request.user
 
         return user
+
+    def get_user_roles(self, user):
+        return get_roles(self.get_request(), user)
+
+
+#
+# Bulk loading of related instances
+#
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A primary key field that takes its instances from the ones the list
+    serializer loaded in bulk, see ``PreloadListSerializerMixin``.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = getattr(self.root, 'preloaded', {})
+        instance = preloaded.get(self.field_name, {}).get(str(data))
+
+        if instance is None:
+            instance = super().to_internal_value(data)
+
+        return instance
+
+
+class PreloadListSerializerMixin:
+    """
+    Load the instances of every ``PreloadedPrimaryKeyRelatedField`` of the
+    child serializer with one query per field, instead of one query per
+    field and item.
+    """
+
+    def to_internal_value(self, data):
+        self.preloaded = {}
+
+        if isinstance(data, list):
+            for name, field in self.child.fields.items():
+                if (not isinstance(field, PreloadedPrimaryKeyRelatedField)
+                        or field.read_only):
+                    continue
+
+                pks = {str(item[name]) for item in data
+                       if isinstance(item, dict)
+                       and str(item.get(name, '')).isdigit()}
+                self.preloaded[name] = {
+                    str(obj.pk): obj
+                    for obj in field.get_queryset().filter(pk__in=pks)
+                    }
+
+        return super().to_internal_value(data)
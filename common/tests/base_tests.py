@@ -4,6 +4,9 @@
 #
 
 import json
+import os
+import time
+import unittest
 
 from django.contrib.auth import get_user_model, models
 from django.test import TestCase
@@ -12,6 +15,42 @@ from django.test import TestCase
 
 UserModel = get_user_model()
 
+# The role groups with the primary keys the user managers rely on.
+ROLE_GROUPS = (
+    (1, 'Student'),
+    (2, 'Instructor'),
+    (3, 'Staff'),
+    (4, 'Admin'),
+    )
+
+
+def create_role_groups():
+    """
+    Create the role groups and return them keyed by name.
+    """
+    return {name: models.Group.objects.get_or_create(pk=pk, name=name)[0]
+            for pk, name in ROLE_GROUPS}
+
+
+# Benchmarks are slow, they only run when RUN_BENCHMARKS is set.
+run_benchmarks = unittest.skipUnless(
+    os.environ.get('RUN_BENCHMARKS'), "Set RUN_BENCHMARKS=1 to run benchmarks.")
+
+
+def best_time(func, repeat=5):
+    """
+    Return the best wall clock time of ``repeat`` calls of ``func`` in
+    milliseconds.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings) * 1000
+
 
 # class BaseTest(RecordCreation, TestCase):
 class BaseTest(TestCase):
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_admission.py
+#
+
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from ..admission import (
+    AdmissionQueue, AdmissionRejected, admit, get_admission_stats)
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out.')
+
+        time.sleep(0.001)
+
+
+class TestAdmissionQueue(SimpleTestCase):
+
+    def start(self, target):
+        thread = threading.Thread(target=target)
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+    def test_first_come_first_served(self):
+        queue = AdmissionQueue('test', limit=1, queue_size=5, timeout=5)
+        order = []
+
+        def enroll(idx):
+            with queue.admit():
+                order.append(idx)
+
+        queue.acquire()
+
+        for idx in range(5):
+            self.start(lambda idx=idx: enroll(idx))
+            wait_until(lambda: queue.stats()['waiting'] == idx + 1)
+
+        # A newcomer cannot take the slot handed to the oldest waiter.
+        queue.release()
+
+        with queue.admit():
+            order.append('late')
+
+        self.assertEqual(order, [0, 1, 2, 3, 4, 'late'])
+        stats = queue.stats()
+        self.assertEqual(stats['max_waiting'], 5)
+        self.assertEqual(stats['admitted'], 7)
+        self.assertGreater(stats['wait_ms_max'], 0)
+
+    def test_full_queue_rejected(self):
+        queue = AdmissionQueue('test', limit=1, queue_size=0)
+        # Held for 3 seconds.
+        queue.acquire()
+        queue.release(3.0)
+        queue.acquire()
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            queue.acquire()
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.wait, 3)
+        self.assertEqual(queue.stats()['rejected'], 1)
+
+    def test_timeout(self):
+        queue = AdmissionQueue('test', limit=1, queue_size=1, timeout=0.01)
+        queue.acquire()
+
+        with self.assertRaises(AdmissionRejected):
+            queue.acquire()
+
+        stats = queue.stats()
+        self.assertEqual((stats['timed_out'], stats['waiting']), (1, 0))
+        queue.release()
+        self.assertEqual(queue.stats()['active'], 0)
+
+    def test_load(self):
+        queue = AdmissionQueue('test', limit=4, queue_size=64, timeout=5)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def client():
+            for idx in range(5):
+                with queue.admit():
+                    with lock:
+                        running.append(1)
+                        peak.append(len(running))
+                    time.sleep(0.001)
+                    with lock:
+                        running.pop()
+
+        threads = [self.start(client) for idx in range(32)]
+
+        for thread in threads:
+            thread.join()
+
+        stats = queue.stats()
+        self.assertEqual(max(peak), 4)
+        self.assertEqual(stats['admitted'], 160)
+        self.assertEqual((stats['active'], stats['waiting']), (0, 0))
+        self.assertEqual(stats['rejected'] + stats['timed_out'], 0)
+
+
+class TestAdmit(SimpleTestCase):
+
+    def test_unconfigured(self):
+        with admit('unknown'), admit('unknown'):
+            pass
+
+        self.assertNotIn('unknown', get_admission_stats())
+
+    @override_settings(ADMISSION_QUEUES={'test': {'limit': 1}})
+    def test_configured(self):
+        with admit('test'):
+            with self.assertRaises(AdmissionRejected):
+                with admit('test'):
+                    pass
+
+            self.assertEqual(get_admission_stats()['test']['active'], 1)
+
+        self.assertEqual(get_admission_stats()['test']['active'], 0)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_authentication.py
+#
+
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from ..authentication import (
+    CachedTokenAuthentication, clear_token_cache, parse_basic_credentials,
+    revoke_user)
+from .base_tests import create_role_groups
+
+UserModel = get_user_model()
+
+
+class TestCachedTokenAuthentication(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.groups = create_role_groups()
+        cls.user = UserModel.members.create_user(
+            username='student', password='testpassword')
+        cls.user.groups.set([cls.groups['Student']])
+
+    def setUp(self):
+        cache.clear()
+        clear_token_cache()
+        self.token = Token.objects.create(user=self.user)
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, key=None):
+        request = self.factory.get(
+            '/', HTTP_AUTHORIZATION=f'Token {key or self.token.key}')
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_cached_user(self):
+        self.authenticate()
+
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.username, 'student')
+            self.assertTrue(user.is_active)
+            self.assertFalse(user.is_superuser)
+            self.assertEqual(user.get_group_names(), frozenset(['Student']))
+            self.assertEqual(token.key, self.token.key)
+
+        # The other fields load on first access.
+        self.assertEqual(user.email, self.user.email)
+
+    def test_invalid_token(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate('0' * 40)
+
+    def test_deleted_token(self):
+        self.authenticate()
+        self.token.delete()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_regrouped_user(self):
+        self.authenticate()
+        self.user.groups.add(self.groups['Staff'])
+        user, token = self.authenticate()
+        self.assertEqual(user.get_group_names(),
+                         frozenset(['Student', 'Staff']))
+        self.groups['Staff'].user_set.clear()
+        user, token = self.authenticate()
+        self.assertEqual(user.get_group_names(), frozenset(['Student']))
+
+    @override_settings(TOKEN_AUTH_CACHE_TIMEOUT=0)
+    def test_expired(self):
+        self.authenticate()
+
+        with self.assertNumQueries(2):
+            self.authenticate()
+
+    @override_settings(TOKEN_AUTH_CACHE_SIZE=1)
+    def test_least_recently_used_dropped(self):
+        other = Token.objects.create(user=UserModel.members.create_user(
+            username='other', password='testpassword'))
+        self.authenticate()
+        self.authenticate(other.key)
+
+        with self.assertNumQueries(0):
+            self.authenticate(other.key)
+
+        with self.assertNumQueries(2):
+            self.authenticate()
+
+    @override_settings(TOKEN_AUTH_SHARED_CACHE='default')
+    def test_shared_cache(self):
+        self.authenticate()
+        # Another process, with an empty LRU.
+        clear_token_cache()
+
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+
+        self.assertEqual(user.pk, self.user.pk)
+        revoke_user(self.user.pk)
+        clear_token_cache()
+
+        with self.assertNumQueries(2):
+            self.authenticate()
+
+
+def basic(credentials):
+    return 'Basic ' + base64.b64encode(credentials.encode()).decode()
+
+
+class TestParseBasicCredentials(SimpleTestCase):
+
+    def test_credentials(self):
+        self.assertEqual(parse_basic_credentials(basic('student:p:w')),
+                         ('student', 'p:w'))
+        self.assertEqual(parse_basic_credentials(basic('student:')),
+                         ('student', ''))
+        # RFC 7617 parameters are ignored.
+        self.assertEqual(
+            parse_basic_credentials(basic('student:pw') + ' charset="UTF-8"'),
+            ('student', 'pw'))
+
+    def test_malformed(self):
+        for header in (None, '', 'Basic', 'Bearer abc', 'Basic !!!!',
+                       'Basic abc', basic('student'), basic(':pw'),
+                       'Basic ' + base64.b64encode(b'\xff:pw').decode(),
+                       'Basic ' + 'QUFB' * 300):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_basic_credentials(header))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_authentication_benchmark.py
+#
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from .. import generate_public_keys
+from ..authentication import CachedTokenAuthentication, clear_token_cache
+from ..roles import get_roles
+from .base_tests import best_time, create_role_groups, run_benchmarks
+
+UserModel = get_user_model()
+
+
+@run_benchmarks
+class AuthenticationBenchmark(TestCase):
+    """
+    Authentication overhead of a request: the token lookup and the group
+    names the permission checks read, with the stock token authentication
+    and with the cached one.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        common.tests.test_authentication_benchmark
+    """
+    USERS = 200
+    REQUESTS = 2000
+
+    @classmethod
+    def setUpTestData(cls):
+        student = create_role_groups()['Student']
+        # Skips hashing passwords, nobody logs in.
+        users = UserModel.objects.bulk_create(
+            UserModel(username=f'student{idx}', public_id=public_id)
+            for idx, public_id in enumerate(generate_public_keys(
+                cls.USERS, UserModel.PUBLIC_ID_SCHEME)))
+        UserModel.groups.through.objects.bulk_create(
+            UserModel.groups.through(user=user, group=student)
+            for user in users)
+        tokens = Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user=user) for user in users)
+        cls.keys = [token.key for token in tokens]
+
+    def _measure(self, name, authentication):
+        factory = APIRequestFactory()
+        headers = [f'Token {key}'
+                   for idx in range(self.REQUESTS // self.USERS)
+                   for key in self.keys]
+
+        def run():
+            for header in headers:
+                request = factory.get('/', HTTP_AUTHORIZATION=header)
+                user, token = authentication.authenticate(request)
+                get_roles(request, user)
+
+        clear_token_cache()
+        run()
+
+        with CaptureQueriesContext(connection) as ctx:
+            run()
+
+        elapsed = best_time(run)
+        print(f"{name:>6}: {elapsed * 1000 / len(headers):8.1f} us/request, "
+              f"{len(ctx.captured_queries) / len(headers):4.1f} "
+              f"queries/request")
+        return elapsed
+
+    def test_authentication_overhead(self):
+        print(f"\n{self.REQUESTS} requests from {self.USERS} users")
+        stock = self._measure('stock', TokenAuthentication())
+        cached = self._measure('cached', CachedTokenAuthentication())
+        self.assertLess(cached, stock)
@@ -3,11 +3,27 @@
 # inventory/common/tests/test_key_generator.py
 #
 
+import random
 import string
+from collections import Counter
+from unittest import mock
 
 from django.test import TestCase
 
-from ..key_generator import KeyGenerator
+from ..key_generator import KeyGenerator, SortableKeyGenerator, _byte_tables
+
+
+def seeded_urandom(seed):
+    """
+    Return an ``os.urandom`` stand-in drawing its bytes from a seeded
+    generator, so the distribution tests always see the same bytes.
+    """
+    rng = random.Random(seed)
+
+    def urandom(size):
+        return bytes(rng.getrandbits(8) for i in range(size))
+
+    return urandom
 
 
 class TestKeyGenerator(TestCase):
@@ -84,3 +100,89 @@ class TestKeyGenerator(TestCase):
 
         with self.assertRaises(ValueError) as cm:
             key0 = kg.generate(-1)
+
+    def test_invalid_domain(self):
+        kg = KeyGenerator(18)
+
+        for domain in ('', 'é', 'a' * 257):
+            with self.assertRaises(ValueError):
+                kg.generate(regen=True, domain=domain)
+
+    def test_generate_many(self):
+        kg = KeyGenerator(20)
+        keys = kg.generate_many(500)
+        self.assertEqual(len(keys), 500)
+        self.assertEqual(len(set(keys)), 500)
+        self.assertTrue(all(len(key) == 20 for key in keys))
+        keys = kg.generate_many(3, length=4, domain='ab')
+        self.assertTrue(all(len(key) == 4 and set(key) <= set('ab')
+                            for key in keys), keys)
+
+    def test_tail_bytes_deleted(self):
+        # 256 = 2 * 100 + 56, wrapping the last 56 bytes around would give
+        # the first 56 characters 3 bytes each and the others 2.
+        domain = string.printable
+        table, delete, limit = _byte_tables(domain)
+        self.assertEqual(limit, 200)
+        self.assertEqual(delete, bytes(range(200, 256)))
+        counts = Counter(bytes(range(256)).translate(table, delete))
+        self.assertEqual(sorted(counts), sorted(domain.encode('ascii')))
+        self.assertEqual(set(counts.values()), {2})
+
+    def test_uniform_distribution(self):
+        # Domains not dividing 256, printable is the one where wrapping
+        # bytes around would favour the first characters the most.
+        for domain in (string.digits, KeyGenerator._KEY_DOMAIN,
+                       string.printable):
+            samples = len(domain) * 2000
+
+            with mock.patch('os.urandom', seeded_urandom(2021)):
+                chars = ''.join(KeyGenerator(samples).generate_many(
+                    1, domain=domain))
+
+            self.assertLess(chi_square(chars, domain), CHI_SQUARE_LIMIT,
+                            domain)
+
+        # The test tells wrapped bytes apart.
+        domain = string.printable
+        random_bytes = seeded_urandom(2021)(len(domain) * 2000)
+        chars = ''.join(domain[byte % len(domain)] for byte in random_bytes)
+        self.assertGreater(chi_square(chars, domain), CHI_SQUARE_LIMIT)
+
+
+class TestSortableKeyGenerator(TestCase):
+
+    def test_format(self):
+        key = SortableKeyGenerator().generate()
+        self.assertEqual(len(key), SortableKeyGenerator.LENGTH)
+        # Must fit the [-\w]+ public_id URL patterns.
+        self.assertRegex(key, r'^[-\w]+$')
+        self.assertTrue(set(key) <= set(SortableKeyGenerator.DOMAIN))
+
+    def test_keys_sort_in_creation_order(self):
+        gen = SortableKeyGenerator()
+        keys = [gen.generate() for i in range(200)]
+        keys += gen.generate_many(500)
+        keys.append(gen.generate())
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+
+
+# Above the 0.999999 quantile (about 181) of a chi-square with 99
+# degrees of freedom, the largest domain tested.
+CHI_SQUARE_LIMIT = 200
+
+
+def chi_square(chars, domain):
+    """
+    Return the chi-square statistic of the character counts of *chars*
+    against a uniform distribution over *domain*.
+    """
+    expected = len(chars) / len(domain)
+    counts = {char: 0 for char in domain}
+
+    for char in chars:
+        counts[char] += 1
+
+    return sum((count - expected) ** 2 / expected
+               for count in counts.values())
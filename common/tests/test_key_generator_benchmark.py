@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_key_generator_benchmark.py
+#
+
+import random
+
+from django.test import SimpleTestCase
+
+from ..key_generator import KeyGenerator
+from .base_tests import best_time, run_benchmarks
+from .test_key_generator import CHI_SQUARE_LIMIT, chi_square
+
+
+def legacy_generate(length, domain=KeyGenerator._KEY_DOMAIN):
+    """
+    The previous implementation, one SystemRandom per character.
+    """
+    return ''.join(random.SystemRandom().choice(domain)
+                   for i in range(length))
+
+
+@run_benchmarks
+class KeyGeneratorBenchmark(SimpleTestCase):
+    """
+    Throughput of public key generation.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        common.tests.test_key_generator_benchmark
+    """
+    COUNT = 20000
+    LENGTH = 20
+
+    def _report(self, name, func):
+        ms = best_time(func, repeat=3)
+        rate = self.COUNT / ms * 1000
+        print(f"{name:>14}: {rate:12,.0f} keys/s")
+        return rate
+
+    def test_throughput(self):
+        print()
+        legacy = self._report('legacy', lambda: [
+            legacy_generate(self.LENGTH) for i in range(self.COUNT)])
+        single = self._report('generate', lambda: [
+            KeyGenerator(self.LENGTH).generate() for i in range(self.COUNT)])
+        batch = self._report('generate_many', lambda: KeyGenerator(
+            self.LENGTH).generate_many(self.COUNT))
+        self.assertGreater(single, legacy)
+        self.assertGreater(batch, single)
+
+    def test_distribution(self):
+        keys = KeyGenerator(self.LENGTH).generate_many(self.COUNT)
+        chars = ''.join(keys)
+        self.assertEqual(len(set(keys)), self.COUNT)
+        self.assertLess(chi_square(chars, KeyGenerator._KEY_DOMAIN),
+                        CHI_SQUARE_LIMIT)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_loghandlers.py
+#
+
+import logging
+import os
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+
+from ..loghandlers import (
+    OVERFLOW_DROP_NEW, OVERFLOW_DROP_OLD, AsyncRotatingFileHandler)
+
+
+def make_record(message):
+    return logging.makeLogRecord({'msg': message, 'levelno': logging.INFO})
+
+
+class TestAsyncRotatingFileHandler(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, 'api.log')
+
+    def read(self, filename=None):
+        with open(filename or self.filename) as stream:
+            return stream.read()
+
+    def test_rotates_in_listener_thread(self):
+        handler = AsyncRotatingFileHandler(
+            self.filename, maxBytes=20, backupCount=2)
+        rotated_by = []
+        do_rollover = handler.target.doRollover
+
+        def record_rollover():
+            rotated_by.append(threading.current_thread())
+            do_rollover()
+
+        handler.target.doRollover = record_rollover
+
+        for idx in range(6):
+            handler.handle(make_record(f'record {idx}'))
+
+        handler.close()
+        self.assertTrue(rotated_by)
+        self.assertNotIn(threading.current_thread(), rotated_by)
+        self.assertEqual(self.read(), 'record 4\nrecord 5\n')
+        self.assertEqual(self.read(f'{self.filename}.1'),
+                         'record 2\nrecord 3\n')
+
+    def test_special_file_not_rotated(self):
+        handler = AsyncRotatingFileHandler(
+            os.devnull, maxBytes=20, backupCount=2)
+        rotated = []
+        handler.target.doRollover = lambda: rotated.append(True)
+
+        for idx in range(6):
+            handler.handle(make_record(f'record {idx}'))
+
+        handler.close()
+        self.assertEqual(rotated, [])
+
+    def test_flush_waits_for_queued_records(self):
+        handler = AsyncRotatingFileHandler(self.filename, batch_size=3)
+        self.addCleanup(handler.close)
+
+        for idx in range(10):
+            handler.handle(make_record(f'record {idx}'))
+
+        handler.flush()
+        self.assertEqual(self.read().splitlines(),
+                         [f'record {idx}' for idx in range(10)])
+
+    def test_drop_new_overflow(self):
+        handler = AsyncRotatingFileHandler(
+            self.filename, maxsize=2, overflow=OVERFLOW_DROP_NEW)
+
+        # Queued without starting the listener, so the queue fills up.
+        for idx in range(5):
+            handler.enqueue(make_record(f'record {idx}'))
+
+        self.assertEqual(handler.dropped, 3)
+        self.assertEqual([handler.queue.get_nowait().msg for idx in range(2)],
+                         ['record 0', 'record 1'])
+        handler.close()
+
+    def test_drop_old_overflow(self):
+        handler = AsyncRotatingFileHandler(
+            self.filename, maxsize=2, overflow=OVERFLOW_DROP_OLD)
+
+        for idx in range(5):
+            handler.enqueue(make_record(f'record {idx}'))
+
+        self.assertEqual(handler.dropped, 3)
+        self.assertEqual([handler.queue.get_nowait().msg for idx in range(2)],
+                         ['record 3', 'record 4'])
+        handler.close()
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            AsyncRotatingFileHandler(self.filename, overflow='ignore')
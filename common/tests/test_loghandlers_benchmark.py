@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_loghandlers_benchmark.py
+#
+
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from ..loghandlers import AsyncRotatingFileHandler, DeferredRotatingFileHandler
+from .base_tests import run_benchmarks
+
+
+@run_benchmarks
+class LogHandlerBenchmark(SimpleTestCase):
+    """
+    Time spent in the logging call by request threads, writing to a file
+    rotated every few thousand records, synchronously and through the
+    background thread. The threads pause between records as requests wait
+    on the database.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        common.tests.test_loghandlers_benchmark
+    """
+    THREADS = 8
+    RECORDS = 2000
+    # Time a request spends waiting on the database between two records.
+    PAUSE = 0.0002
+    MAX_BYTES = 1000000
+    FORMAT = ('%(asctime)s %(levelname)s %(name)s %(funcName)s '
+              '[line:%(lineno)d] %(message)s')
+
+    def _measure(self, name, handler):
+        handler.setFormatter(logging.Formatter(self.FORMAT))
+        logger = logging.getLogger(f'benchmark.{name}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        latencies = [[] for idx in range(self.THREADS)]
+        message = 'GET /api/courselog/ user=%s status=200 ' + 'x' * 200
+
+        def log(timings):
+            for idx in range(self.RECORDS):
+                start = time.perf_counter()
+                logger.info(message, idx)
+                timings.append(time.perf_counter() - start)
+                time.sleep(self.PAUSE)
+
+        threads = [threading.Thread(target=log, args=(timings,))
+                   for timings in latencies]
+        start = time.perf_counter()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+        handler.close()
+        logger.removeHandler(handler)
+        timings = sorted(t * 1e6 for thread in latencies for t in thread)
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"{name:>6}: mean {statistics.fmean(timings):8.1f} us, "
+              f"p99 {p99:8.1f} us, max {timings[-1] / 1000:8.1f} ms, "
+              f"{len(timings) / elapsed:10,.0f} records/s")
+
+    def test_request_thread_latency(self):
+        print(f"\n{self.THREADS} threads x {self.RECORDS} records, "
+              f"rotating every {self.MAX_BYTES} bytes")
+
+        with tempfile.TemporaryDirectory() as directory:
+            self._measure('sync', DeferredRotatingFileHandler(
+                os.path.join(directory, 'sync.log'),
+                maxBytes=self.MAX_BYTES, backupCount=5))
+            self._measure('async', AsyncRotatingFileHandler(
+                os.path.join(directory, 'async.log'),
+                maxBytes=self.MAX_BYTES, backupCount=5))
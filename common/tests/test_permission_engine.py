@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_permission_engine.py
+#
+
+from django.test import SimpleTestCase
+
+from rest_condition import And, Not, Or
+from rest_framework import permissions
+from rest_framework.test import APIRequestFactory
+
+from ..permission_engine import FLAG_COST, compile_permissions
+
+
+class Recorder:
+    calls = []
+
+
+def make_permission(name, result, cost=None):
+    def has_permission(self, request, view):
+        Recorder.calls.append(name)
+        return result
+
+    attrs = {'has_permission': has_permission}
+
+    if cost is not None:
+        attrs['permission_cost'] = cost
+
+    return type(name, (permissions.BasePermission,), attrs)
+
+
+Cheap = make_permission('Cheap', True, FLAG_COST)
+CheapNo = make_permission('CheapNo', False, FLAG_COST)
+Role = make_permission('Role', True)
+RoleNo = make_permission('RoleNo', False)
+
+
+class TestPermissionEngine(SimpleTestCase):
+
+    def setUp(self):
+        Recorder.calls = []
+        self.factory = APIRequestFactory()
+
+    def check(self, *permission_classes, request=None):
+        request = request or self.factory.get('/')
+        return compile_permissions(permission_classes).has_permission(
+            request, None)
+
+    def test_cheap_checks_run_first(self):
+        self.assertTrue(self.check(Or(Role, Cheap)))
+        self.assertEqual(Recorder.calls, ['Cheap'])
+
+        Recorder.calls = []
+        self.assertFalse(self.check(And(RoleNo, Role, CheapNo)))
+        self.assertEqual(Recorder.calls, ['CheapNo'])
+
+    def test_results_are_shared_within_a_request(self):
+        request = self.factory.get('/')
+        tree = (And(Or(CheapNo, Role), Or(RoleNo, Role)),)
+        self.assertTrue(self.check(*tree, request=request))
+        self.assertTrue(self.check(*tree, request=request))
+        self.assertEqual(Recorder.calls, ['CheapNo', 'Role', 'RoleNo'])
+
+    def test_same_results_as_rest_condition(self):
+        trees = (
+            (And(Cheap, Or(RoleNo, Not(CheapNo))),),
+            (Or(And(Cheap, RoleNo), Not(Or(Role, CheapNo))),),
+            (Cheap, Not(And(Role, Cheap))),
+            (Or(),),
+            (),
+            )
+
+        for tree in trees:
+            with self.subTest(tree=tree):
+                request = self.factory.get('/')
+                expected = all(
+                    (perm() if isinstance(perm, type) else perm)
+                    .has_permission(request, None) for perm in tree)
+                self.assertEqual(self.check(*tree), expected)
+
+    def test_compiled_once_per_tree(self):
+        tree = (And(Cheap, Role),)
+        self.assertIs(compile_permissions(tree), compile_permissions(tree))
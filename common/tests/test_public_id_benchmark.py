@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_public_id_benchmark.py
+#
+
+import time
+
+from django.db import connection
+from django.test import TestCase
+
+from .. import RANDOM_KEYS, SORTABLE_KEYS, generate_public_keys
+from ..key_generator import KeyGenerator, SortableKeyGenerator
+from .base_tests import run_benchmarks
+
+
+def index_size(cursor, table, column):
+    """
+    Return the size in bytes of the unique index on *column*.
+    """
+    if connection.vendor == 'postgresql':
+        cursor.execute(
+            "SELECT pg_relation_size(i.indexrelid) FROM pg_index i "
+            "JOIN pg_attribute a ON a.attrelid = i.indrelid "
+            "AND a.attnum = i.indkey[0] "
+            "WHERE i.indrelid = %s::regclass AND i.indisunique "
+            "AND i.indnatts = 1 AND a.attname = %s", [table, column])
+        row = cursor.fetchone()
+        return row and row[0]
+
+    if connection.vendor == 'sqlite':
+        cursor.execute(
+            "SELECT SUM(s.pgsize) FROM pragma_index_list(%s) l "
+            "JOIN pragma_index_info(l.name) i "
+            "JOIN dbstat s ON s.name = l.name "
+            "WHERE l.[unique] AND i.name = %s", [table, column])
+        return cursor.fetchone()[0]
+
+    return None
+
+
+@run_benchmarks
+class PublicIdInsertBenchmark(TestCase):
+    """
+    Insert throughput and index size of random and time ordered keys in a
+    table with a unique index, as public_id columns are.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        common.tests.test_public_id_benchmark
+    """
+    ROWS = 200000
+    BATCH = 1000
+    TABLE = 'benchmark_public_id'
+
+    def _insert(self, name, keys):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {self.TABLE} "
+                f"(id integer PRIMARY KEY, public_id varchar(30) UNIQUE)")
+            start = time.perf_counter()
+
+            for idx in range(0, self.ROWS, self.BATCH):
+                cursor.executemany(
+                    f"INSERT INTO {self.TABLE} (id, public_id) "
+                    f"VALUES (%s, %s)",
+                    [(pk, key) for pk, key in enumerate(
+                        keys[idx:idx + self.BATCH], idx)])
+
+            elapsed = time.perf_counter() - start
+            size = index_size(cursor, self.TABLE, 'public_id')
+            cursor.execute(f"DROP TABLE {self.TABLE}")
+
+        rate = self.ROWS / elapsed
+        size_text = f"{size / 2**20:7.2f} MiB" if size else "n/a"
+        print(f"{name:>11}: {rate:10,.0f} rows/s, index {size_text}")
+        return rate, size
+
+    def test_insert(self):
+        print(f"\n{self.ROWS} rows on {connection.vendor}")
+        self._insert(RANDOM_KEYS, generate_public_keys(self.ROWS))
+        # Random keys as wide as the sortable ones, to compare like for like.
+        wide = KeyGenerator(SortableKeyGenerator.LENGTH).generate_many(
+            self.ROWS)
+        self._insert('random (26)', wide)
+        self._insert(
+            SORTABLE_KEYS, generate_public_keys(self.ROWS, SORTABLE_KEYS))
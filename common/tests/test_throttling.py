@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_throttling.py
+#
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from rest_framework.test import APIRequestFactory
+
+from ..throttling import SlidingWindowThrottle
+
+
+class Clock:
+    now = 0.0
+
+
+class TwoPerMinute(SlidingWindowThrottle):
+    scope = 'test'
+    rate = '2/min'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format.format(scope=self.scope, ident='client')
+
+    def timer(self):
+        return Clock.now
+
+
+class TestSlidingWindowThrottle(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        Clock.now = 600.0
+        self.request = APIRequestFactory().get('/')
+
+    def allow(self):
+        throttle = TwoPerMinute()
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limits_window(self):
+        self.assertTrue(self.allow()[0])
+        self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        # The full window slides out by the end of the next one.
+        self.assertEqual(throttle.wait(), 60)
+
+    def test_previous_window_slides_out(self):
+        self.allow()
+        self.allow()
+        Clock.now += 60
+        # Both requests of the previous window still count.
+        self.assertFalse(self.allow()[0])
+        Clock.now += 15
+        # Three quarters of them do.
+        self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        # Until half of the previous window is out.
+        self.assertEqual(throttle.wait(), 15)
+
+    def test_no_key_allowed(self):
+        throttle = TwoPerMinute()
+        throttle.get_cache_key = lambda request, view: None
+
+        for idx in range(5):
+            self.assertTrue(throttle.allow_request(self.request, None))
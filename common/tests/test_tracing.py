@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tests/test_tracing.py
+#
+
+import logging
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from ..loghandlers import QueueingHandler
+from ..tracing import TRACE_LOGGER, Tracer, get_counters, reset_counters
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestTracer(SimpleTestCase):
+
+    def setUp(self):
+        self.tracer = Tracer('tests')
+        reset_counters()
+
+    def test_disabled_tracer_emits_nothing_but_counts(self):
+        logger = logging.getLogger(TRACE_LOGGER)
+        level, handler = logger.level, RecordingHandler()
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        self.addCleanup(logger.setLevel, level)
+        self.addCleanup(logger.removeHandler, handler)
+
+        self.assertFalse(self.tracer.enabled)
+        self.tracer.event('event', value=1)
+
+        with self.tracer.span('span') as span:
+            span.set(value=2)
+
+        self.tracer.count('hits')
+        self.assertEqual(handler.records, [])
+        # Counters do not depend on the logging configuration.
+        self.assertEqual(get_counters(), {'tests.hits': 1})
+
+    def test_events_and_spans(self):
+        with self.assertLogs(TRACE_LOGGER, logging.DEBUG) as logs:
+            self.tracer.event('permission', name='IsStaff', result=True)
+
+            with self.assertRaises(KeyError):
+                with self.tracer.span('save', model='Course'):
+                    raise KeyError
+
+        event, span = logs.records
+        self.assertEqual(event.getMessage(),
+                         "permission name='IsStaff' result=True")
+        self.assertEqual(event.trace_fields,
+                         {'name': 'IsStaff', 'result': True})
+        self.assertEqual(span.trace_name, 'save')
+        self.assertEqual(span.trace_fields['error'], 'KeyError')
+        self.assertIn('duration_ms', span.trace_fields)
+
+    @override_settings(TRACE_SAMPLE_RATE=0)
+    def test_sampling_skips_events_not_counters(self):
+        with self.assertLogs(TRACE_LOGGER, logging.DEBUG) as logs:
+            self.tracer.event('event')
+
+            with self.tracer.span('span'):
+                pass
+
+            self.tracer.count('hits', 2)
+            # assertLogs fails on a block logging nothing.
+            logging.getLogger(TRACE_LOGGER).info('done')
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(get_counters(), {'tests.hits': 2})
+
+
+class TestQueueingHandler(SimpleTestCase):
+
+    def test_records_reach_target(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'trace.log')
+            handler = QueueingHandler({
+                'class': 'common.loghandlers.DeferredRotatingFileHandler',
+                'filename': filename,
+                })
+            handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+            logger = logging.getLogger('tests.queueing')
+            logger.addHandler(handler)
+            self.addCleanup(logger.removeHandler, handler)
+
+            logger.error('first')
+            logger.error('second')
+            handler.close()
+
+            with open(filename) as stream:
+                self.assertEqual(stream.read(), 'ERROR first\nERROR second\n')
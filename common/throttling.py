@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/throttling.py
+#
+
+"""
+Sliding window throttles kept in Django's cache.
+"""
+
+from rest_framework.throttling import SimpleRateThrottle
+
+__all__ = (
+    'SlidingWindowThrottle',
+    )
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    A ``SimpleRateThrottle`` counting requests in two cache counters, the
+    current and the previous fixed window, instead of keeping a timestamp
+    per request. The previous window counts for the part of it still
+    inside the sliding window, so a check costs one ``get_many`` and an
+    allowed request one ``incr``, whatever the rate.
+
+    Subclasses set ``scope`` and return the identity to count from
+    ``get_cache_key``, or None to let the request through.
+    """
+    cache_format = 'throttle:{scope}:{ident}'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window, offset = divmod(now, self.duration)
+        self.elapsed = offset / self.duration
+        current_key = f'{self.key}:{int(window)}'
+        previous_key = f'{self.key}:{int(window) - 1}'
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+
+        if self.previous * (1 - self.elapsed) + self.current >= (
+                self.num_requests):
+            return False
+
+        # Kept for the window and the next one, which still reads it.
+        if not self.cache.add(current_key, 1, 2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.set(current_key, 1, 2 * self.duration)
+
+        return True
+
+    def wait(self):
+        """
+        Return the seconds until the estimate drops below the rate.
+        """
+        if self.current < self.num_requests and self.previous:
+            # The previous window slides out.
+            needed = 1 - (self.num_requests - self.current) / self.previous
+        else:
+            # Full on its own, it slides out in the next window.
+            needed = 2 - self.num_requests / max(self.current, 1)
+
+        return max(needed - self.elapsed, 0) * self.duration
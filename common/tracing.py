@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/common/tracing.py
+#
+
+"""
+Structured tracing: events, spans and counters sent through the ``trace``
+logger.
+
+Events and spans are not built, timed or formatted unless the ``trace``
+logger is enabled for DEBUG, so the calls can stay on hot paths, and they
+are sampled with the ``TRACE_SAMPLE_RATE`` setting. Counters are kept in
+memory whatever the logging configuration and are always exact.
+"""
+
+import collections
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+__all__ = (
+    'TRACE_LOGGER',
+    'Tracer',
+    'get_counters',
+    'reset_counters',
+    )
+
+TRACE_LOGGER = 'trace'
+
+_counters = collections.Counter()
+_counters_lock = threading.Lock()
+
+
+def get_counters():
+    """
+    Return a copy of the counters of this process.
+    """
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reset_counters():
+    with _counters_lock:
+        _counters.clear()
+
+
+def _format(name, fields):
+    return ' '.join([name, *(f'{key}={value!r}'
+                             for key, value in fields.items())])
+
+
+class _NullSpan:
+    """
+    The span handed out while tracing is off or the span is not sampled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+
+    def __init__(self, tracer, name, fields):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fields['duration_ms'] = round(
+            (time.perf_counter() - self.start) * 1000, 3)
+
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+
+        self.tracer._emit(self.name, self.fields)
+        return False
+
+    def set(self, **fields):
+        """
+        Add fields to the event emitted when the span ends.
+        """
+        self.fields.update(fields)
+
+
+class Tracer:
+    """
+    Emit the trace events of a module through ``trace.<name>``.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.logger = logging.getLogger(f'{TRACE_LOGGER}.{name}')
+
+    @property
+    def enabled(self):
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def _sampled(self):
+        rate = getattr(settings, 'TRACE_SAMPLE_RATE', 1.0)
+        return rate >= 1 or random.random() < rate
+
+    def _emit(self, name, fields):
+        self.logger.debug(_format(name, fields), extra={
+            'trace_name': name, 'trace_fields': fields})
+
+    def event(self, name, /, **fields):
+        """
+        Emit the event *name* with *fields*.
+        """
+        if self.logger.isEnabledFor(logging.DEBUG) and self._sampled():
+            self._emit(name, fields)
+
+    def span(self, name, /, **fields):
+        """
+        Return a context manager emitting *name* with its duration, and the
+        exception class when the block raises, as the block exits.
+        """
+        if self.logger.isEnabledFor(logging.DEBUG) and self._sampled():
+            return _Span(self, name, fields)
+
+        return _NULL_SPAN
+
+    def count(self, name, /, value=1):
+        """
+        Add *value* to the counter *name* of this process, whether the
+        tracer is enabled or not.
+        """
+        with _counters_lock:
+            _counters[f'{self.name}.{name}'] += value
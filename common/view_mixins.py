@@ -7,24 +7,201 @@
 Global view mixins
 """
 
+import hashlib
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
+from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 
+from .model_versions import (
+    get_model_modified, get_model_version, get_object_versions)
+from .permission_engine import compile_permissions, get_permission_db_hits
+
+PERMISSION_DB_HITS_HEADER = 'X-Permission-DB-Hits'
+
+
+@contextmanager
+def trap_django_validation_error():
+    """
+    Re-raise a Django ``ValidationError`` as a DRF ``ValidationError``.
+    """
+    try:
+        yield
+    except DjangoValidationError as detail:
+        raise ValidationError(detail.message_dict)
+
 
 class TrapDjangoValidationErrorCreateMixin:
 
     def perform_create(self, serializer):
-        try:
+        with trap_django_validation_error():
             instance = serializer.save()
-        except DjangoValidationError as detail:
-            raise ValidationError(detail.message_dict)
 
 
 class TrapDjangoValidationErrorUpdateMixin:
 
     def perform_update(self, serializer):
-        try:
+        with trap_django_validation_error():
             instance = serializer.save()
-        except DjangoValidationError as detail:
-            raise ValidationError(detail.message_dict)
+
+
+class RelatedQuerySetMixin:
+    """
+    Apply the relations a view declares to its queryset, so serializers
+    read them from memory instead of querying once per row.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(
+                *self.prefetch_related_fields
+            )
+
+        return queryset
+
+
+class CompiledPermissionsMixin:
+    """
+    Check ``permission_classes`` as one compiled predicate, sharing the
+    results of the permissions across the checks of a request. With DEBUG
+    on, responses report the queries the checks made.
+    """
+
+    def get_permissions(self):
+        return [compile_permissions(tuple(self.permission_classes))]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+
+        if settings.DEBUG:
+            response[PERMISSION_DB_HITS_HEADER] = str(
+                get_permission_db_hits(request))
+
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET requests with a strong ETag made from the versions of the
+    ``condition_models`` a representation is read from, and the time they
+    last changed as Last-Modified. A request whose copy is current gets a
+    304 before any query or serializer runs.
+    """
+    condition_models = ()
+
+    def get_etag(self, request):
+        versions = ':'.join(str(get_model_version(model))
+                            for model in self.condition_models)
+        key = (f'{request.get_full_path()}|{request.accepted_renderer.format}'
+               f'|{versions}')
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def get_last_modified(self):
+        return int(max(get_model_modified(model)
+                       for model in self.condition_models))
+
+    def get(self, request, *args, **kwargs):
+        etag = quote_etag(self.get_etag(request))
+        last_modified = self.get_last_modified()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+
+class CachedRepresentationMixin:
+    """
+    Keep the serialized representation of every object in the cache, under
+    the object's version (see ``common.model_versions``), for
+    ``REPRESENTATION_CACHE_TIMEOUT`` seconds. Reads load the objects without
+    the ``prefetch_related_fields`` and only prefetch and serialize the
+    objects missing from the cache, in one batch. Whatever changes a
+    representation must bump the object's version.
+
+    Only for serializers whose output does not depend on the request.
+    Goes before ``RelatedQuerySetMixin``.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.request.method in ('GET', 'HEAD'):
+            queryset = queryset.prefetch_related(None)
+
+        return queryset
+
+    def get_representation_key(self, obj, version):
+        serializer_class = self.get_serializer_class()
+        return (f'representation:{serializer_class.__module__}.'
+                f'{serializer_class.__qualname__}:{obj.pk}:{version}')
+
+    def get_representations(self, objs):
+        """
+        Return the representations of *objs*, in order.
+        """
+        if not objs:
+            return []
+
+        versions = get_object_versions(type(objs[0]),
+                                       [obj.pk for obj in objs])
+        keys = [self.get_representation_key(obj, versions[obj.pk])
+                for obj in objs]
+        found = cache.get_many(keys)
+        misses = [(obj, key) for obj, key in zip(objs, keys)
+                  if key not in found]
+
+        if misses:
+            missing = [obj for obj, key in misses]
+            prefetch_related_objects(
+                missing, *getattr(self, 'prefetch_related_fields', ()))
+            data = self.get_serializer(missing, many=True).data
+            fresh = {key: dict(item)
+                     for (obj, key), item in zip(misses, data)}
+            cache.set_many(fresh, getattr(
+                settings, 'REPRESENTATION_CACHE_TIMEOUT', 3600))
+            found.update(fresh)
+
+        return [found[key] for key in keys]
+
+    async def aget_representations(self, objs):
+        """
+        The async ``get_representations``, run in one thread: the async
+        cache methods of Django 4.2 take a thread per key.
+        """
+        return await sync_to_async(self.get_representations)(objs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+
+        if page is not None:
+            return self.get_paginated_response(
+                self.get_representations(list(page)))
+
+        return Response(self.get_representations(list(queryset)))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_representations([self.get_object()])[0])
@@ -8,6 +8,7 @@ Admin.
 from django.contrib import admin
 from course_management.models import (
     Course,
+    Prerequesit,
     Term,
     CourseSection,
     CourseLog,
@@ -15,9 +16,16 @@ from course_management.models import (
 )
 
 
+class PrerequesitInline(admin.TabularInline):
+    model = Prerequesit
+    fk_name = "from_course"
+    extra = 1
+
+
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     list_display = ("name", "pk", "get_prerequesits")
+    inlines = (PrerequesitInline,)
 
 
 @admin.register(Term)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CourseManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'course_management'
+
+    def ready(self):
+        from course_management import signals  # noqa: F401
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/async_views.py
+#
+"""
+Async variants of the busiest read endpoints, served on the event loop
+under ASGI, see common.async_views. The sync views in views.py answer the
+same reads and every write.
+"""
+
+from rest_framework.permissions import IsAuthenticated
+from rest_condition import And, Or
+
+from common.async_views import AsyncReadView
+from common.permissions import (
+    IsAdminSuperUser,
+    IsAdministrator,
+    IsReadOnly,
+    IsStaff,
+    IsStudent,
+    IsUserActive,
+)
+from common.view_mixins import CachedRepresentationMixin
+
+from course_management import models, serializers
+from course_management.views import COURSE_PREFETCH, TERM_PREFETCH
+
+CATALOGUE_PERMISSIONS = (
+    And(
+        IsUserActive,
+        IsAuthenticated,
+        Or(IsAdminSuperUser, IsAdministrator, IsStaff, IsReadOnly),
+    ),
+)
+
+
+class AsyncCourseList(CachedRepresentationMixin, AsyncReadView):
+    queryset = models.Course.objects.all()
+    serializer_class = serializers.CourseSerializer
+    condition_models = (models.Course, models.CourseSection)
+    prefetch_related_fields = COURSE_PREFETCH
+    permission_classes = CATALOGUE_PERMISSIONS
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        name = self.request.GET.get("name")
+        if name is not None:
+            queryset = queryset.filter(name=name)
+
+        prerequesits_string = self.request.GET.get("prerequesits")
+        if prerequesits_string is not None:
+            match = self.request.GET.get("prerequesits_match", "all")
+            queryset = queryset.with_prerequesits(
+                prerequesits_string.split(sep=","), match_all=match != "any"
+            )
+        return queryset
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(self.get_queryset())
+
+
+async_course_list = AsyncCourseList.as_view()
+
+
+class AsyncCourseDetail(CachedRepresentationMixin, AsyncReadView):
+    queryset = models.Course.objects.all()
+    serializer_class = serializers.CourseSerializer
+    condition_models = (models.Course, models.CourseSection)
+    prefetch_related_fields = COURSE_PREFETCH
+    permission_classes = CATALOGUE_PERMISSIONS
+    lookup_field = "public_id"
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve()
+
+
+async_course_detail = AsyncCourseDetail.as_view()
+
+
+class AsyncTermList(CachedRepresentationMixin, AsyncReadView):
+    queryset = models.Term.objects.all()
+    serializer_class = serializers.TermSerializer
+    condition_models = (models.Term, models.CourseSection, models.Course)
+    prefetch_related_fields = TERM_PREFETCH
+    permission_classes = CATALOGUE_PERMISSIONS
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(self.get_queryset())
+
+
+async_term_list = AsyncTermList.as_view()
+
+
+class AsyncCourseSectionList(AsyncReadView):
+    queryset = models.CourseSection.objects.all()
+    serializer_class = serializers.CourseSectionSerializer
+    condition_models = (models.CourseSection,)
+    permission_classes = CATALOGUE_PERMISSIONS
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        instructor = self.request.GET.get("instructor")
+        term = self.request.GET.get("term")
+        if instructor is not None:
+            if term is not None:
+                queryset = queryset.filter(instructor=instructor, term=term)
+            else:
+                queryset = queryset.filter(instructor=instructor)
+        return queryset
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(self.get_queryset())
+
+
+async_coursesection_list = AsyncCourseSectionList.as_view()
+
+
+class AsyncMyCourseLogList(AsyncReadView):
+    """
+    The course logs of the requesting student.
+    """
+
+    queryset = models.CourseLog.objects.order_by("id")
+    serializer_class = serializers.CourseLogSerializer
+    permission_classes = (And(IsUserActive, IsAuthenticated, IsStudent),)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(student=self.request.user.pk)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(self.get_queryset())
+
+
+async_my_courselog_list = AsyncMyCourseLogList.as_view()
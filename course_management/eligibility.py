@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/eligibility.py
+#
+
+"""
+Enrollment eligibility checks.
+"""
+
+from django.utils.translation import gettext_lazy as _
+
+from course_management.models import CourseLog, CourseSection, Prerequesit
+
+
+class EnrollmentEligibility:
+    """
+    Decide which of the requested sections a student may enroll in.
+
+    Everything needed is loaded in three queries whatever the number of
+    requested sections: the sections with their courses, the student's
+    course logs and the prerequesits of the requested courses. The
+    sections are then checked in order, each accepted section counting
+    against the credit limit and the timetable of the following ones.
+
+    A timetable is the OR of the schedule masks of a term's sections, a
+    clash is one AND whatever the number of sections taken.
+    """
+
+    MAX_CREDITS = 18
+
+    _MESSAGES = {
+        "not_found": _("This section does not exist."),
+        "duplicate": _("This course was requested more than once."),
+        "already_enrolled": _("You already take this course this term."),
+        "capacity": _("This section is filled."),
+        "prerequesits": _("You have not passed: {}."),
+        "credit_limit": _(
+            "You may not take more than {} credits each term. "
+            "You would have {} credits."
+        ),
+        "schedule_clash": _("This section clashes with {}."),
+    }
+
+    def __init__(self, student, section_ids):
+        self.student = student
+        self.section_ids = [getattr(pk, "pk", pk) for pk in section_ids]
+
+    def check(self):
+        """
+        Return one result per requested section, in request order, with
+        the reasons of every rejection keyed by code.
+        """
+        sections = CourseSection.objects.select_related("course").in_bulk(
+            self.section_ids
+        )
+        passed, term_credits, term_courses, term_masks, term_sections = (
+            self._load_logs()
+        )
+        required = self._load_prerequesits(
+            {section.course_id for section in sections.values()}
+        )
+        requested = set()
+        results = []
+
+        for pk in self.section_ids:
+            section = sections.get(pk)
+            reasons = {}
+
+            if section is None:
+                reasons["not_found"] = self._MESSAGES["not_found"]
+                results.append(self._result(pk, reasons))
+                continue
+
+            term = section.term_id
+            course = section.course
+            mask = section.schedule_mask
+
+            if (term, course.pk) in requested:
+                reasons["duplicate"] = self._MESSAGES["duplicate"]
+            elif course.pk in term_courses.get(term, ()):
+                reasons["already_enrolled"] = self._MESSAGES[
+                    "already_enrolled"
+                ]
+
+            if section.filled_capacity >= section.total_capacity:
+                reasons["capacity"] = self._MESSAGES["capacity"]
+
+            missing = [
+                name
+                for prerequesit, name in required.get(course.pk, ())
+                if prerequesit not in passed
+            ]
+
+            if missing:
+                reasons["prerequesits"] = self._MESSAGES[
+                    "prerequesits"
+                ].format(", ".join(sorted(missing)))
+
+            credits = term_credits.get(term, 0) + course.credit
+
+            if credits > self.MAX_CREDITS:
+                reasons["credit_limit"] = self._MESSAGES[
+                    "credit_limit"
+                ].format(self.MAX_CREDITS, credits)
+
+            if mask & term_masks.get(term, 0):
+                clashes = sorted(
+                    {
+                        name
+                        for booked, name in term_sections[term]
+                        if booked & mask
+                    }
+                )
+                reasons["schedule_clash"] = self._MESSAGES[
+                    "schedule_clash"
+                ].format(", ".join(clashes))
+
+            if not reasons:
+                requested.add((term, course.pk))
+                term_credits[term] = credits
+                term_courses.setdefault(term, set()).add(course.pk)
+                term_masks[term] = term_masks.get(term, 0) | mask
+                term_sections.setdefault(term, []).append((mask, course.name))
+
+            results.append(self._result(pk, reasons))
+
+        return results
+
+    def _load_logs(self):
+        passed = set()
+        term_credits = {}
+        term_courses = {}
+        term_masks = {}
+        term_sections = {}
+        logs = CourseLog.objects.filter(student=self.student).values_list(
+            "section__term",
+            "section__course",
+            "section__course__name",
+            "section__course__credit",
+            "section__schedule_mask",
+            "final_grade",
+            "status",
+        )
+
+        for term, course, name, credit, mask, grade, status in logs:
+            if status == CourseLog.APPROVED and (
+                grade is not None and grade >= CourseLog.PASSING_GRADE
+            ):
+                passed.add(course)
+
+            term_credits[term] = term_credits.get(term, 0) + credit
+            term_courses.setdefault(term, set()).add(course)
+            term_masks[term] = term_masks.get(term, 0) | mask
+            term_sections.setdefault(term, []).append((mask, name))
+
+        return passed, term_credits, term_courses, term_masks, term_sections
+
+    def _load_prerequesits(self, course_pks):
+        required = {}
+        links = Prerequesit.objects.filter(
+            from_course__in=course_pks
+        ).values_list("from_course", "to_course", "to_course__name")
+
+        for course, prerequesit, name in links:
+            required.setdefault(course, []).append((prerequesit, name))
+
+        return required
+
+    @staticmethod
+    def _result(pk, reasons):
+        return {"section": pk, "accepted": not reasons, "reasons": reasons}
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/grade_exchange.py
+#
+
+"""
+Streaming import and export of grade sheets as CSV or NDJSON.
+"""
+
+import csv
+import io
+import itertools
+import json
+
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers as rest_serializers
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from course_management.models import CourseLog
+from course_management.serializers import GradeEntrySerializer
+
+# Rows validated and written together.
+CHUNK_SIZE = 1000
+# Rejected rows reported in full, the others are only counted.
+MAX_ERRORS = 100
+
+# The columns of an exported grade sheet and the lookups they come from.
+EXPORT_COLUMNS = (
+    ("public_id", "public_id"),
+    ("student", "student__public_id"),
+    ("username", "student__username"),
+    ("course", "section__course__name"),
+    ("section", "section__public_id"),
+    *((field, field) for field in CourseLog.GRADE_FIELDS),
+)
+EXPORT_FIELDS = tuple(column for column, lookup in EXPORT_COLUMNS)
+
+
+#
+# Reading
+#
+def read_csv(lines):
+    """
+    Yield ``(line, row, error)`` for every record of CSV text lines, the
+    first line being the header. Empty cells are left out of the row, so
+    they leave the field unchanged.
+    """
+    reader = csv.DictReader(lines)
+
+    for record in reader:
+        row = {
+            key: value
+            for key, value in record.items()
+            if key is not None and value not in ("", None)
+        }
+        yield reader.line_num, row, None
+
+
+def read_ndjson(lines):
+    """
+    Yield ``(line, row, error)`` for every JSON object of NDJSON text lines.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, None, str(exc)
+            continue
+
+        if isinstance(row, dict):
+            yield number, row, None
+        else:
+            yield number, None, _("Expected a JSON object.")
+
+
+READERS = {
+    "text/csv": read_csv,
+    "application/x-ndjson": read_ndjson,
+}
+
+
+class GradeImport:
+    """
+    Apply the grades of a stream of rows. Rows are validated in memory and
+    written in chunks of ``chunk_size`` with one bulk_update each, every
+    chunk in its own transaction, so only one chunk is ever held. Invalid,
+    unknown and repeated rows are collected in ``errors`` with their line
+    number, the first ``max_errors`` of them, and counted in
+    ``error_count``.
+    """
+
+    def __init__(
+        self, queryset=None, chunk_size=CHUNK_SIZE, max_errors=MAX_ERRORS
+    ):
+        self.queryset = (
+            CourseLog.objects.all() if queryset is None else queryset
+        )
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.applied = 0
+        self.errors = []
+        self.error_count = 0
+
+    def run(self, rows):
+        validator = GradeEntrySerializer(partial=True)
+        seen = set()
+        chunk = {}
+
+        for line, row, error in rows:
+            if error is None:
+                try:
+                    entry = validator.run_validation(row)
+                except rest_serializers.ValidationError as exc:
+                    error = exc.detail
+                else:
+                    # The first valid row of a course log is applied, as
+                    # by the bulk grade entry.
+                    if entry["public_id"] in seen:
+                        error = {
+                            "public_id": [
+                                _("This course log was given more than once.")
+                            ]
+                        }
+
+            if error is not None:
+                self._reject(line, row, error)
+                continue
+
+            seen.add(entry["public_id"])
+            chunk[entry["public_id"]] = line, entry
+
+            if len(chunk) >= self.chunk_size:
+                self._apply(chunk)
+                chunk = {}
+
+        if chunk:
+            self._apply(chunk)
+
+        return self
+
+    def report(self):
+        return {
+            "applied": self.applied,
+            "errors": self.errors,
+            "error_count": self.error_count,
+        }
+
+    def _apply(self, chunk):
+        with transaction.atomic():
+            logs, missing = self.queryset.apply_grades(
+                entry for line, entry in chunk.values()
+            )
+
+        self.applied += len(logs)
+
+        for public_id in missing:
+            self._reject(
+                chunk[public_id][0],
+                {"public_id": public_id},
+                _("This course log does not exist."),
+            )
+
+    def _reject(self, line, row, error):
+        self.error_count += 1
+
+        if len(self.errors) >= self.max_errors:
+            return
+
+        public_id = row.get("public_id") if isinstance(row, dict) else None
+        self.errors.append(
+            {"line": line, "public_id": public_id, "errors": error}
+        )
+
+
+#
+# Writing
+#
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield the grade sheet of the course logs as dicts, fetching
+    ``chunk_size`` rows at a time.
+    """
+    values = (
+        queryset.order_by("pk")
+        .values_list(*(lookup for column, lookup in EXPORT_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+    for row in values:
+        yield dict(zip(EXPORT_FIELDS, row))
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return "".join(self.stream(rows))
+
+    def stream(self, rows, columns=None):
+        """
+        Yield the CSV text of the rows line by line, the columns defaulting
+        to the keys of the first row.
+        """
+        rows = iter(rows)
+
+        if columns is None:
+            first = next(rows, None)
+
+            if first is None:
+                return
+
+            columns = list(first)
+            rows = itertools.chain([first], rows)
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, columns, extrasaction="ignore")
+        writer.writeheader()
+
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return "".join(self.stream(rows))
+
+    def stream(self, rows, columns=None):
+        """
+        Yield one line of JSON per row.
+        """
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder) + "\n"
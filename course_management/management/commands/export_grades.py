@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/management/commands/export_grades.py
+#
+
+"""
+Write the grade sheet of a course section or term as CSV or NDJSON.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from course_management import grade_exchange
+from course_management.models import CourseLog, CourseSection, Term
+
+RENDERERS = {
+    "csv": grade_exchange.CSVRenderer,
+    "ndjson": grade_exchange.NDJSONRenderer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the grade sheet of a course section or a term to stdout."
+    )
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument("--section", help="The section public_id.")
+        group.add_argument("--term", help="The term public_id.")
+        parser.add_argument(
+            "--format", choices=sorted(RENDERERS), default="csv"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=grade_exchange.CHUNK_SIZE,
+            help="The number of rows fetched at a time.",
+        )
+
+    def handle(self, *args, **options):
+        if options["section"]:
+            model, lookup = CourseSection, "section"
+            public_id = options["section"]
+        else:
+            model, lookup = Term, "section__term"
+            public_id = options["term"]
+
+        try:
+            instance = model.objects.get(public_id=public_id)
+        except model.DoesNotExist:
+            raise CommandError(
+                f"{model._meta.verbose_name} {public_id} does not exist."
+            )
+
+        logs = CourseLog.objects.filter(**{lookup: instance})
+        rows = grade_exchange.export_rows(logs, options["chunk_size"])
+        renderer = RENDERERS[options["format"]]()
+
+        for text in renderer.stream(rows, grade_exchange.EXPORT_FIELDS):
+            self.stdout.write(text, ending="")
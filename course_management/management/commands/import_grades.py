@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/management/commands/import_grades.py
+#
+
+"""
+Enter course log grades from a CSV or NDJSON file.
+"""
+
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from course_management import grade_exchange
+
+FORMATS = {
+    "csv": grade_exchange.read_csv,
+    "ndjson": grade_exchange.read_ndjson,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Read grades from a CSV or NDJSON file, one course log per row "
+        "identified by its public_id, and apply them in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The file to import, - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(FORMATS),
+            help="The file format, by default taken from its extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=grade_exchange.CHUNK_SIZE,
+            help="The number of rows validated and written together.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or path.rsplit(".", 1)[-1].lower()
+
+        if format not in FORMATS:
+            raise CommandError(
+                f"Can not tell the format of {path}, use --format."
+            )
+
+        grade_import = grade_exchange.GradeImport(
+            chunk_size=options["chunk_size"]
+        )
+
+        try:
+            if path == "-":
+                grade_import.run(FORMATS[format](sys.stdin))
+            else:
+                with open(path, newline="", encoding="utf-8-sig") as lines:
+                    grade_import.run(FORMATS[format](lines))
+        except (OSError, UnicodeDecodeError, csv.Error) as exc:
+            raise CommandError(str(exc))
+
+        for error in grade_import.errors:
+            self.stderr.write(json.dumps(error, default=str))
+
+        self.stdout.write(
+            f"Applied {grade_import.applied} row(s), "
+            f"rejected {grade_import.error_count}."
+        )
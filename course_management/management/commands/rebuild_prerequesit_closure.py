@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/management/commands/rebuild_prerequesit_closure.py
+#
+
+"""
+Rebuild the transitive prerequesit closure of every course.
+"""
+
+from django.core.management.base import BaseCommand
+
+from course_management.models import PrerequesitClosure
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the PrerequesitClosure table from the direct course "
+        "prerequesits."
+    )
+
+    def handle(self, *args, **options):
+        PrerequesitClosure.objects.rebuild()
+        self.stdout.write(
+            f"Stored {PrerequesitClosure.objects.count()} closure row(s)."
+        )
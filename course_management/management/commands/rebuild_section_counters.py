@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/management/commands/rebuild_section_counters.py
+#
+
+"""
+Rebuild and verify the stored CourseSection enrollment counters.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from course_management.models import (
+    CourseLog,
+    CourseSection,
+    bump_representations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare CourseSection.filled_capacity with the real number of "
+        "course logs and rewrite the counters that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report mismatched counters, do not fix them.",
+        )
+
+    def handle(self, *args, **options):
+        enrolled = (
+            CourseLog.objects.filter(section=OuterRef("pk"))
+            .order_by()
+            .values("section")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        overfilled = []
+
+        with transaction.atomic():
+            sections = list(
+                CourseSection.objects.select_for_update()
+                .annotate(
+                    enrolled=Coalesce(
+                        Subquery(enrolled, output_field=IntegerField()),
+                        Value(0),
+                    )
+                )
+                .order_by("pk")
+            )
+            mismatched = [
+                section
+                for section in sections
+                if section.filled_capacity != section.enrolled
+            ]
+
+            for section in mismatched:
+                self.stdout.write(
+                    f"{section.public_id}: stored {section.filled_capacity}, "
+                    f"enrolled {section.enrolled}"
+                )
+
+                if options["check"]:
+                    continue
+
+                if section.enrolled > section.total_capacity:
+                    overfilled.append(section.public_id)
+                else:
+                    CourseSection.objects.filter(pk=section.pk).update(
+                        filled_capacity=section.enrolled
+                    )
+                    bump_representations(courses=[section.course_id])
+
+        if options["check"] and mismatched:
+            raise CommandError(
+                f"{len(mismatched)} section counter(s) are wrong."
+            )
+
+        if overfilled:
+            raise CommandError(
+                "These sections have more course logs than their total "
+                f"capacity: {', '.join(overfilled)}"
+            )
+
+        self.stdout.write(
+            f"Checked {len(sections)} section(s), "
+            f"{len(mismatched)} mismatched"
+            f"{'' if options['check'] else ' and rebuilt'}."
+        )
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/management/commands/regenerate_public_ids.py
+#
+
+"""
+Rewrite existing public_ids in the scheme their model uses now.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common import RANDOM_KEYS, SORTABLE_KEYS, generate_public_keys
+from common.key_generator import SortableKeyGenerator
+
+
+def is_sortable_key(key):
+    return len(key) == SortableKeyGenerator.LENGTH and not (
+        set(key) - set(SortableKeyGenerator.DOMAIN)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Give the rows of the models using time ordered public_ids a new "
+        "one if they still have a random key. Keys are assigned in primary "
+        "key order, in batches each committed on its own. Public ids are "
+        "part of the API URLs, so links to the rewritten rows change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.Model",
+            help="The models to rewrite, by default all of them using "
+            "sortable keys.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be rewritten.",
+        )
+
+    def handle(self, *args, **options):
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+        else:
+            models = [
+                model
+                for model in apps.get_models()
+                if getattr(model, "PUBLIC_ID_SCHEME", None) == SORTABLE_KEYS
+            ]
+
+        for model in models:
+            scheme = getattr(model, "PUBLIC_ID_SCHEME", RANDOM_KEYS)
+
+            if scheme != SORTABLE_KEYS:
+                raise CommandError(
+                    f"{model._meta.label} does not use sortable public ids."
+                )
+
+            count = self.rewrite(model, options["batch_size"],
+                                 options["dry_run"])
+            verb = "Would rewrite" if options["dry_run"] else "Rewrote"
+            self.stdout.write(f"{verb} {count} {model._meta.label} row(s).")
+
+    def rewrite(self, model, batch_size, dry_run):
+        count = 0
+        last_pk = None
+
+        while True:
+            rows = model._default_manager.order_by("pk")
+
+            if last_pk is not None:
+                rows = rows.filter(pk__gt=last_pk)
+
+            batch = list(rows.only("pk", "public_id")[:batch_size])
+
+            if not batch:
+                return count
+
+            last_pk = batch[-1].pk
+            batch = [row for row in batch if not is_sortable_key(row.public_id)]
+            count += len(batch)
+
+            if dry_run or not batch:
+                continue
+
+            keys = generate_public_keys(len(batch), SORTABLE_KEYS)
+
+            for row, key in zip(batch, keys):
+                row.public_id = key
+
+            with transaction.atomic():
+                model._default_manager.bulk_update(batch, ["public_id"])
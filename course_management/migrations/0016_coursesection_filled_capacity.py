@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+
+def populate_filled_capacity(apps, schema_editor):
+    """
+    Store the current enrollment count on every section. Sections holding
+    more students than their total capacity would break the check
+    constraint: the migration stops and lists them, their capacity has to
+    be raised or their students moved by hand before running it again.
+    """
+    CourseSection = apps.get_model("course_management", "CourseSection")
+    CourseLog = apps.get_model("course_management", "CourseLog")
+    counts = dict(
+        CourseLog.objects.values_list("section").annotate(
+            filled=models.Count("pk")
+        )
+    )
+    sections = list(
+        CourseSection.objects.filter(pk__in=counts).select_related("course")
+    )
+    overfilled = [
+        f"  {section.course.name} G{section.local_id} (pk={section.pk}, "
+        f"term pk={section.term_id}): {counts[section.pk]} enrolled, "
+        f"total capacity {section.total_capacity}"
+        for section in sections
+        if counts[section.pk] > section.total_capacity
+    ]
+
+    if overfilled:
+        raise RuntimeError(
+            "These course sections hold more students than their total "
+            "capacity, raise the capacity or move the students first:\n"
+            + "\n".join(overfilled)
+        )
+
+    for section in sections:
+        section.filled_capacity = counts[section.pk]
+
+    CourseSection.objects.bulk_update(
+        sections, ["filled_capacity"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0015_alter_courselog_student'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursesection',
+            name='filled_capacity',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='The number of students enrolled in this section.', verbose_name='Filled Capacity'),
+        ),
+        migrations.RunPython(
+            populate_filled_capacity, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='coursesection',
+            constraint=models.CheckConstraint(check=models.Q(filled_capacity__lte=models.F('total_capacity')), name='coursesection_filled_lte_total'),
+        ),
+    ]
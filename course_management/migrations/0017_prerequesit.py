@@ -0,0 +1,44 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0016_coursesection_filled_capacity'),
+    ]
+
+    operations = [
+        # The Prerequesit model takes over the table Django created for the
+        # Course.prerequesits relation, so only the state changes here.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Prerequesit',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('from_course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='course_management.course')),
+                        ('to_course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='course_management.course')),
+                    ],
+                    options={
+                        'db_table': 'course_management_course_prerequesits',
+                        'unique_together': {('from_course', 'to_course')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='course',
+                    name='prerequesits',
+                    field=models.ManyToManyField(blank=True, help_text='The course(s) one must pass before taking this course.', through='course_management.Prerequesit', to='course_management.Course', verbose_name='Prerequesit Courses'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='prerequesit',
+            index=models.Index(fields=['to_course', 'from_course'], name='prerequesit_to_from_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='course_name_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_closure(apps, schema_editor):
+    """
+    Walk the prerequesit graph of every course and store the shortest
+    chain length to each of its transitive prerequesits.
+    """
+    Course = apps.get_model("course_management", "Course")
+    Prerequesit = apps.get_model("course_management", "Prerequesit")
+    PrerequesitClosure = apps.get_model(
+        "course_management", "PrerequesitClosure"
+    )
+    edges = {}
+
+    for from_course, to_course in Prerequesit.objects.values_list(
+        "from_course", "to_course"
+    ):
+        edges.setdefault(from_course, []).append(to_course)
+
+    rows = []
+
+    for course_pk in Course.objects.values_list("pk", flat=True):
+        seen = {course_pk}
+        frontier = [course_pk]
+        depth = 0
+
+        while frontier:
+            depth += 1
+            found = []
+
+            for pk in frontier:
+                for required in edges.get(pk, ()):
+                    if required in seen:
+                        continue
+
+                    seen.add(required)
+                    found.append(required)
+                    rows.append(
+                        PrerequesitClosure(
+                            course_id=course_pk,
+                            prerequesit_id=required,
+                            depth=depth,
+                        )
+                    )
+
+            frontier = found
+
+    PrerequesitClosure.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0017_prerequesit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrerequesitClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField(help_text='The length of the shortest prerequesit chain.', verbose_name='Depth')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequesit_closure', to='course_management.course', verbose_name='Course')),
+                ('prerequesit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unlock_closure', to='course_management.course', verbose_name='Prerequesit')),
+            ],
+            options={
+                'verbose_name': 'Prerequesit Closure',
+                'verbose_name_plural': 'Prerequesit Closures',
+                'unique_together': {('course', 'prerequesit')},
+                'indexes': [models.Index(fields=['prerequesit', 'course'], name='closure_prerequesit_idx')],
+            },
+        ),
+        migrations.RunPython(populate_closure, migrations.RunPython.noop),
+    ]
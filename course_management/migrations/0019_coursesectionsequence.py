@@ -0,0 +1,64 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_sequences(apps, schema_editor):
+    """
+    Give the sections sharing a group number with an older section of the
+    same course and term the next free number, then start every sequence
+    after the highest number in use.
+    """
+    CourseSection = apps.get_model("course_management", "CourseSection")
+    CourseSectionSequence = apps.get_model(
+        "course_management", "CourseSectionSequence"
+    )
+    used = {}
+    renumbered = []
+
+    for section in CourseSection.objects.order_by("pk").only(
+        "pk", "course", "term", "local_id"
+    ):
+        numbers = used.setdefault((section.course_id, section.term_id), set())
+
+        if not section.local_id or section.local_id in numbers:
+            section.local_id = max(numbers, default=0) + 1
+            renumbered.append(section)
+
+        numbers.add(section.local_id)
+
+    CourseSection.objects.bulk_update(renumbered, ["local_id"])
+    CourseSectionSequence.objects.bulk_create(
+        CourseSectionSequence(
+            course_id=course, term_id=term, last_local_id=max(numbers)
+        )
+        for (course, term), numbers in used.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0018_prerequesitclosure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSectionSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_local_id', models.PositiveSmallIntegerField(default=0, help_text='The group number of the last section created.', verbose_name='Last Course Section Group')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='course_management.course', verbose_name='Course')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='course_management.term', verbose_name='Term')),
+            ],
+            options={
+                'verbose_name': 'Course Section Sequence',
+                'verbose_name_plural': 'Course Section Sequences',
+                'unique_together': {('course', 'term')},
+            },
+        ),
+        migrations.RunPython(populate_sequences, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='coursesection',
+            constraint=models.UniqueConstraint(fields=('course', 'term', 'local_id'), name='coursesection_unique_local_id'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0019_coursesectionsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coursesection',
+            index=models.Index(fields=['course', 'id'], name='coursesection_course_id_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+
+def populate_schedule_mask(apps, schema_editor):
+    """
+    Store the weekly slots of every section, one bit per weekday and hours
+    as CourseSection.get_slot_bit numbers them.
+    """
+    CourseSection = apps.get_model("course_management", "CourseSection")
+    days = [
+        day
+        for day, label in CourseSection._meta.get_field(
+            "first_session_weekday"
+        ).choices
+    ]
+    slots = [
+        slot
+        for slot, label in CourseSection._meta.get_field(
+            "hour_schedule"
+        ).choices
+    ]
+
+    def bit(weekday, hours):
+        if weekday not in days or hours not in slots:
+            return 0
+        return 1 << (days.index(weekday) * len(slots) + slots.index(hours))
+
+    sections = list(CourseSection.objects.all())
+
+    for section in sections:
+        section.schedule_mask = bit(
+            section.first_session_weekday, section.hour_schedule
+        ) | bit(section.second_session_weekday, section.hour_schedule)
+
+    CourseSection.objects.bulk_update(
+        sections, ["schedule_mask"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0021_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursesection',
+            name='schedule_mask',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='The weekly slots of the sessions, one bit per weekday and hours.', verbose_name='Schedule Mask'),
+        ),
+        migrations.RunPython(
+            populate_schedule_mask, migrations.RunPython.noop
+        ),
+    ]
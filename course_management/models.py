@@ -5,16 +5,84 @@
 
 import datetime
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
 from django.urls import reverse
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 from common.model_mixins import ValidateOnSaveMixin
-from common import generate_public_key
+from common.model_versions import VersionedQuerySetMixin, bump_object_versions
+from common import SORTABLE_KEYS, generate_public_key
+from common.tracing import Tracer
+
+tracer = Tracer(__name__)
+
+
+def bump_representations(courses=(), terms=()):
+    """
+    Give the courses and terms with the primary keys *courses* and *terms*
+    new versions, dropping their cached representations.
+    """
+    bump_object_versions(Course, courses)
+    bump_object_versions(Term, terms)
+
 
 # ------------------------------Course------------------------------
+class CourseQuerySet(VersionedQuerySetMixin, models.QuerySet):
+    def update(self, **kwargs):
+        # Terms list the names of their courses.
+        pairs = set(self.values_list("pk", "sections__term"))
+        rows = super().update(**kwargs)
+
+        if rows:
+            bump_representations(
+                courses={course for course, term in pairs},
+                terms={term for course, term in pairs},
+            )
+
+        return rows
+
+    def bulk_update(self, objs, *args, **kwargs):
+        rows = super().bulk_update(objs, *args, **kwargs)
+        courses = {obj.pk for obj in objs}
+        bump_representations(
+            courses=courses,
+            terms=CourseSection.objects.filter(
+                course__in=courses
+            ).values_list("term", flat=True),
+        )
+        return rows
+
+    def with_prerequesits(self, names, match_all=True):
+        """
+        Filter courses by the names of their prerequesits, ignoring case.
+        With *match_all* a course must require every named course,
+        otherwise any one of them is enough. Either way the filter is a
+        single grouped subquery on the prerequesit table.
+        """
+        names = {name.strip().lower() for name in names if name.strip()}
+
+        if not names:
+            return self
+
+        links = Prerequesit.objects.annotate(
+            required_name=Lower("to_course__name")
+        ).filter(required_name__in=names)
+
+        if match_all:
+            links = (
+                links.values("from_course")
+                .annotate(matched=Count("to_course", distinct=True))
+                .filter(matched=len(names))
+            )
+
+        return self.filter(pk__in=links.values("from_course"))
+
+
 class Course(ValidateOnSaveMixin, models.Model):
     public_id = models.CharField(
         verbose_name=_("Public Course ID"),
@@ -36,15 +104,29 @@ class Course(ValidateOnSaveMixin, models.Model):
         help_text=_("The course(s) one must pass before taking this course."),
         symmetrical=False,
         blank=True,
+        through="Prerequesit",
+        through_fields=("from_course", "to_course"),
     )
     credit = models.PositiveSmallIntegerField(
         verbose_name=_("Course Credit"), help_text=_("The credit of the course")
     )
 
+    updated_at = models.DateTimeField(
+        verbose_name=_("Updated At"),
+        auto_now=True,
+        db_index=True,
+        help_text=_("The date and time the course was last changed."),
+    )
+
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         ordering = ("name",)
         verbose_name = _("Course")
         verbose_name_plural = _("Courses")
+        indexes = [
+            models.Index(Lower("name"), name="course_name_lower_idx"),
+        ]
 
     def clean(self):
         # Populate the public_id on record creation only.
@@ -62,18 +144,200 @@ class Course(ValidateOnSaveMixin, models.Model):
 
     def process_prerequesits(self, prerequesits):
         """
-        This method adds and removes prerequesits to a course.
+        This method adds and removes prerequesits to a course, the
+        prerequesit closure follows and cycles are rejected through the
+        signals of the relation.
 
         """
-        self.prerequesits.clear()
         prerequesits_list = [prerequesit.pk for prerequesit in prerequesits]
-        self.prerequesits.set(prerequesits_list)
+
+        with transaction.atomic():
+            self.prerequesits.set(prerequesits_list)
 
     def get_prerequesits(self):
         prerequesits = list(self.prerequesits.values_list("name", flat=True))
         return prerequesits or "No prerequesits set."
 
 
+class Prerequesit(models.Model):
+    """
+    A course (from_course) requires another course (to_course). This is the
+    table of the Course.prerequesits relation.
+    """
+
+    from_course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    to_course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    class Meta:
+        db_table = "course_management_course_prerequesits"
+        unique_together = [["from_course", "to_course"]]
+        indexes = [
+            # Serves the "has these prerequesits" lookups with an
+            # index-only scan.
+            models.Index(
+                fields=["to_course", "from_course"],
+                name="prerequesit_to_from_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.from_course} requires {self.to_course}"
+
+
+class PrerequesitClosureManager(models.Manager):
+    def check_acyclic(self, course, prerequesits):
+        """
+        Raise a ValidationError if requiring *prerequesits* for *course*
+        would make a course its own (transitive) prerequesit. Courses can
+        be given as instances or primary keys.
+        """
+        course = getattr(course, "pk", course)
+        prerequesit_pks = {
+            getattr(prerequesit, "pk", prerequesit)
+            for prerequesit in prerequesits
+        }
+
+        if course is None:
+            return
+
+        if course in prerequesit_pks or self.filter(
+            course__in=prerequesit_pks, prerequesit=course
+        ).exists():
+            msg = _("A course can not be a prerequesit of itself.")
+            raise ValidationError({"prerequesits": msg})
+
+    def refresh(self, *courses):
+        """
+        Rewrite the closure of *courses* (instances or primary keys) and of
+        every course that requires them, after their direct prerequesits
+        changed. The closure of the other courses is still right and is
+        used instead of walking their prerequesits.
+        """
+        pks = {getattr(course, "pk", course) for course in courses}
+        affected = set(pks)
+        affected.update(
+            self.filter(prerequesit__in=pks).values_list("course", flat=True)
+        )
+        self._rewrite(affected)
+
+    def rebuild(self):
+        self._rewrite(Course.objects.values_list("pk", flat=True))
+
+    def _rewrite(self, course_pks):
+        edges = {}
+
+        for from_course, to_course in Prerequesit.objects.filter(
+            from_course__in=course_pks
+        ).values_list("from_course", "to_course"):
+            edges.setdefault(from_course, []).append(to_course)
+
+        course_pks = set(course_pks)
+        closures = {}
+        # The courses required by the rewritten ones, and not rewritten.
+        boundary = {
+            required
+            for targets in edges.values()
+            for required in targets
+            if required not in course_pks
+        }
+
+        for course, required, depth in self.filter(
+            course__in=boundary
+        ).values_list("course", "prerequesit", "depth"):
+            closures.setdefault(course, {})[required] = depth
+
+        rows = [
+            self.model(course_id=pk, prerequesit_id=required, depth=depth)
+            for pk in course_pks
+            for required, depth in walk_prerequesits(
+                pk, edges, closures
+            ).items()
+        ]
+
+        with transaction.atomic():
+            self.filter(course__in=course_pks).delete()
+            self.bulk_create(rows)
+
+
+def walk_prerequesits(course_pk, edges, closures=None):
+    """
+    Return the transitive prerequesits of a course mapped to the length
+    of the shortest chain leading to them, given the direct *edges*.
+    *closures* maps courses without edges to their known transitive
+    prerequesits.
+    """
+    depths = {}
+    frontier = [course_pk]
+    depth = 0
+
+    while frontier:
+        depth += 1
+        found = []
+
+        for pk in frontier:
+            for required in edges.get(pk, ()):
+                if required != course_pk and required not in depths:
+                    depths[required] = depth
+                    found.append(required)
+
+        frontier = found
+
+    for required, depth in list(depths.items()):
+        for further, more in (closures or {}).get(required, {}).items():
+            if depth + more < depths.get(further, depth + more + 1):
+                depths[further] = depth + more
+
+    return depths
+
+
+class PrerequesitClosure(models.Model):
+    """
+    Every course that must be passed before a course, directly (depth 1)
+    or through a chain of other prerequesits.
+    """
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        verbose_name=_("Course"),
+        related_name="prerequesit_closure",
+    )
+    prerequesit = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        verbose_name=_("Prerequesit"),
+        related_name="unlock_closure",
+    )
+    depth = models.PositiveSmallIntegerField(
+        verbose_name=_("Depth"),
+        help_text=_("The length of the shortest prerequesit chain."),
+    )
+
+    objects = PrerequesitClosureManager()
+
+    class Meta:
+        verbose_name = _("Prerequesit Closure")
+        verbose_name_plural = _("Prerequesit Closures")
+        unique_together = [["course", "prerequesit"]]
+        indexes = [
+            models.Index(
+                fields=["prerequesit", "course"],
+                name="closure_prerequesit_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.course} requires {self.prerequesit} ({self.depth})"
+
+
 # ------------------------------Term------------------------------
 class Term(ValidateOnSaveMixin, models.Model):
 
@@ -109,6 +373,12 @@ class Term(ValidateOnSaveMixin, models.Model):
         blank=True,
         help_text=_("The day on which the term starts."),
     )
+    updated_at = models.DateTimeField(
+        verbose_name=_("Updated At"),
+        auto_now=True,
+        db_index=True,
+        help_text=_("The date and time the term was last changed."),
+    )
 
     class Meta:
         ordering = ("start_date",)
@@ -136,11 +406,134 @@ class Term(ValidateOnSaveMixin, models.Model):
         return self.get_name()
 
     def get_classes(self):
-        classes = list(self.classes.values_list("course__name", flat=True))
+        if "classes" in getattr(self, "_prefetched_objects_cache", {}):
+            classes = [section.course.name for section in self.classes.all()]
+        else:
+            classes = list(
+                self.classes.values_list("course__name", flat=True)
+            )
         return classes or "No classes set."
 
 
 # ------------------------------Course Section------------------------------
+class CourseSectionQuerySet(VersionedQuerySetMixin, models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Update the sections without looking them up first, the callers
+        drop the cached representations of their courses and terms, see
+        bump_representations, from the ids they have.
+        """
+        if any(name in kwargs for name in CourseSection.SCHEDULE_FIELDS):
+            kwargs["schedule_mask"] = CourseSection.schedule_mask_expression(
+                **kwargs
+            )
+
+        return super().update(**kwargs)
+
+    def _update_sections(self, pairs, **kwargs):
+        # Courses and terms both show their sections, *pairs* are the
+        # course and term ids of the updated sections.
+        pairs = set(pairs)
+        rows = super().update(**kwargs)
+
+        if rows:
+            bump_representations(
+                courses={course for course, term in pairs},
+                terms={term for course, term in pairs},
+            )
+
+        return rows
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if set(fields) & set(CourseSection.SCHEDULE_FIELDS):
+            for obj in objs:
+                obj.schedule_mask = obj.get_schedule_mask()
+            fields = [*fields, "schedule_mask"]
+
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        bump_representations(
+            courses={obj.course_id for obj in objs},
+            terms={obj.term_id for obj in objs},
+        )
+        return rows
+
+    def clashing(self, mask):
+        """
+        Return the sections meeting at any of the weekly slots of *mask*.
+        """
+        return self.alias(overlap=F("schedule_mask").bitand(mask)).filter(
+            overlap__gt=0
+        )
+
+    def reserve_seat(self, pk, course_id=None):
+        """
+        Take one seat of the section in a single conditional UPDATE.
+        Returns False if the section is already filled. *course_id*, the
+        course of the section, spares the query looking it up.
+        """
+        updated = self.filter(
+            pk=pk, filled_capacity__lt=F("total_capacity")
+        ).update(filled_capacity=F("filled_capacity") + 1)
+
+        if updated:
+            self._bump_seats(pk, course_id)
+
+        return bool(updated)
+
+    def reserve_seats(self, seats):
+        """
+        Take seats in several sections, *seats* maps section primary keys
+        to the number of seats. The sections are locked in primary key
+        order, so concurrent reservations can not deadlock, and updated in
+        a single UPDATE. Raises a ValidationError if any of them is filled.
+        """
+        with transaction.atomic():
+            sections = (
+                self.select_for_update()
+                .filter(pk__in=seats)
+                .order_by("pk")
+                .values_list(
+                    "pk", "filled_capacity", "total_capacity", "course", "term"
+                )
+            )
+            filled = [
+                pk
+                for pk, filled_capacity, total_capacity, course, term in sections
+                if filled_capacity + seats[pk] > total_capacity
+            ]
+
+            if filled:
+                raise ValidationError(
+                    {"section": _("This section is filled.")}
+                )
+
+            self.filter(pk__in=seats)._update_sections(
+                [section[3:] for section in sections],
+                filled_capacity=F("filled_capacity")
+                + Case(
+                    *(When(pk=pk, then=Value(n)) for pk, n in seats.items()),
+                    default=Value(0),
+                )
+            )
+
+    def release_seat(self, pk, course_id=None):
+        updated = self.filter(pk=pk, filled_capacity__gt=0).update(
+            filled_capacity=F("filled_capacity") - 1
+        )
+
+        if updated:
+            self._bump_seats(pk, course_id)
+
+    def _bump_seats(self, pk, course_id):
+        # Courses show the seats of their sections, terms do not.
+        if course_id is None:
+            course_id = (
+                self.filter(pk=pk).values_list("course", flat=True).first()
+            )
+
+        bump_representations(courses=[course_id])
+
+
 class CourseSection(ValidateOnSaveMixin, models.Model):
     DAYS_OF_THE_WEEK = (
         ("Monday", "Monday"),
@@ -194,6 +587,12 @@ class CourseSection(ValidateOnSaveMixin, models.Model):
         verbose_name=_("Total Capacity"),
         help_text=_("Total Capacity of this Section"),
     )
+    filled_capacity = models.PositiveSmallIntegerField(
+        verbose_name=_("Filled Capacity"),
+        default=0,
+        editable=False,
+        help_text=_("The number of students enrolled in this section."),
+    )
     instructor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -224,22 +623,157 @@ class CourseSection(ValidateOnSaveMixin, models.Model):
         max_length=30,
         help_text=_("The date and time of the exam"),
     )
+    schedule_mask = models.PositiveBigIntegerField(
+        verbose_name=_("Schedule Mask"),
+        default=0,
+        editable=False,
+        help_text=_(
+            "The weekly slots of the sessions, one bit per weekday and hours."
+        ),
+    )
+    updated_at = models.DateTimeField(
+        verbose_name=_("Updated At"),
+        auto_now=True,
+        db_index=True,
+        help_text=_("The date and time the section was last changed."),
+    )
+
+    objects = CourseSectionQuerySet.as_manager()
+
+    # The fields schedule_mask is made from.
+    SCHEDULE_FIELDS = (
+        "first_session_weekday",
+        "second_session_weekday",
+        "hour_schedule",
+    )
 
     class Meta:
         ordering = ("course__name",)
         verbose_name = "Course Section"
         verbose_name_plural = "Course Sections"
+        indexes = [
+            # Keyset pages walk the sections of each course by id.
+            models.Index(
+                fields=["course", "id"], name="coursesection_course_id_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(filled_capacity__lte=F("total_capacity")),
+                name="coursesection_filled_lte_total",
+            ),
+            models.UniqueConstraint(
+                fields=["course", "term", "local_id"],
+                name="coursesection_unique_local_id",
+            ),
+        ]
 
     def clean(self):
         # Populate the public_id on record creation only.
         if self.pk is None and not self.public_id:
             self.public_id = generate_public_key()
 
-        # Populate local_id according the number of sections of the same course in the same term
-        number = CourseSection.objects.filter(
-            term=self.term, course=self.course
-        ).count()
-        self.local_id = number + 1
+    # The course and term the row was loaded with, both lose the section
+    # when it moves.
+    _loaded_course_id = None
+    _loaded_term_id = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_course_id = instance.__dict__.get("course_id")
+        instance._loaded_term_id = instance.__dict__.get("term_id")
+        return instance
+
+    @classmethod
+    def get_slot_bit(cls, weekday, hours):
+        """
+        Return the bit of the weekly slot at *hours* on *weekday*, bits
+        run through the hours of each weekday in turn. Unknown slots have
+        none.
+        """
+        days = [day for day, label in cls.DAYS_OF_THE_WEEK]
+        slots = [slot for slot, label in cls.HOURS_OF_THE_DAY]
+
+        if weekday not in days or hours not in slots:
+            return 0
+
+        return 1 << (days.index(weekday) * len(slots) + slots.index(hours))
+
+    @classmethod
+    def get_slots(cls, mask):
+        """
+        Return the (weekday, hours) pairs of the slots set in *mask*.
+        """
+        return [
+            (day, slot)
+            for day, label in cls.DAYS_OF_THE_WEEK
+            for slot, label in cls.HOURS_OF_THE_DAY
+            if mask & cls.get_slot_bit(day, slot)
+        ]
+
+    @classmethod
+    def schedule_mask_expression(cls, **values):
+        """
+        Return the expression of the schedule_mask of rows updated with
+        *values*, the schedule fields missing from them are read from the
+        row.
+        """
+        first, second, hours = (
+            F(name) if name not in values
+            else values[name] if hasattr(values[name], "resolve_expression")
+            else Value(values[name])
+            for name in cls.SCHEDULE_FIELDS
+        )
+
+        def session(weekday):
+            return Case(
+                *(
+                    When(
+                        Exact(weekday, day) & Exact(hours, slot),
+                        then=Value(cls.get_slot_bit(day, slot)),
+                    )
+                    for day, label in cls.DAYS_OF_THE_WEEK
+                    for slot, label in cls.HOURS_OF_THE_DAY
+                ),
+                default=Value(0),
+                output_field=models.PositiveBigIntegerField(),
+            )
+
+        return session(first).bitor(session(second))
+
+    def get_schedule_mask(self):
+        return self.get_slot_bit(
+            self.first_session_weekday, self.hour_schedule
+        ) | self.get_slot_bit(self.second_session_weekday, self.hour_schedule)
+
+    def save(self, *args, **kwargs):
+        self.schedule_mask = self.get_schedule_mask()
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is not None and (
+            set(update_fields) & set(self.SCHEDULE_FIELDS)
+        ):
+            kwargs["update_fields"] = [*update_fields, "schedule_mask"]
+
+        loaded = (self._loaded_course_id, self._loaded_term_id)
+        moved = None not in loaded and loaded != (self.course_id, self.term_id)
+
+        if moved and update_fields is not None:
+            kwargs["update_fields"] = [*kwargs["update_fields"], "local_id"]
+
+        # The group number is reserved in the transaction inserting or
+        # moving the section, a failed save gives it back.
+        with transaction.atomic():
+            if (self._state.adding and not self.local_id) or moved:
+                self.local_id = CourseSectionSequence.objects.allocate(
+                    self.course_id, self.term_id
+                )
+
+            super().save(*args, **kwargs)
+
+        self._loaded_course_id = self.course_id
+        self._loaded_term_id = self.term_id
 
     def __str__(self):
         return "{0} G{1}".format(self.course, self.local_id)
@@ -249,9 +783,64 @@ class CourseSection(ValidateOnSaveMixin, models.Model):
             "coursesection-detail", kwargs={"public_id": self.public_id}
         )
 
-    @property
-    def filled_capacity(self):
-        return CourseLog.objects.filter(section=self).count()
+
+class CourseSectionSequenceManager(models.Manager):
+    def allocate(self, course_id, term_id):
+        """
+        Reserve the next section group number of a course in a term. The
+        sequence row is locked until the calling transaction ends, so
+        concurrent sections of the same course and term wait for each
+        other instead of sharing a number.
+        """
+        with transaction.atomic():
+            locked = self.select_for_update()
+            sequence = locked.filter(course_id=course_id, term_id=term_id)
+            sequence = sequence.first()
+
+            if sequence is None:
+                self.get_or_create(course_id=course_id, term_id=term_id)
+                sequence = locked.get(course_id=course_id, term_id=term_id)
+
+            sequence.last_local_id += 1
+            sequence.save(update_fields=["last_local_id"])
+
+        return sequence.last_local_id
+
+
+class CourseSectionSequence(models.Model):
+    """
+    The last section group number given out for a course in a term.
+    """
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        verbose_name=_("Course"),
+        related_name="+",
+    )
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.CASCADE,
+        verbose_name=_("Term"),
+        related_name="+",
+    )
+    last_local_id = models.PositiveSmallIntegerField(
+        verbose_name=_("Last Course Section Group"),
+        default=0,
+        help_text=_("The group number of the last section created."),
+    )
+
+    objects = CourseSectionSequenceManager()
+
+    class Meta:
+        verbose_name = "Course Section Sequence"
+        verbose_name_plural = "Course Section Sequences"
+        unique_together = [("course", "term")]
+
+    def __str__(self):
+        return "{0} {1}: G{2}".format(
+            self.course_id, self.term_id, self.last_local_id
+        )
 
 
 # ------------------------------Course Log------------------------------
@@ -260,12 +849,61 @@ class CorselogManager(models.Manager):
         pass
 
 
+class CourseLogQuerySet(VersionedQuerySetMixin, models.QuerySet):
+    def apply_grades(self, entries):
+        """
+        Set the grades of the course logs given as dicts holding their
+        public_id and grade fields. Only the logs whose grades change are
+        written, with one bulk_update over the changed fields. Returns the
+        matched logs and the public_ids that do not exist.
+        """
+        entries = {entry["public_id"]: entry for entry in entries}
+        logs = list(self.filter(public_id__in=entries))
+        missing = sorted(set(entries) - {log.public_id for log in logs})
+        changed_logs = []
+        changed_fields = set()
+
+        for log in logs:
+            changed = False
+
+            for field, value in entries[log.public_id].items():
+                if field in CourseLog.GRADE_FIELDS and (
+                    getattr(log, field) != value
+                ):
+                    setattr(log, field, value)
+                    changed_fields.add(field)
+                    changed = True
+
+            if changed:
+                changed_logs.append(log)
+
+        if changed_logs:
+            self.bulk_update(
+                changed_logs,
+                [
+                    field
+                    for field in CourseLog.GRADE_FIELDS
+                    if field in changed_fields
+                ],
+            )
+
+        return logs, missing
+
+
 class CourseLog(ValidateOnSaveMixin, models.Model):
+    APPROVED = "Approved"
     STATUS = (
         ("Unavailable", "Unavailable"),
         ("Not Approved", "Not Approved"),
-        ("Approved", "Approved"),
+        (APPROVED, "Approved"),
     )
+    # The lowest approved final grade that passes a course.
+    PASSING_GRADE = 10
+    # The fields instructors set when entering grades.
+    GRADE_FIELDS = ("midterm_exam", "final_exam", "final_grade", "status")
+    # Course logs are created in volume, time ordered keys keep the index
+    # compact.
+    PUBLIC_ID_SCHEME = SORTABLE_KEYS
 
     public_id = models.CharField(
         verbose_name=_("Public Course Log ID"),
@@ -317,22 +955,61 @@ class CourseLog(ValidateOnSaveMixin, models.Model):
         ),
     )
 
+    objects = CourseLogQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Course Log"
         verbose_name_plural = "Course Logs"
 
     def clean(self):
         # Populate the public_id on record creation only.
-        print("in clean")
+        tracer.event("clean", model="CourseLog", pk=self.pk)
         if self.pk is None and not self.public_id:
-            self.public_id = generate_public_key()
+            self.public_id = generate_public_key(self.PUBLIC_ID_SCHEME)
+
+    # The section the row was loaded with, used to move seats on updates.
+    _loaded_section_id = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_section_id = instance.__dict__.get("section_id")
+        return instance
 
     def __str__(self):
         return f"{self.student}'s {self.section.course} log "
 
     def save(self, *args, **kwargs):
-        print("in save")
-        super().save(*args, **kwargs)
+        previous = self._loaded_section_id
+        moved = previous is not None and previous != self.section_id
+
+        with tracer.span(
+            "save", model="CourseLog", adding=self._state.adding, moved=moved
+        ), transaction.atomic():
+            if self._state.adding or moved:
+                if not CourseSection.objects.reserve_seat(
+                    self.section_id, self.get_section_course_id()
+                ):
+                    raise ValidationError(
+                        {"section": _("This section is filled.")}
+                    )
+
+            super().save(*args, **kwargs)
+
+            if moved:
+                CourseSection.objects.release_seat(previous)
+
+        self._loaded_section_id = self.section_id
+
+    def get_section_course_id(self):
+        """
+        Return the course id of the section if the section is loaded,
+        otherwise None.
+        """
+        if CourseLog.section.is_cached(self):
+            return self.section.course_id
+
+        return None
 
     def get_absolute_url(self):
         return reverse("courselog-detail", kwargs={"public_id": self.public_id})
@@ -347,9 +1024,9 @@ class CourseLog(ValidateOnSaveMixin, models.Model):
 # ------------------------------Complain------------------------------
 
 
-class ComplainQuerySet(models.QuerySet):
+class ComplainQuerySet(VersionedQuerySetMixin, models.QuerySet):
     def toggle_status(self, status):
-        print("in the toggle")
+        tracer.event("toggle_status", model="Complain", status=status)
         self.update(status=status)
 
 
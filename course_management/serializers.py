@@ -4,18 +4,28 @@
 #
 
 import datetime
+from collections import Counter
 
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
-from django.db.models import Sum
 
 
 from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.validators import UniqueTogetherValidator
 
-from common.serializer_mixin import SerializerMixin
+from common import generate_public_keys
+from common.serializer_mixin import (
+    PreloadedPrimaryKeyRelatedField,
+    PreloadListSerializerMixin,
+    SerializerMixin,
+)
 from course_management import models
+from course_management.eligibility import EnrollmentEligibility
+
+UserModel = get_user_model()
 
 
 def get_user(request):
@@ -42,6 +52,7 @@ class CourseSectionSerializer(SerializerMixin, serializers.ModelSerializer):
             "first_session_weekday",
             "second_session_weekday",
             "hour_schedule",
+            "schedule_mask",
             "exam_date",
         ]
         read_only_fields = ("public_id", "local_id")
@@ -52,11 +63,43 @@ class CourseSectionSerializer(SerializerMixin, serializers.ModelSerializer):
     #     pass
 
     def validate_instructor(self, instructor):
-        if "Instructor" in instructor.get_group():
+        if "Instructor" in self.get_user_roles(instructor):
             return instructor
         msg = _(f"Invalid instructor.")
         raise serializers.ValidationError(msg)
 
+    def validate(self, attrs):
+        # An instructor teaches one section at a time.
+        values = {
+            name: attrs[name] if name in attrs else getattr(
+                self.instance, name, None
+            )
+            for name in (
+                "instructor", "term", *models.CourseSection.SCHEDULE_FIELDS
+            )
+        }
+        mask = models.CourseSection(**values).get_schedule_mask()
+
+        if mask and values["instructor"] and values["term"]:
+            clashes = models.CourseSection.objects.filter(
+                instructor=values["instructor"], term=values["term"]
+            ).clashing(mask)
+
+            if self.instance is not None:
+                clashes = clashes.exclude(pk=self.instance.pk)
+
+            names = sorted(
+                str(section) for section in clashes.select_related("course")
+            )
+
+            if names:
+                msg = _("The instructor already teaches {} at this time.")
+                raise serializers.ValidationError(
+                    {"instructor": msg.format(", ".join(names))}
+                )
+
+        return attrs
+
 
 # ------------------------------Course------------------------------
 
@@ -65,6 +108,11 @@ class CourseSerializer(SerializerMixin, serializers.ModelSerializer):
     sections = CourseSectionSerializer(
         many=True, read_only=True, required=False
     )
+    # Declared explicitly, DRF makes relations with a through model
+    # read-only.
+    prerequesits = serializers.PrimaryKeyRelatedField(
+        many=True, required=False, queryset=models.Course.objects.all()
+    )
 
     class Meta:
         model = models.Course
@@ -84,6 +132,19 @@ class CourseSerializer(SerializerMixin, serializers.ModelSerializer):
             raise serializers.ValidationError(msg)
         return credit
 
+    def validate_prerequesits(self, prerequesits):
+        # A new course can not close a cycle, nothing requires it yet.
+        if self.instance is not None:
+            try:
+                models.PrerequesitClosure.objects.check_acyclic(
+                    self.instance, prerequesits
+                )
+            except ValidationError as detail:
+                raise serializers.ValidationError(
+                    detail.message_dict["prerequesits"]
+                )
+        return prerequesits
+
     def create(self, validated_data):
         prerequesits = validated_data.pop("prerequesits", [])
         obj = super().create(validated_data)
@@ -100,6 +161,20 @@ class CourseSerializer(SerializerMixin, serializers.ModelSerializer):
         return instance
 
 
+class CourseDependencySerializer(SerializerMixin, serializers.ModelSerializer):
+    """
+    A course found through the prerequesit closure, with the length of
+    the prerequesit chain that connects it.
+    """
+
+    depth = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = models.Course
+        fields = ["public_id", "name", "credit", "depth"]
+        read_only_fields = fields
+
+
 # ------------------------------Term------------------------------
 class TermSerializer(SerializerMixin, serializers.ModelSerializer):
 
@@ -144,56 +219,95 @@ class TermSerializer(SerializerMixin, serializers.ModelSerializer):
 # ------------------------------Course Log------------------------------
 
 
-class ListCourseLogSerializer(SerializerMixin, serializers.ListSerializer):
-    def validate(self, data):
-        MESSAGE1 = _(
-            "You may not take more than 18 credits each term. you have already {} credits."
-        )
-        MESSAGE2 = _("You can not excceed the credit limit which is 18.")
-
-        student = data[0].get("student", None)
-        if not student:
-            student = self.get_request().user
-            if "Student" not in student.get_group():
-                MESSAGE = _(
-                    "Student can not be blank. You should either login as a student or specify a student."
-                )
-                raise serializers.ValidationError({"student": MESSAGE})
+def get_enrolling_student(serializer, student):
+    """
+    Return *student*, or the requesting user if no student was given and
+    the user is a student. Only the staff, administrators and superusers
+    may name another student.
+    """
+    user = serializer.get_request().user
 
-        section = data[0].get("section", None)
-        if section:
-            term = section.term
-            newly_credits = sum(
-                [item.get("section", None).course.credit for item in data]
+    if not student:
+        student = user
+        if "Student" not in serializer.get_user_roles(student):
+            MESSAGE = _(
+                "Student can not be blank. You should either login as a student or specify a student."
             )
-            if newly_credits and newly_credits > 18:
-                raise serializers.ValidationError({"total credit": MESSAGE2})
-            current_credits = models.CourseLog.objects.filter(
-                section__term__pk=term.pk, student__pk=student.pk
-            ).aggregate(soc=Sum("section__course__credit"))["soc"]
-            if current_credits and (newly_credits + current_credits > 18):
-                raise serializers.ValidationError(
-                    {"total credit": MESSAGE1.format(current_credits)}
-                )
+            raise serializers.ValidationError({"student": MESSAGE})
+    elif getattr(student, "pk", student) != user.pk and not (
+        user.is_superuser
+        or serializer.get_user_roles(user) & {"Admin", "Staff"}
+    ):
+        raise PermissionDenied(_("You may only enroll yourself."))
+    return student
+
+
+def check_eligibility(student, sections):
+    """
+    Raise a ValidationError with the rejection reasons keyed by section
+    if the student may not enroll in any of *sections*.
+    """
+    results = EnrollmentEligibility(student, sections).check()
+    rejected = {
+        str(result["section"]): result["reasons"]
+        for result in results
+        if not result["accepted"]
+    }
+
+    if rejected:
+        raise serializers.ValidationError({"eligibility": rejected})
+
+
+class ListCourseLogSerializer(
+    PreloadListSerializerMixin, SerializerMixin, serializers.ListSerializer
+):
+    def validate(self, data):
+        # Grades are entered by ListGradeEntrySerializer.
+        if self.instance is not None or not data:
+            return data
+
+        student = get_enrolling_student(self, data[0].get("student", None))
+
+        if any(item.get("student", student) != student for item in data):
+            MESSAGE = _("All course logs must belong to the same student.")
+            raise serializers.ValidationError({"student": MESSAGE})
+
+        for item in data:
+            item["student"] = student
+
+        check_eligibility(student, [item["section"] for item in data])
         return data
 
-    def update(self, instances, validated_data):
-        result = []
+    def create(self, validated_data):
+        """
+        Enroll in every section with a single INSERT. The seats of all the
+        sections are reserved first, in the same transaction.
+        """
+        logs = []
+        public_ids = generate_public_keys(
+            len(validated_data), models.CourseLog.PUBLIC_ID_SCHEME
+        )
 
-        dinstances = {item.public_id: item for item in instances}
-        dvalidated = {item["public_id"]: item for item in validated_data}
-        for id, data in dvalidated.items():
-            instance = dinstances.get(id, None)
-            result.append(self.child.update(instance, data))
-        return result
+        for attrs, public_id in zip(validated_data, public_ids):
+            attrs.pop("public_id", None)
+            logs.append(models.CourseLog(public_id=public_id, **attrs))
 
-    # def create(self, validated_data):
-    # return [self.child.create(attrs) for attrs in validated_data]
+        seats = Counter(log.section_id for log in logs)
+
+        with transaction.atomic():
+            models.CourseSection.objects.reserve_seats(seats)
+            return models.CourseLog.objects.bulk_create(logs)
 
 
 class CourseLogSerializer(SerializerMixin, serializers.ModelSerializer):
-    public_id = serializers.CharField()
+    public_id = serializers.CharField(required=False)
     # public_id = serializers.SerializerMethodField()
+    student = PreloadedPrimaryKeyRelatedField(
+        queryset=UserModel.objects.all(), required=False
+    )
+    section = PreloadedPrimaryKeyRelatedField(
+        queryset=models.CourseSection.objects.all()
+    )
 
     class Meta:
         model = models.CourseLog
@@ -206,7 +320,6 @@ class CourseLogSerializer(SerializerMixin, serializers.ModelSerializer):
             "final_exam",
             "final_grade",
             "status",
-            "my_public_id",
         ]
         read_only_fields = ("public_id",)
         list_serializer_class = ListCourseLogSerializer
@@ -221,27 +334,18 @@ class CourseLogSerializer(SerializerMixin, serializers.ModelSerializer):
     #     return obj.public_id
 
     def validate(self, data):
-        # to be added
-        # Make sure that all data entries belong to the same user
-
-        student = data.get("student", None)
-        if not student:
-            student = self.get_request().user
-            if "Student" not in student.get_group():
-                MESSAGE = _(
-                    "Student can not be blank. You should either login as a student or specify a student."
-                )
-                raise serializers.ValidationError({"student": MESSAGE})
-        return data
+        # Enrollments in bulk are checked once by ListCourseLogSerializer.
+        if self.instance is not None or self.parent is not None:
+            return data
 
-    def validate_section(self, section):
-        MESSAGE = _("This section is filled.")
-        if section.filled_capacity == section.total_capacity:
-            raise serializers.ValidationError({"Section Capacity": MESSAGE})
-        return section
+        data["student"] = get_enrolling_student(
+            self, data.get("student", None)
+        )
+        check_eligibility(data["student"], [data["section"]])
+        return data
 
     def validate_student(self, student):
-        if "Student" in student.get_group():
+        if "Student" in self.get_user_roles(student):
             return student
         msg = _("Must be a student.")
         raise serializers.ValidationError(msg)
@@ -268,10 +372,133 @@ class CourseLogSerializer(SerializerMixin, serializers.ModelSerializer):
             raise serializers.ValidationError(msg)
 
     def create(self, validated_data):
+        # The public_id is only accepted to identify rows on bulk updates.
+        validated_data.pop("public_id", None)
         obj = super().create(validated_data)
         return obj
 
 
+class ListGradeEntrySerializer(SerializerMixin, serializers.ListSerializer):
+    """
+    Validate every grade entry in memory and apply the valid ones with a
+    single ``bulk_update``. Invalid rows do not fail the request, they are
+    reported in ``rejected`` and rows that do not exist in ``missing``.
+    Only the first ``max_rejected`` invalid rows are reported,
+    ``rejected_count`` counts them all.
+    """
+
+    max_rejected = 100
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        entries = []
+        seen = set()
+        self.rejected = {}
+        self.rejected_count = 0
+
+        for idx, item in enumerate(data):
+            public_id = str(
+                item.get("public_id", idx) if isinstance(item, dict) else idx
+            )
+
+            try:
+                if public_id in seen:
+                    MESSAGE = _("This course log was given more than once.")
+                    raise serializers.ValidationError({"public_id": MESSAGE})
+
+                entries.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.rejected_count += 1
+
+                if len(self.rejected) < self.max_rejected:
+                    self.rejected[public_id] = exc.detail
+            else:
+                seen.add(public_id)
+
+        return entries
+
+    def update(self, queryset, validated_data):
+        with transaction.atomic():
+            logs, self.missing = queryset.apply_grades(validated_data)
+
+        return logs
+
+    def to_representation(self, data):
+        return {
+            "results": CourseLogSerializer(data, many=True).data,
+            "missing": getattr(self, "missing", []),
+            "rejected": getattr(self, "rejected", {}),
+            "rejected_count": getattr(self, "rejected_count", 0),
+        }
+
+    @property
+    def data(self):
+        return serializers.ReturnDict(
+            self.to_representation(self.instance), serializer=self
+        )
+
+
+class GradeEntrySerializer(SerializerMixin, serializers.ModelSerializer):
+    """
+    One row of a grade entry, the course log is identified by its public_id.
+    """
+    public_id = serializers.CharField()
+
+    class Meta:
+        model = models.CourseLog
+        fields = ["public_id", *models.CourseLog.GRADE_FIELDS]
+        extra_kwargs = {
+            field: {"max_value": 20}
+            for field in ("midterm_exam", "final_exam", "final_grade")
+        }
+        list_serializer_class = ListGradeEntrySerializer
+
+    def validate(self, data):
+        # Partial updates skip required fields, but rows need their key.
+        if "public_id" not in data:
+            MESSAGE = _("This field is required.")
+            raise serializers.ValidationError({"public_id": MESSAGE})
+
+        return data
+
+
+class EligibilitySerializer(SerializerMixin, serializers.Serializer):
+    """
+    A dry run of an enrollment: the student (the requesting user if not
+    given) and the primary keys of the requested sections.
+    """
+
+    student = serializers.PrimaryKeyRelatedField(
+        queryset=UserModel.objects.all(), required=False
+    )
+    sections = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+
+    def validate_student(self, student):
+        if "Student" in self.get_user_roles(student):
+            return student
+        msg = _("Must be a student.")
+        raise serializers.ValidationError(msg)
+
+    def validate(self, data):
+        data["student"] = get_enrolling_student(
+            self, data.get("student", None)
+        )
+        return data
+
+    def to_representation(self, instance):
+        results = EnrollmentEligibility(
+            instance["student"], instance["sections"]
+        ).check()
+        return {
+            "eligible": all(result["accepted"] for result in results),
+            "results": results,
+        }
+
+
 # ------------------------------Complain------------------------------
 
 
@@ -1,7 +1,136 @@
 from django.core.signals import request_finished
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
 from django.dispatch import receiver
 
+from common.model_versions import bump_model_version, track_model_versions
+from common.tracing import Tracer
+from course_management.models import (
+    Complain,
+    Course,
+    CourseLog,
+    CourseSection,
+    Prerequesit,
+    PrerequesitClosure,
+    Term,
+    bump_representations,
+)
+
+tracer = Tracer(__name__)
+
+track_model_versions(Complain, Course, CourseLog, CourseSection, Term)
+
 
 @receiver(request_finished)
 def my_callback(sender, **kwargs):
-    print("Request finished!")
+    tracer.count("requests_finished")
+
+
+@receiver(post_delete, sender=CourseLog)
+def release_section_seat(sender, instance, **kwargs):
+    # Also runs for cascaded and queryset deletes.
+    CourseSection.objects.release_seat(
+        instance.section_id, instance.get_section_course_id()
+    )
+
+
+@receiver(m2m_changed, sender=Course.prerequesits.through)
+def check_prerequesits_acyclic(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # Added rows are bulk created without a pre_save.
+    if action != "pre_add":
+        return
+
+    if reverse:
+        for pk in pk_set:
+            PrerequesitClosure.objects.check_acyclic(pk, [instance])
+    else:
+        PrerequesitClosure.objects.check_acyclic(instance, pk_set)
+
+
+@receiver(m2m_changed, sender=Course.prerequesits.through)
+def bump_course_version(sender, instance, action, reverse, pk_set, **kwargs):
+    # The prerequesits are part of the course representation.
+    if action == "pre_clear" and reverse:
+        # The courses requiring *instance* are gone once cleared.
+        instance._requiring_course_ids = list(
+            Prerequesit.objects.filter(to_course=instance).values_list(
+                "from_course", flat=True
+            )
+        )
+    elif action.startswith("post_"):
+        bump_model_version(Course)
+
+        if not reverse:
+            courses = [instance.pk]
+        elif action == "post_clear":
+            courses = instance.__dict__.pop("_requiring_course_ids", ())
+        else:
+            courses = pk_set
+        bump_representations(courses=courses)
+
+        # Added rows are bulk created without a post_save, removed ones
+        # refresh the closure from post_delete.
+        if action == "post_add":
+            PrerequesitClosure.objects.refresh(*courses)
+
+
+# The cached representations of courses and terms, see
+# common.view_mixins.CachedRepresentationMixin.
+@receiver(post_save, sender=Course)
+def bump_course_representation(sender, instance, created, **kwargs):
+    # Terms list the names of their courses.
+    terms = ()
+    if not created:
+        terms = CourseSection.objects.filter(course=instance).values_list(
+            "term", flat=True
+        )
+    bump_representations(courses=[instance.pk], terms=terms)
+
+
+@receiver(post_delete, sender=Course)
+def drop_course_representation(sender, instance, **kwargs):
+    # The sections went first, bumping their terms.
+    bump_representations(courses=[instance.pk])
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def bump_term_representation(sender, instance, **kwargs):
+    bump_representations(terms=[instance.pk])
+
+
+@receiver(post_save, sender=CourseSection)
+@receiver(post_delete, sender=CourseSection)
+def bump_section_representations(sender, instance, **kwargs):
+    bump_representations(
+        courses={instance.course_id, instance._loaded_course_id},
+        terms={instance.term_id, instance._loaded_term_id},
+    )
+
+
+@receiver(post_save, sender=Prerequesit)
+@receiver(post_delete, sender=Prerequesit)
+def bump_prerequesit_representation(sender, instance, **kwargs):
+    bump_representations(courses=[instance.from_course_id])
+
+
+@receiver(pre_save, sender=Prerequesit)
+def check_prerequesit_acyclic(sender, instance, **kwargs):
+    PrerequesitClosure.objects.check_acyclic(
+        instance.from_course_id, [instance.to_course_id]
+    )
+
+
+@receiver(post_save, sender=Prerequesit)
+@receiver(post_delete, sender=Prerequesit)
+def refresh_prerequesit_closure(sender, instance, **kwargs):
+    # Also runs for the prerequesits removed from the relation and for
+    # those cascaded by the deletion of either course: the whole batch is
+    # gone by then, the deleted course drops out of every chain.
+    PrerequesitClosure.objects.refresh(instance.from_course_id)
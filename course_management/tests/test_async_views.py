@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from common.authentication import clear_token_cache
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+
+class AsyncViewTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        cls.student.groups.add(groups["Student"])
+        cls.other = User.members.create_user(
+            username="other", password="testpassword"
+        )
+        cls.other.groups.add(groups["Student"])
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.instructor.groups.set([groups["Instructor"]])
+        cls.term = models.Term.objects.create(
+            season=3, start_date="2021-09-23"
+        )
+        cls.sections = []
+        for name in ("Compilers", "Automata", "Databases"):
+            course = models.Course.objects.create(name=name, credit=3)
+            cls.sections.append(
+                create_section(course, cls.term, cls.instructor)
+            )
+        cls.course = cls.sections[0].course
+        models.CourseLog.objects.create(
+            student=cls.student, section=cls.sections[0]
+        )
+        models.CourseLog.objects.create(
+            student=cls.other, section=cls.sections[1]
+        )
+
+    def setUp(self):
+        cache.clear()
+        clear_token_cache()
+        self.token = Token.objects.create(user=self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def get(self, name, query="", **kwargs):
+        url = reverse(name, kwargs=kwargs or None)
+        return self.client.get(f"{url}{query}")
+
+    def test_matches_sync_views(self):
+        for name, query, kwargs in (
+            ("course-list", "", {}),
+            ("course-list", "?limit=2&offset=1", {}),
+            ("course-list", "?name=Automata", {}),
+            ("course-detail", "", {"public_id": self.course.public_id}),
+            ("term-list", "", {}),
+            ("coursesection-list", "?limit=1&offset=2", {}),
+            ("coursesection-list", f"?instructor={self.instructor.pk}", {}),
+        ):
+            with self.subTest(name=name, query=query):
+                response = self.get(f"async-{name}", query, **kwargs)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                # Only the links to the other pages differ.
+                self.assertEqual(
+                    response.content.replace(b"/cm/async/", b"/cm/"),
+                    self.get(name, query, **kwargs).content,
+                )
+
+    def test_page_links(self):
+        data = self.get("async-course-list", "?limit=1&offset=1").json()
+        self.assertEqual(data["count"], 3)
+        self.assertTrue(data["next"].endswith("?limit=1&offset=2"))
+        self.assertTrue(data["previous"].endswith("?limit=1"))
+        data = self.get("async-course-list", "?limit=1&offset=2").json()
+        self.assertIsNone(data["next"])
+
+    def test_my_course_logs(self):
+        data = self.get("async-courselog-mine").json()
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["student"], self.student.pk)
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token "
+            + Token.objects.create(user=self.instructor).key
+        )
+        response = self.get("async-courselog-mine")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_not_authenticated(self):
+        self.client.credentials()
+        response = self.get("async-course-list")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + "0" * 40)
+        response = self.get("async-course-list")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_not_found(self):
+        response = self.get("async-course-detail", public_id="missing")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_read_only(self):
+        response = self.client.post(reverse("async-course-list"))
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+        self.assertEqual(response["Allow"], "GET, HEAD")
+
+    def test_not_modified(self):
+        response = self.get("async-course-list")
+        etag = response["ETag"]
+        response = self.client.get(
+            reverse("async-course-list"), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        models.Course.objects.create(name="Networks", credit=3)
+        response = self.client.get(
+            reverse("async-course-list"), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 4)
+
+    async def test_async_client(self):
+        response = await self.async_client.get(
+            reverse("async-course-list"),
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"]), 3)
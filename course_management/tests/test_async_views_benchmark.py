@@ -0,0 +1,118 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from common.authentication import clear_token_cache
+from common.tests.base_tests import (
+    best_time, create_role_groups, run_benchmarks)
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+
+@run_benchmarks
+class AsyncViewBenchmark(APITestCase):
+    """
+    Throughput of the course list: the DRF view called as under WSGI, the
+    same view called concurrently as under ASGI, each request waiting for
+    a thread, and the async view called concurrently.
+
+    In process the ASGI numbers are bound by thread switches: Django 4.2
+    runs every middleware hook, ORM and cache call of an async request in
+    a thread. The async view takes three for a page and none for a 304,
+    the DRF view holds one for the whole request.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        course_management.tests.test_async_views_benchmark
+    """
+    COURSES = 50
+    REQUESTS = 200
+    PAGE = "?limit=20"
+
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.user = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        term = models.Term.objects.create(season=3, start_date="2021-09-23")
+        for idx in range(cls.COURSES):
+            course = models.Course.objects.create(
+                name=f"Course {idx:03}", credit=3
+            )
+            create_section(course, term, instructor)
+
+    def setUp(self):
+        cache.clear()
+        clear_token_cache()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def _report(self, name, run):
+        run()
+        elapsed = best_time(run, repeat=3)
+        print(f"{name:>14}: {self.REQUESTS * 1000 / elapsed:8.0f} requests/s")
+        return elapsed
+
+    def _headers(self, url, revalidate):
+        headers = {"Authorization": "Token " + self.token.key}
+        if revalidate:
+            headers["If-None-Match"] = self.client.get(url)["ETag"]
+        return headers
+
+    def _sequential(self, name, revalidate):
+        url = reverse(name) + self.PAGE
+        headers = self._headers(url, revalidate)
+        expected = (
+            status.HTTP_304_NOT_MODIFIED if revalidate else status.HTTP_200_OK
+        )
+
+        def run():
+            for idx in range(self.REQUESTS):
+                response = self.client.get(url, headers=headers)
+                self.assertEqual(response.status_code, expected)
+
+        return run
+
+    def _concurrent(self, name, revalidate):
+        url = reverse(name) + self.PAGE
+        headers = self._headers(url, revalidate)
+        expected = (
+            status.HTTP_304_NOT_MODIFIED if revalidate else status.HTTP_200_OK
+        )
+        client = AsyncClient()
+
+        async def gather():
+            responses = await asyncio.gather(
+                *(
+                    client.get(url, headers=headers)
+                    for idx in range(self.REQUESTS)
+                )
+            )
+            for response in responses:
+                self.assertEqual(response.status_code, expected)
+
+        return async_to_sync(gather)
+
+    def _compare(self, title, revalidate=False):
+        print(f"{self.REQUESTS} {title}")
+        self._report("WSGI, DRF", self._sequential("course-list", revalidate))
+        self._report("ASGI, DRF", self._concurrent("course-list", revalidate))
+        self._report(
+            "ASGI, async", self._concurrent("async-course-list", revalidate)
+        )
+
+    def test_throughput(self):
+        print()
+        self._compare(f"requests for {self.PAGE}")
+        self._compare("revalidations", revalidate=True)
@@ -0,0 +1,110 @@
+import datetime
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from common import generate_public_key
+from common.authentication import clear_token_cache
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from user_management.models import User
+
+
+class CatalogueQueryCountTest(APITestCase):
+    """
+    The catalogue list endpoints must load a page in a constant number of
+    queries whatever the page size.
+    """
+    PAGE_SIZES = (5, 50, 500)
+
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.user = User.members.create_superuser(
+            username="admin", email=None, password="testpassword"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        size = max(cls.PAGE_SIZES)
+        courses = models.Course.objects.bulk_create(
+            models.Course(
+                public_id=generate_public_key(), name=f"Course {idx}", credit=3
+            )
+            for idx in range(size)
+        )
+        terms = models.Term.objects.bulk_create(
+            models.Term(
+                public_id=generate_public_key(),
+                season=models.Term.SPRING,
+                start_date=datetime.date(2000, 1, 1)
+                + datetime.timedelta(days=idx),
+            )
+            for idx in range(size)
+        )
+        models.CourseSection.objects.bulk_create(
+            models.CourseSection(
+                public_id=generate_public_key(),
+                course=course,
+                term=term,
+                local_id=1,
+                total_capacity=30,
+                instructor=cls.user,
+                first_session_weekday="Saturday",
+                second_session_weekday="Monday",
+                hour_schedule="8-10",
+                exam_date="2021-06-10",
+            )
+            for course, term in zip(courses, terms)
+        )
+        Prerequesit = models.Course.prerequesits.through
+        Prerequesit.objects.bulk_create(
+            Prerequesit(from_course=course, to_course=required)
+            for course, required in zip(courses[1:], courses)
+        )
+
+    def setUp(self):
+        clear_token_cache()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def _assert_constant_queries(self, url_name, num):
+        url = reverse(url_name)
+        # Seeds the cached token, model versions and modification times.
+        self.client.get(url)
+
+        for size in self.PAGE_SIZES:
+            # Serialized courses and terms are cached, measure misses.
+            models.bump_representations(
+                courses=models.Course.objects.values_list("pk", flat=True),
+                terms=models.Term.objects.values_list("pk", flat=True),
+            )
+
+            with self.subTest(page_size=size), self.assertNumQueries(num):
+                # Counted every time, the count is otherwise cached.
+                response = self.client.get(
+                    url, {"limit": size, "exact_count": 1}
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.data["results"]), size)
+
+    def test_course_list(self):
+        # count, courses, sections, prerequisites
+        self._assert_constant_queries("course-list", 4)
+
+    def test_term_list(self):
+        # count, terms, classes with their courses
+        self._assert_constant_queries("term-list", 3)
+
+    def test_cached_representations(self):
+        for url_name in ("course-list", "term-list"):
+            url = reverse(url_name)
+            self.client.get(url)
+
+            # count, courses or terms
+            with self.subTest(url_name=url_name), self.assertNumQueries(2):
+                self.client.get(url, {"exact_count": 1})
+
+    def test_coursesection_list(self):
+        # count, sections
+        self._assert_constant_queries("coursesection-list", 2)
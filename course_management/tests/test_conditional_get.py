@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+
+class ConditionalGetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        cls.student.groups.add(groups["Student"])
+        cls.course = models.Course.objects.create(name="Compilers", credit=3)
+        cls.term = models.Term.objects.create(
+            season=3, start_date="2021-09-23"
+        )
+        cls.section = create_section(cls.course, cls.term, cls.student)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.student)
+
+    def get(self, name, **headers):
+        return self.client.get(reverse(name), **headers)
+
+    def test_not_modified_skips_queries(self):
+        for name in ("course-list", "term-list", "coursesection-list"):
+            with self.subTest(name=name):
+                response = self.get(name)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertTrue(response["ETag"].startswith('"'))
+
+                with self.assertNumQueries(0):
+                    response = self.get(
+                        name, HTTP_IF_NONE_MATCH=response["ETag"]
+                    )
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_304_NOT_MODIFIED
+                )
+
+    def test_if_modified_since(self):
+        response = self.get("course-list")
+        response = self.get(
+            "course-list", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_change_etag(self):
+        etag = self.get("term-list")["ETag"]
+        # Terms list the names of their sections' courses.
+        self.course.name = "Compiler Design"
+        self.course.save()
+        response = self.get("term-list", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_prerequesits_change_etag(self):
+        etag = self.get("course-list")["ETag"]
+        required = models.Course.objects.create(name="Automata", credit=3)
+        etag = self.get("course-list")["ETag"]
+        self.course.process_prerequesits([required])
+        response = self.get("course-list", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_query(self):
+        url = reverse("course-list")
+        first = self.client.get(url)
+        second = self.client.get(url, {"limit": 1})
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_detail(self):
+        url = reverse(
+            "coursesection-detail",
+            kwargs={"public_id": self.section.public_id},
+        )
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
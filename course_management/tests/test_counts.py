@@ -0,0 +1,140 @@
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.counting import count_rows, estimate_table_rows
+from common.model_versions import get_model_version
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+
+def count_queries(ctx):
+    return len([q for q in ctx.captured_queries
+                if q["sql"].upper().startswith("SELECT COUNT(")])
+
+
+class ListCountTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.admin = User.members.create_superuser(
+            username="admin", password="testpassword", email="a@example.com"
+        )
+        cls.course = models.Course.objects.create(name="Compilers", credit=3)
+        cls.term = models.Term.objects.create(
+            season=3, start_date="2021-09-23"
+        )
+
+        for idx in range(3):
+            create_section(cls.course, cls.term, cls.admin)
+
+        cls.url = reverse("coursesection-list")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def get_count(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["count"], count_queries(ctx)
+
+    def test_count_is_cached(self):
+        self.assertEqual(self.get_count(), (3, 1))
+        self.assertEqual(self.get_count(), (3, 0))
+        self.assertEqual(self.get_count({"offset": 2}), (3, 0))
+
+    def test_filters_are_cached_apart(self):
+        self.assertEqual(self.get_count(), (3, 1))
+        self.assertEqual(
+            self.get_count({"instructor": self.admin.pk + 1}), (0, 1)
+        )
+
+    def test_write_invalidates_count(self):
+        self.assertEqual(self.get_count(), (3, 1))
+        create_section(self.course, self.term, self.admin)
+        self.assertEqual(self.get_count(), (4, 1))
+
+    def test_exact_count(self):
+        self.assertEqual(self.get_count(), (3, 1))
+        self.assertEqual(self.get_count({"exact_count": "1"}), (3, 1))
+
+
+class ModelVersionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.course = models.Course.objects.create(name="Compilers", credit=3)
+        cls.term = models.Term.objects.create(
+            season=3, start_date="2021-09-23"
+        )
+
+    def assertBumps(self, model, func):
+        version = get_model_version(model)
+        func()
+        self.assertNotEqual(get_model_version(model), version)
+
+    def test_queryset_writes_bump(self):
+        section = create_section(self.course, self.term, self.instructor)
+        sections = models.CourseSection.objects.all()
+
+        self.assertBumps(
+            models.CourseSection, lambda: sections.update(total_capacity=40)
+        )
+        section.total_capacity = 50
+        self.assertBumps(
+            models.CourseSection,
+            lambda: sections.bulk_update([section], ["total_capacity"]),
+        )
+        self.assertBumps(
+            models.CourseLog,
+            lambda: models.CourseLog.objects.bulk_create([
+                models.CourseLog(
+                    student=self.instructor, section=section, public_id="x"
+                )
+            ]),
+        )
+
+    def test_saves_and_deletes_bump(self):
+        self.assertBumps(
+            models.Course,
+            lambda: models.Course.objects.create(name="Optics", credit=2),
+        )
+        self.assertBumps(models.Course, self.course.delete)
+
+
+class CountRowsTest(TestCase):
+    def test_empty_filter(self):
+        self.assertEqual(
+            count_rows(models.Course.objects.filter(pk__in=[])), 0
+        )
+
+    @skipUnless(connection.vendor != "postgresql", "PostgreSQL estimates")
+    def test_no_estimate(self):
+        self.assertIsNone(estimate_table_rows(models.Course))
+
+    @skipUnless(connection.vendor == "postgresql", "PostgreSQL only")
+    def test_estimate(self):
+        models.Course.objects.bulk_create(
+            models.Course(name=f"Course {idx}", credit=3, public_id=str(idx))
+            for idx in range(100)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {models.Course._meta.db_table}")
+
+        self.assertEqual(estimate_table_rows(models.Course), 100)
@@ -1,4 +1,10 @@
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from common.model_mixins import (
+    VALIDATE_DB, VALIDATE_FIELDS, VALIDATE_FULL, validation_level)
 from course_management import models
 
 
@@ -12,3 +18,209 @@ class CourseTestCase(TestCase):
         signal = models.Course.objects.get(name="Signals&Systems")
         self.assertEqual(control.__str__(), "Linear Control")
         self.assertEqual(signal.__str__(), "Signals&Systems")
+
+
+class PrerequesitFilterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create = models.Course.objects.create
+        cls.calculus = create(name="Calculus", credit=3)
+        cls.physics = create(name="Physics", credit=3)
+        cls.algebra = create(name="Algebra", credit=3)
+        cls.dynamics = create(name="Dynamics", credit=3)
+        cls.dynamics.process_prerequesits([cls.calculus, cls.physics])
+        cls.signals = create(name="Signals", credit=3)
+        cls.signals.process_prerequesits([cls.calculus, cls.algebra])
+
+    def _names(self, queryset):
+        return list(queryset.values_list("name", flat=True))
+
+    def test_match_all(self):
+        queryset = models.Course.objects.with_prerequesits(
+            ["calculus", " PHYSICS"]
+        )
+        self.assertEqual(self._names(queryset), ["Dynamics"])
+
+    def test_match_any(self):
+        queryset = models.Course.objects.with_prerequesits(
+            ["Physics", "Algebra"], match_all=False
+        )
+        self.assertEqual(self._names(queryset), ["Dynamics", "Signals"])
+
+    def test_composes_with_other_filters(self):
+        queryset = models.Course.objects.filter(
+            name="Signals"
+        ).with_prerequesits(["Calculus"])
+        self.assertEqual(self._names(queryset), ["Signals"])
+
+        with self.assertNumQueries(1):
+            self._names(queryset)
+
+
+class PrerequesitClosureTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create = models.Course.objects.create
+        cls.calculus1 = create(name="Calculus I", credit=3)
+        cls.calculus2 = create(name="Calculus II", credit=3)
+        cls.physics = create(name="Physics", credit=3)
+        cls.compilers = create(name="Compilers", credit=3)
+        cls.calculus2.process_prerequesits([cls.calculus1])
+        cls.physics.process_prerequesits([cls.calculus1])
+        cls.compilers.process_prerequesits([cls.calculus2, cls.physics])
+
+    def _closure(self, course):
+        return dict(
+            models.PrerequesitClosure.objects.filter(course=course)
+            .values_list("prerequesit__name", "depth")
+        )
+
+    def test_transitive_prerequesits(self):
+        self.assertEqual(
+            self._closure(self.compilers),
+            {"Calculus II": 1, "Physics": 1, "Calculus I": 2},
+        )
+
+    def test_dependents_follow_edge_changes(self):
+        algebra = models.Course.objects.create(name="Algebra", credit=3)
+        self.calculus1.process_prerequesits([algebra])
+        self.assertEqual(self._closure(self.compilers)["Algebra"], 3)
+        self.calculus1.process_prerequesits([])
+        self.assertNotIn("Algebra", self._closure(self.compilers))
+
+    def test_relation_changes(self):
+        algebra = models.Course.objects.create(name="Algebra", credit=3)
+        self.calculus1.prerequesits.add(algebra)
+        self.assertEqual(self._closure(self.compilers)["Algebra"], 3)
+        self.calculus1.prerequesits.remove(algebra)
+        self.assertNotIn("Algebra", self._closure(self.compilers))
+
+        edge = models.Prerequesit.objects.create(
+            from_course=self.calculus1, to_course=algebra
+        )
+        self.assertEqual(self._closure(self.physics), {
+            "Calculus I": 1, "Algebra": 2,
+        })
+        edge.delete()
+        self.assertEqual(self._closure(self.physics), {"Calculus I": 1})
+
+    def test_course_deleted_mid_chain(self):
+        self.physics.delete()
+        self.calculus2.delete()
+        self.assertEqual(self._closure(self.compilers), {})
+        self.assertFalse(
+            models.PrerequesitClosure.objects.filter(
+                prerequesit=self.calculus1
+            ).exists()
+        )
+
+    def test_matches_rebuild(self):
+        create = models.Course.objects.create
+        algebra = create(name="Algebra", credit=3)
+        logic = create(name="Logic", credit=3)
+        self.calculus1.prerequesits.add(algebra)
+        algebra.prerequesits.add(logic)
+        self.compilers.prerequesits.add(logic)
+        self.physics.prerequesits.remove(self.calculus1)
+        models.Prerequesit.objects.create(
+            from_course=self.physics, to_course=logic
+        )
+        self.calculus1.delete()
+        closure = set(
+            models.PrerequesitClosure.objects.values_list(
+                "course", "prerequesit", "depth"
+            )
+        )
+        models.PrerequesitClosure.objects.rebuild()
+        self.assertEqual(
+            closure,
+            set(
+                models.PrerequesitClosure.objects.values_list(
+                    "course", "prerequesit", "depth"
+                )
+            ),
+        )
+
+    def test_edge_table_not_read_whole(self):
+        algebra = models.Course.objects.create(name="Algebra", credit=3)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.physics.prerequesits.add(algebra)
+
+        table = models.Prerequesit._meta.db_table
+        reads = [q["sql"] for q in ctx.captured_queries
+                 if q["sql"].startswith("SELECT") and f'FROM "{table}"'
+                 in q["sql"]]
+        self.assertTrue(reads)
+        self.assertTrue(all(" WHERE " in sql for sql in reads), reads)
+        self.assertEqual(self._closure(self.compilers)["Algebra"], 2)
+
+    def test_cycle_rejected_on_any_path(self):
+        additions = (
+            lambda: self.calculus1.prerequesits.add(self.compilers),
+            lambda: self.compilers.course_set.add(self.calculus1),
+            lambda: models.Prerequesit.objects.create(
+                from_course=self.calculus1, to_course=self.compilers
+            ),
+        )
+
+        for add in additions:
+            # The relation adds without a savepoint of its own.
+            with self.assertRaises(ValidationError), transaction.atomic():
+                add()
+
+        self.assertFalse(
+            models.Prerequesit.objects.filter(
+                from_course=self.calculus1
+            ).exists()
+        )
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.calculus1.process_prerequesits([self.compilers])
+
+        with self.assertRaises(ValidationError):
+            self.calculus1.process_prerequesits([self.calculus1])
+
+        self.assertEqual(self._closure(self.calculus1), {})
+
+    def test_rebuild(self):
+        models.PrerequesitClosure.objects.all().delete()
+        models.PrerequesitClosure.objects.rebuild()
+        self.assertEqual(len(self._closure(self.compilers)), 3)
+
+
+class ValidationLevelTestCase(TestCase):
+    def _count_queries(self, level, name):
+        with validation_level(level), \
+                CaptureQueriesContext(connection) as ctx:
+            course = models.Course.objects.create(name=name, credit=3)
+
+        self.assertTrue(course.public_id)
+        return len([q for q in ctx.captured_queries
+                    if "SAVEPOINT" not in q["sql"]])
+
+    def test_levels_skip_uniqueness_queries(self):
+        # public_id and name are checked before the insert.
+        self.assertEqual(self._count_queries(VALIDATE_FULL, "Calculus"), 3)
+        self.assertEqual(self._count_queries(VALIDATE_FIELDS, "Physics"), 1)
+        self.assertEqual(self._count_queries(VALIDATE_DB, "Algebra"), 1)
+
+    def test_fields_level_runs_field_validators(self):
+        with self.assertRaises(ValidationError) as cm:
+            self._count_queries(VALIDATE_FIELDS, "Calculus" * 10)
+
+        self.assertIn("name", cm.exception.message_dict)
+
+    def test_integrity_error_becomes_validation_error(self):
+        models.Course.objects.create(name="Calculus", credit=3)
+
+        for level in (VALIDATE_FIELDS, VALIDATE_DB):
+            with self.subTest(level=level), validation_level(level), \
+                    self.assertRaises(ValidationError) as cm:
+                models.Course.objects.create(name="Calculus", credit=3)
+
+            self.assertIn("name", cm.exception.message_dict)
+
+        # The savepoint leaves the transaction usable.
+        self.assertEqual(models.Course.objects.count(), 1)
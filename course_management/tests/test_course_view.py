@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
@@ -5,6 +7,7 @@ from rest_framework.test import APITestCase, APIClient
 from rest_framework.authtoken.models import Token
 from requests.auth import HTTPBasicAuth
 
+from common.authentication import clear_token_cache
 from course_management import models
 from user_management.models import User
 
@@ -42,3 +45,97 @@ class CourseViewTest(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
         response = self.client.post(self.url, data_dict)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_by_prerequesits(self):
+        calculus = models.Course.objects.create(name="Calculus", credit=3)
+        physics = models.Course.objects.create(name="Physics", credit=3)
+        dynamics = models.Course.objects.create(name="Dynamics", credit=3)
+        dynamics.process_prerequesits([calculus, physics])
+        models.Course.objects.create(
+            name="Statics", credit=3
+        ).process_prerequesits([physics])
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+        response = self.client.get(
+            self.url, {"prerequesits": "calculus,physics"}
+        )
+        names = [item["name"] for item in response.data["results"]]
+        self.assertEqual(names, ["Dynamics"])
+
+        response = self.client.get(
+            self.url,
+            {
+                "prerequesits": "calculus,physics",
+                "prerequesits_match": "any",
+                "name": "Statics",
+            },
+        )
+        names = [item["name"] for item in response.data["results"]]
+        self.assertEqual(names, ["Statics"])
+
+    def test_prerequesits_and_unlocks(self):
+        calculus = models.Course.objects.create(name="Calculus", credit=3)
+        physics = models.Course.objects.create(name="Physics", credit=3)
+        dynamics = models.Course.objects.create(name="Dynamics", credit=3)
+        physics.process_prerequesits([calculus])
+        dynamics.process_prerequesits([physics])
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+        url = reverse(
+            "course-prerequesits", kwargs={"public_id": dynamics.public_id}
+        )
+        response = self.client.get(url)
+        self.assertEqual([item["name"] for item in response.data],
+                         ["Physics"])
+        response = self.client.get(url, {"transitive": 1})
+        self.assertEqual(
+            [(item["name"], item["depth"]) for item in response.data],
+            [("Physics", 1), ("Calculus", 2)],
+        )
+
+        url = reverse(
+            "course-unlocks", kwargs={"public_id": calculus.public_id}
+        )
+        response = self.client.get(url, {"transitive": 1})
+        self.assertEqual([item["name"] for item in response.data],
+                         ["Physics", "Dynamics"])
+
+        url = reverse("course-unlocks", kwargs={"public_id": "missing"})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_rejects_prerequesit_cycle(self):
+        calculus = models.Course.objects.create(name="Calculus", credit=3)
+        physics = models.Course.objects.create(name="Physics", credit=3)
+        physics.process_prerequesits([calculus])
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        url = reverse("course-detail", kwargs={"public_id": calculus.public_id})
+        response = self.client.patch(
+            url, {"prerequesits": [physics.pk]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("prerequesits", response.data)
+
+    def test_post_course_with_prerequesits(self):
+        calculus = models.Course.objects.create(name="Calculus", credit=3)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        data = {"name": "Physics", "credit": 3, "prerequesits": [calculus.pk]}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["prerequesits"], [calculus.pk])
+
+    def test_post_course_skips_model_uniqueness_queries(self):
+        clear_token_cache()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                self.url, {"name": "Compilers", "credit": 3}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        queries = [q["sql"] for q in ctx.captured_queries
+                   if "SAVEPOINT" not in q["sql"]]
+        # token and groups, the serializer name check, the insert and the
+        # prerequesits and sections of the response
+        self.assertEqual(len(queries), 6, queries)
@@ -0,0 +1,185 @@
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from common.admission import admit
+from common.authentication import clear_token_cache
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from user_management.models import User
+
+
+class CourseLogViewTest(APITestCase):
+    """Tests to verify that the course log views work as per expectations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword",
+            groups=[groups["Student"]],
+        )
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword",
+            groups=[groups["Instructor"]],
+        )
+        cls.token = Token.objects.create(user=cls.student)
+        term = models.Term.objects.create(season=1, start_date="2021-03-21")
+        cls.sections = []
+
+        hours = [hour for hour, _ in models.CourseSection.HOURS_OF_THE_DAY]
+        slots = [("Saturday", "Monday", hour) for hour in hours[:5]]
+        slots.append(("Sunday", "Tueseday", hours[0]))
+
+        for idx, (first, second, hour) in enumerate(slots):
+            course = models.Course.objects.create(
+                name=f"Course {idx}", credit=3
+            )
+            cls.sections.append(
+                models.CourseSection.objects.create(
+                    course=course,
+                    term=term,
+                    total_capacity=30,
+                    instructor=cls.instructor,
+                    first_session_weekday=first,
+                    second_session_weekday=second,
+                    hour_schedule=hour,
+                    exam_date="2021-06-10",
+                )
+            )
+
+        cls.url = reverse("courselog-list")
+
+    def setUp(self):
+        clear_token_cache()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def _count_role_queries(self, data):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data, format="json")
+
+        queries = [q["sql"] for q in ctx.captured_queries
+                   if '"auth_group"' in q["sql"]]
+        return response, queries
+
+    def test_post_resolves_roles_once(self):
+        data = [{"section": section.pk} for section in self.sections]
+        response, queries = self._count_role_queries(data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED,
+                         response.data)
+        self.assertEqual(len(queries), 1, queries)
+
+    def test_post_with_student_resolves_roles_once(self):
+        data = [{"section": section.pk, "student": self.student.pk}
+                for section in self.sections]
+        response, queries = self._count_role_queries(data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED,
+                         response.data)
+        self.assertEqual(len(queries), 1, queries)
+
+    def test_group_change_clears_cached_roles(self):
+        self.assertEqual(self.instructor.get_group_names(),
+                         frozenset(["Instructor"]))
+        groups = create_role_groups()
+        self.instructor.process_groups([groups["Staff"]])
+        self.assertEqual(self.instructor.get_group_names(),
+                         frozenset(["Staff"]))
+        self.instructor.groups.add(groups["Instructor"])
+        self.assertEqual(self.instructor.get_group_names(),
+                         frozenset(["Staff", "Instructor"]))
+
+    def test_bulk_post_query_count(self):
+        # token, roles, sections, eligibility (3), locked sections,
+        # counters, insert and the savepoints around them. The token and
+        # roles are cached after the first request.
+        for sections, num in ((self.sections[:1], 9),
+                              (self.sections[1:], 7)):
+            data = [{"section": section.pk} for section in sections]
+
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url, data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED,
+                             response.data)
+            self.assertEqual(len(response.data), len(sections))
+            queries = [q["sql"] for q in ctx.captured_queries
+                       if "SAVEPOINT" not in q["sql"]]
+            self.assertEqual(len(queries), num, queries)
+
+        self.assertEqual(
+            models.CourseLog.objects.filter(student=self.student).count(), 6
+        )
+        self.assertEqual(
+            sorted(models.CourseSection.objects.filter(
+                pk__in=[section.pk for section in self.sections]
+            ).values_list("filled_capacity", flat=True)),
+            [1] * 6,
+        )
+
+    def test_reserve_seats_is_all_or_nothing(self):
+        first, last = self.sections[0], self.sections[-1]
+        models.CourseSection.objects.filter(pk=last.pk).update(
+            total_capacity=1
+        )
+
+        with self.assertRaises(ValidationError):
+            models.CourseSection.objects.reserve_seats(
+                {first.pk: 1, last.pk: 2}
+            )
+
+        self.assertEqual(
+            list(models.CourseSection.objects.filter(
+                pk__in=[first.pk, last.pk]
+            ).values_list("filled_capacity", flat=True)),
+            [0, 0],
+        )
+
+    @override_settings(
+        ADMISSION_QUEUES={"enrollment": {"limit": 1, "queue_size": 0}}
+    )
+    def test_enrollment_admission(self):
+        data = [{"section": self.sections[0].pk}]
+
+        # Another enrollment of this worker is running.
+        with admit("enrollment"):
+            response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(models.CourseLog.objects.count(), 0)
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        url = reverse("admission-stats")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        staff = User.members.create_user(
+            username="staff", password="testpassword"
+        )
+        staff.groups.set([Group.objects.get(name="Staff")])
+        self.client.force_authenticate(staff)
+        stats = self.client.get(url).data["queues"]["enrollment"]
+        self.assertEqual((stats["admitted"], stats["rejected"]), (2, 1))
+        self.assertEqual(stats["active"], 0)
+
+    def test_student_enrolls_only_self(self):
+        other = User.members.create_user(
+            username="other", password="testpassword"
+        )
+        data = [{"section": self.sections[0].pk, "student": other.pk}]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(models.CourseLog.objects.exists())
+
+        data[0]["student"] = self.student.pk
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
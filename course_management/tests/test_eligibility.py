@@ -0,0 +1,152 @@
+from django.contrib.auth.models import Group
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.eligibility import EnrollmentEligibility
+from user_management.models import User
+
+
+class EligibilityTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword",
+            groups=[groups["Student"]],
+        )
+        cls.token = Token.objects.create(user=cls.student)
+        instructor = User.members.create_user(
+            username="instructor", password="testpassword",
+            groups=[groups["Instructor"]],
+        )
+        cls.past_term = models.Term.objects.create(
+            season=3, start_date="2020-09-23"
+        )
+        cls.term = models.Term.objects.create(season=1, start_date="2021-03-21")
+        create = models.Course.objects.create
+        cls.calculus = create(name="Calculus", credit=4)
+        cls.physics = create(name="Physics", credit=4)
+        cls.dynamics = create(name="Dynamics", credit=4)
+        cls.dynamics.process_prerequesits([cls.physics])
+        cls.courses = [create(name=f"Elective {idx}", credit=4)
+                       for idx in range(4)]
+
+        def section(course, term, hours, weekday="Saturday", capacity=30):
+            return models.CourseSection.objects.create(
+                course=course,
+                term=term,
+                total_capacity=capacity,
+                instructor=instructor,
+                first_session_weekday=weekday,
+                second_session_weekday="Monday",
+                hour_schedule=hours,
+                exam_date="2021-06-10",
+            )
+
+        passed = section(cls.calculus, cls.past_term, "8-10")
+        models.CourseLog.objects.create(
+            student=cls.student, section=passed, final_grade=15,
+            status=models.CourseLog.APPROVED,
+        )
+        cls.physics_section = section(cls.physics, cls.term, "8-10")
+        cls.dynamics_section = section(cls.dynamics, cls.term, "10-12")
+        cls.clashing = section(cls.courses[0], cls.term, "8-10", "Wednesday")
+        cls.full = section(cls.courses[1], cls.term, "2-4", capacity=0)
+        cls.electives = [
+            section(course, cls.term, hours)
+            for course, hours in zip(cls.courses[2:], ("2-4", "4-6"))
+        ]
+        cls.extra = section(cls.calculus, cls.term, "6-8")
+
+    def _reasons(self, sections):
+        results = EnrollmentEligibility(self.student, sections).check()
+        return [sorted(result["reasons"]) for result in results]
+
+    def test_reasons(self):
+        sections = [
+            self.physics_section,
+            self.dynamics_section,
+            self.clashing,
+            self.full,
+            self.physics_section,
+            0,
+        ]
+        self.assertEqual(
+            self._reasons(sections),
+            [
+                [],
+                ["prerequesits"],
+                ["schedule_clash"],
+                ["capacity"],
+                ["duplicate", "schedule_clash"],
+                ["not_found"],
+            ],
+        )
+
+    def test_credit_limit(self):
+        sections = [self.physics_section, *self.electives, self.extra,
+                    self.dynamics_section]
+        self.assertEqual(
+            self._reasons(sections),
+            [[], [], [], [], ["credit_limit", "prerequesits"]],
+        )
+
+    def test_constant_queries(self):
+        for sections in ([self.physics_section],
+                         [self.physics_section, *self.electives, self.full]):
+            with self.subTest(size=len(sections)), self.assertNumQueries(3):
+                EnrollmentEligibility(self.student, sections).check()
+
+    def test_dry_run_endpoint(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        url = reverse("courselog-eligibility")
+        data = {"sections": [self.physics_section.pk, self.full.pk]}
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["eligible"])
+        self.assertEqual(
+            [result["accepted"] for result in response.data["results"]],
+            [True, False],
+        )
+        self.assertFalse(models.CourseLog.objects.filter(
+            section=self.physics_section).exists())
+
+    def test_enrollment_uses_eligibility(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        url = reverse("courselog-list")
+        data = [{"section": self.physics_section.pk},
+                {"section": self.clashing.pk}]
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data["eligibility"]),
+                         [str(self.clashing.pk)])
+        self.assertIn("schedule_clash",
+                      response.data["eligibility"][str(self.clashing.pk)])
+
+        response = self.client.post(url, data[:1], format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["student"], self.student.pk)
+
+    def test_dry_run_of_another_student(self):
+        other = User.members.create_user(
+            username="other", password="testpassword"
+        )
+        url = reverse("courselog-eligibility")
+        data = {"student": other.pk, "sections": [self.physics_section.pk]}
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.members.create_user(
+            username="staff", password="testpassword"
+        )
+        staff.groups.set([Group.objects.get(name="Staff")])
+        self.client.force_authenticate(staff)
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["eligible"])
@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from common import generate_public_keys
+from common.authentication import clear_token_cache
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.serializers import ListGradeEntrySerializer
+from user_management.models import User
+
+
+def create_graded_section(instructor, size):
+    """
+    Create a section with *size* enrolled students and return their logs.
+    """
+    course = models.Course.objects.create(name=f"Course {size}", credit=3)
+    term = models.Term.objects.create(season=1, start_date="2021-03-21")
+    section = models.CourseSection.objects.create(
+        course=course,
+        term=term,
+        total_capacity=size,
+        instructor=instructor,
+        first_session_weekday="Saturday",
+        second_session_weekday="Monday",
+        hour_schedule="8-10",
+        exam_date="2021-06-10",
+    )
+    students = User.objects.bulk_create(
+        User(username=f"student{size}-{idx}", public_id=public_id)
+        for idx, public_id in enumerate(
+            generate_public_keys(size, User.PUBLIC_ID_SCHEME)
+        )
+    )
+    models.CourseSection.objects.filter(pk=section.pk).update(
+        filled_capacity=size
+    )
+    public_ids = generate_public_keys(
+        size, models.CourseLog.PUBLIC_ID_SCHEME
+    )
+    return models.CourseLog.objects.bulk_create(
+        models.CourseLog(public_id=public_id, student=student, section=section)
+        for student, public_id in zip(students, public_ids)
+    )
+
+
+class GradeEntryTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.user = User.members.create_superuser(
+            username="admin", email=None, password="testpassword"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.logs = create_graded_section(cls.user, 5)
+        cls.url = reverse("courselog-bulk_update")
+
+    def setUp(self):
+        clear_token_cache()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def _grades(self, log):
+        log.refresh_from_db()
+        return [getattr(log, field)
+                for field in models.CourseLog.GRADE_FIELDS]
+
+    def test_reports_missing_and_rejected(self):
+        first, second, third = self.logs[:3]
+        data = [
+            {"public_id": first.public_id, "final_grade": 0,
+             "status": models.CourseLog.APPROVED},
+            {"public_id": second.public_id, "midterm_exam": 12},
+            {"public_id": third.public_id, "final_grade": 25},
+            {"public_id": second.public_id, "midterm_exam": 3},
+            {"public_id": "missing", "final_grade": 12},
+            {"final_grade": 12},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK,
+                         response.data)
+        self.assertEqual(
+            sorted(item["public_id"] for item in response.data["results"]),
+            sorted([first.public_id, second.public_id]),
+        )
+        self.assertEqual(response.data["missing"], ["missing"])
+        self.assertEqual(sorted(response.data["rejected"]),
+                         sorted([second.public_id, third.public_id, "5"]))
+        self.assertEqual(response.data["rejected_count"], 3)
+        self.assertEqual(self._grades(first),
+                         [None, None, 0, models.CourseLog.APPROVED])
+        self.assertEqual(self._grades(second),
+                         [12, None, None, "Unavailable"])
+        self.assertEqual(self._grades(third),
+                         [None, None, None, "Unavailable"])
+
+    @mock.patch.object(ListGradeEntrySerializer, "max_rejected", 2)
+    def test_rejected_capped(self):
+        data = [{"public_id": log.public_id, "final_grade": 25}
+                for log in self.logs[:4]]
+        response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(len(response.data["rejected"]), 2)
+        self.assertEqual(response.data["rejected_count"], 4)
+
+    def test_not_a_list(self):
+        response = self.client.patch(self.url, {"final_grade": 12},
+                                     format="json")
+        self.assertEqual(response.status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_constant_queries(self):
+        # Caches the token.
+        self.client.patch(self.url, [], format="json")
+
+        for logs in (self.logs[:1], self.logs):
+            data = [{"public_id": log.public_id, "final_grade": 15}
+                    for log in logs]
+
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.patch(self.url, data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # course logs, bulk update
+            queries = [q["sql"] for q in ctx.captured_queries
+                       if "SAVEPOINT" not in q["sql"]]
+            self.assertEqual(len(queries), 2, queries)
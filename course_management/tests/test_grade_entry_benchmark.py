@@ -0,0 +1,58 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from common.tests.base_tests import (
+    best_time, create_role_groups, run_benchmarks)
+from course_management.tests.test_grade_entry import create_graded_section
+from user_management.models import User
+
+
+@run_benchmarks
+class GradeEntryBenchmark(APITestCase):
+    """
+    Latency of entering the grades of a whole section.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        course_management.tests.test_grade_entry_benchmark
+    """
+    SIZES = (50, 300, 1000)
+
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.user = User.members.create_superuser(
+            username="admin", email=None, password="testpassword"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.logs = {size: create_graded_section(cls.user, size)
+                    for size in cls.SIZES}
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def test_grade_entry(self):
+        url = reverse("courselog-bulk_update")
+        print()
+
+        for size in self.SIZES:
+            grades = iter(range(10**6))
+
+            def enter_grades():
+                data = [{"public_id": log.public_id,
+                         "final_grade": next(grades) % 21}
+                        for log in self.logs[size]]
+                response = self.client.patch(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            with CaptureQueriesContext(connection) as ctx:
+                enter_grades()
+
+            # Read before timing, every request resets the query log.
+            queries = len(ctx.captured_queries)
+            print(f"{size:>5} rows: {best_time(enter_grades):8.1f} ms, "
+                  f"{queries} queries")
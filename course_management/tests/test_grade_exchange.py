@@ -0,0 +1,210 @@
+import csv
+import io
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+from common.tests.base_tests import create_role_groups
+from course_management import grade_exchange, models
+from course_management.tests.test_grade_entry import create_graded_section
+from user_management.models import User
+
+
+class GradeExchangeTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.user = User.members.create_superuser(
+            username="admin", email=None, password="testpassword"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.logs = create_graded_section(cls.user, 5)
+        cls.section = cls.logs[0].section
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def _final_grades(self):
+        return list(
+            models.CourseLog.objects.filter(
+                pk__in=[log.pk for log in self.logs]
+            )
+            .order_by("pk")
+            .values_list("final_grade", flat=True)
+        )
+
+    def _import(self, body, content_type):
+        return self.client.generic(
+            "POST",
+            reverse("courselog-import"),
+            body.encode(),
+            content_type=content_type,
+        )
+
+    def test_csv_import(self):
+        first, second, third = self.logs[:3]
+        body = (
+            "public_id,final_grade,status\r\n"
+            f"{first.public_id},12,Approved\r\n"
+            f"{second.public_id},,\r\n"
+            f"{third.public_id},30,\r\n"
+            "missing,12,\r\n"
+        )
+        response = self._import(body, "text/csv")
+        self.assertEqual(response.status_code, status.HTTP_200_OK,
+                         response.data)
+        self.assertEqual(response.data["applied"], 2)
+        self.assertEqual(
+            [(error["line"], error["public_id"])
+             for error in response.data["errors"]],
+            [(4, third.public_id), (5, "missing")],
+        )
+        self.assertEqual(self._final_grades(), [12, None, None, None, None])
+
+    def test_ndjson_import(self):
+        body = "\n".join(
+            [json.dumps({"public_id": log.public_id, "final_grade": 15})
+             for log in self.logs[:2]]
+            + ["", "not json", "[1]"]
+        )
+        response = self._import(body, "application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK,
+                         response.data)
+        self.assertEqual(response.data["applied"], 2)
+        self.assertEqual(
+            [error["line"] for error in response.data["errors"]], [4, 5]
+        )
+        self.assertEqual(self._final_grades(), [15, 15, None, None, None])
+
+    def test_unsupported_media_type(self):
+        response = self._import("{}", "application/json")
+        self.assertEqual(response.status_code,
+                         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_import_in_chunks(self):
+        rows = (
+            (idx, {"public_id": log.public_id, "final_grade": idx}, None)
+            for idx, log in enumerate(self.logs, 1)
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            grade_import = grade_exchange.GradeImport(chunk_size=2).run(rows)
+
+        self.assertEqual(
+            grade_import.report(),
+            {"applied": 5, "errors": [], "error_count": 0},
+        )
+        self.assertEqual(self._final_grades(), [1, 2, 3, 4, 5])
+        # One select and one update per chunk.
+        updates = [q for q in ctx.captured_queries
+                   if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 3)
+
+    def test_repeated_rows_rejected(self):
+        first, second = self.logs[:2]
+        rows = [
+            (1, {"public_id": first.public_id, "final_grade": 30}, None),
+            (2, {"public_id": first.public_id, "final_grade": 11}, None),
+            (3, {"public_id": second.public_id, "final_grade": 12}, None),
+            (4, {"public_id": first.public_id, "final_grade": 13}, None),
+            (5, {"public_id": second.public_id, "final_grade": 14}, None),
+        ]
+        # Across chunks too.
+        report = grade_exchange.GradeImport(chunk_size=1).run(rows).report()
+        self.assertEqual(report["applied"], 2)
+        self.assertEqual(
+            [error["line"] for error in report["errors"]], [1, 4, 5]
+        )
+        self.assertEqual(self._final_grades(), [11, 12, None, None, None])
+
+    def test_errors_capped(self):
+        rows = ((idx, None, "broken") for idx in range(1, 8))
+        grade_import = grade_exchange.GradeImport(max_errors=3).run(rows)
+        self.assertEqual(
+            [error["line"] for error in grade_import.errors], [1, 2, 3]
+        )
+        self.assertEqual(grade_import.error_count, 7)
+
+    def test_export_section(self):
+        models.CourseLog.objects.filter(pk=self.logs[0].pk).update(
+            final_grade=17
+        )
+        url = reverse("coursesection-grades",
+                      kwargs={"public_id": self.section.public_id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        text = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual([row["public_id"] for row in rows],
+                         [log.public_id for log in self.logs])
+        self.assertEqual(rows[0]["final_grade"], "17")
+        self.assertEqual(rows[1]["final_grade"], "")
+
+        response = self.client.get(url, {"format": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])["final_grade"], 17)
+        self.assertEqual(len(lines), len(self.logs))
+
+    def test_export_term(self):
+        url = reverse("term-grades",
+                      kwargs={"public_id": self.section.term.public_id})
+        response = self.client.get(url)
+        text = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(text.splitlines()), len(self.logs) + 1)
+
+        url = reverse("term-grades", kwargs={"public_id": "missing"})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_limited_to_own_sections(self):
+        instructor = User.members.create_user(
+            username="instructor", email=None, password="testpassword"
+        )
+        instructor.groups.set([create_role_groups()["Instructor"]])
+        own_logs = create_graded_section(instructor, 2)
+        self.client.force_authenticate(user=instructor)
+
+        url = reverse("coursesection-grades",
+                      kwargs={"public_id": self.section.public_id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        url = reverse("coursesection-grades",
+                      kwargs={"public_id": own_logs[0].section.public_id})
+        response = self.client.get(url)
+        text = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(text.splitlines()), len(own_logs) + 1)
+
+        # Only the header of a term of sections others teach.
+        url = reverse("term-grades",
+                      kwargs={"public_id": self.section.term.public_id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        text = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(text.splitlines()), 1)
+
+    def test_commands_round_trip(self):
+        out = io.StringIO()
+        call_command("export_grades", section=self.section.public_id,
+                     stdout=out)
+        sheet = out.getvalue().replace(",,,Unavailable", ",,9,Approved")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as sheet_file:
+            sheet_file.write(sheet)
+            sheet_file.flush()
+            out = io.StringIO()
+            call_command("import_grades", sheet_file.name, chunk_size=2,
+                         stdout=out, stderr=io.StringIO())
+
+        self.assertIn("Applied 5 row(s), rejected 0.", out.getvalue())
+        self.assertEqual(self._final_grades(), [9] * 5)
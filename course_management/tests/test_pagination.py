@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.pagination import KeysetPagination
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+
+class KeysetPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.admin = User.members.create_superuser(
+            username="admin", password="testpassword", email="a@example.com"
+        )
+        term = models.Term.objects.create(season=3, start_date="2021-09-23")
+        # Created out of name order, several sections per course.
+        for name in ("Databases", "Algebra", "Compilers"):
+            course = models.Course.objects.create(name=name, credit=3)
+
+            for idx in range(4):
+                create_section(course, term, cls.admin)
+
+        for idx in range(7):
+            User.members.create_user(
+                username=f"user{idx}",
+                password="testpassword",
+                last_name=("Karimi", "Ahmadi")[idx % 2],
+            )
+
+    def setUp(self):
+        # Counts are cached under model versions the rollbacks leave behind.
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url, params):
+        pages, response = [], self.client.get(url, params)
+
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data["results"])
+
+            if not response.data["next"]:
+                return pages
+
+            response = self.client.get(response.data["next"])
+
+    def test_walks_sections_in_keyset_order(self):
+        url = reverse("coursesection-list")
+        pages = self.walk(url, {"cursor": "", "limit": 5})
+        expected = list(models.CourseSection.objects.order_by(
+            "course_id", "id").values_list("public_id", flat=True))
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertEqual(
+            [row["public_id"] for page in pages for row in page], expected
+        )
+
+    def test_walks_users_in_keyset_order(self):
+        url = reverse("user-list")
+        pages = self.walk(url, {"cursor": "", "limit": 3})
+        expected = list(User.objects.order_by(
+            "last_name", "username", "id").values_list("public_id", flat=True))
+
+        self.assertEqual(
+            [row["public_id"] for page in pages for row in page], expected
+        )
+
+    def test_deep_page_skips_offset_and_count(self):
+        url = reverse("coursesection-list")
+        first = self.client.get(url, {"cursor": "", "limit": 5})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(first.data["next"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_optional_count(self):
+        response = self.client.get(
+            reverse("coursesection-list"), {"cursor": "", "count": "1"}
+        )
+        self.assertEqual(response.data["count"], 12)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse("coursesection-list"), {"cursor": "bm90IGpzb24"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        pagination = KeysetPagination()
+
+        for position in (["a", "x"], [1, {"id": 1}], [None, []]):
+            with self.subTest(position=position):
+                response = self.client.get(
+                    reverse("coursesection-list"),
+                    {"cursor": pagination.encode_cursor(position)},
+                )
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_limit_offset_without_cursor(self):
+        response = self.client.get(
+            reverse("coursesection-list"), {"limit": 5, "offset": 10}
+        )
+        self.assertEqual(response.data["count"], 12)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["next"])
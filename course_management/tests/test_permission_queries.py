@@ -0,0 +1,39 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.tests.base_tests import create_role_groups
+from common.view_mixins import PERMISSION_DB_HITS_HEADER
+from user_management.models import User
+
+
+@override_settings(DEBUG=True)
+class PermissionQueriesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        cls.student.groups.add(groups["Student"])
+        cls.url = reverse("course-list")
+
+    def setUp(self):
+        self.client.force_authenticate(self.student)
+
+    def test_read_skips_role_checks(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response[PERMISSION_DB_HITS_HEADER], "0")
+
+    def test_roles_read_once(self):
+        response = self.client.post(self.url, {"name": "Optics", "credit": 3})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response[PERMISSION_DB_HITS_HEADER], "1")
+
+    @override_settings(DEBUG=False)
+    def test_no_header_without_debug(self):
+        response = self.client.get(self.url)
+        self.assertNotIn(PERMISSION_DB_HITS_HEADER, response)
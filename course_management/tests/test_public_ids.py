@@ -0,0 +1,60 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from common import generate_public_keys
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.management.commands.regenerate_public_ids import (
+    is_sortable_key,
+)
+from course_management.tests.test_grade_entry import create_graded_section
+from user_management.models import User
+
+
+class PublicIdSchemeTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.logs = create_graded_section(instructor, 5)
+        # Rows created before course logs switched to sortable keys.
+        for log, key in zip(cls.logs[:3], generate_public_keys(3)):
+            models.CourseLog.objects.filter(pk=log.pk).update(public_id=key)
+
+    def test_new_rows_use_the_model_scheme(self):
+        log = models.CourseLog.objects.order_by("pk").last()
+        self.assertTrue(is_sortable_key(log.public_id))
+        course = models.Course.objects.get()
+        self.assertFalse(is_sortable_key(course.public_id))
+
+    def test_regenerate_public_ids(self):
+        out = StringIO()
+        call_command("regenerate_public_ids", "course_management.CourseLog",
+                     dry_run=True, stdout=out)
+        self.assertIn("Would rewrite 3", out.getvalue())
+
+        untouched = dict(models.CourseLog.objects.filter(
+            pk__in=[log.pk for log in self.logs[3:]]
+        ).values_list("pk", "public_id"))
+        call_command("regenerate_public_ids", "course_management.CourseLog",
+                     batch_size=2, stdout=out)
+        keys = dict(models.CourseLog.objects.values_list("pk", "public_id"))
+        self.assertTrue(all(is_sortable_key(key) for key in keys.values()))
+        self.assertEqual({pk: keys[pk] for pk in untouched}, untouched)
+        rewritten = [keys[log.pk] for log in self.logs[:3]]
+        self.assertEqual(rewritten, sorted(rewritten))
+
+        out = StringIO()
+        call_command("regenerate_public_ids", "course_management.CourseLog",
+                     stdout=out)
+        self.assertIn("Rewrote 0", out.getvalue())
+
+    def test_random_models_are_refused(self):
+        with self.assertRaises(CommandError):
+            call_command("regenerate_public_ids", "course_management.Course",
+                         stdout=StringIO())
@@ -0,0 +1,141 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+
+class RepresentationCacheTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        cls.student.groups.add(groups["Student"])
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.instructor.groups.add(groups["Instructor"])
+        cls.course = models.Course.objects.create(name="Compilers", credit=3)
+        cls.term = models.Term.objects.create(
+            season=3, start_date="2021-09-23"
+        )
+        cls.section = create_section(cls.course, cls.term, cls.instructor)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.student)
+
+    def get(self, name, **kwargs):
+        return self.client.get(reverse(name, kwargs=kwargs or None)).data
+
+    def results(self, name):
+        return self.get(name)["results"]
+
+    def section_queries(self, name, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.get(name, **kwargs)
+
+        queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if "course_management_coursesection" in query["sql"]
+        ]
+        return data, queries
+
+    def test_hits_skip_prefetch(self):
+        for name in ("course-list", "term-list"):
+            with self.subTest(name=name):
+                data, queries = self.section_queries(name)
+                self.assertTrue(queries)
+                cached, queries = self.section_queries(name)
+                self.assertEqual(queries, [])
+                self.assertEqual(cached["results"], data["results"])
+
+    def test_detail(self):
+        kwargs = {"public_id": self.term.public_id}
+        data, queries = self.section_queries("term-detail", **kwargs)
+        self.assertEqual(data["get_classes"], ["Compilers"])
+        cached, queries = self.section_queries("term-detail", **kwargs)
+        self.assertEqual(queries, [])
+        self.assertEqual(cached, data)
+
+    def test_page_mixes_hits_and_misses(self):
+        self.results("course-list")
+        models.Course.objects.create(name="Automata", credit=2)
+        results = self.results("course-list")
+        self.assertEqual(
+            [course["name"] for course in results], ["Automata", "Compilers"]
+        )
+        self.assertEqual(len(results[1]["sections"]), 1)
+
+    def test_seat_reservation_invalidates(self):
+        self.results("course-list")
+        self.assertTrue(
+            models.CourseSection.objects.reserve_seat(self.section.pk)
+        )
+        section = self.results("course-list")[0]["sections"][0]
+        self.assertEqual(section["filled_capacity"], 1)
+
+    def test_seat_reservation_single_update(self):
+        self.results("course-list")
+        sections = models.CourseSection.objects
+
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                sections.reserve_seat(self.section.pk, self.course.pk)
+            )
+
+        # The course of a loaded section is not looked up either.
+        log = models.CourseLog(student=self.student, section=self.section)
+
+        with CaptureQueriesContext(connection) as ctx:
+            log.save()
+
+        lookup = 'SELECT "course_management_coursesection"."course_id" FROM'
+        self.assertFalse(
+            [q for q in ctx.captured_queries if q["sql"].startswith(lookup)]
+        )
+        section = self.results("course-list")[0]["sections"][0]
+        self.assertEqual(section["filled_capacity"], 2)
+
+    def test_moved_section_invalidates_both_terms(self):
+        other = models.Term.objects.create(season=1, start_date="2022-02-01")
+        self.results("term-list")
+        section = models.CourseSection.objects.get(pk=self.section.pk)
+        section.term = other
+        section.save()
+        classes = {
+            term["public_id"]: term["get_classes"]
+            for term in self.results("term-list")
+        }
+        self.assertEqual(classes[self.term.public_id], "No classes set.")
+        self.assertEqual(classes[other.public_id], ["Compilers"])
+
+    def test_course_rename_invalidates_terms(self):
+        self.results("term-list")
+        self.course.name = "Compiler Design"
+        self.course.save()
+        term = self.results("term-list")[0]
+        self.assertEqual(term["get_classes"], ["Compiler Design"])
+
+    def test_prerequesits_invalidate(self):
+        required = models.Course.objects.create(name="Automata", credit=3)
+        self.results("course-list")
+        self.course.process_prerequesits([required])
+        courses = {
+            course["name"]: course for course in self.results("course-list")
+        }
+        self.assertEqual(courses["Compilers"]["prerequesits"], [required.pk])
+        self.course.prerequesits.clear()
+        courses = {
+            course["name"]: course for course in self.results("course-list")
+        }
+        self.assertEqual(courses["Compilers"]["prerequesits"], [])
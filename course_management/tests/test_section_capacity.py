@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from user_management.models import User
+
+
+class SectionCapacityTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        instructor = User.members.create_user(
+            username="instructor", password="testpassword",
+            groups=[groups["Instructor"]],
+        )
+        cls.students = [
+            User.members.create_user(
+                username=f"student{idx}", password="testpassword",
+                groups=[groups["Student"]],
+            )
+            for idx in range(3)
+        ]
+        course = models.Course.objects.create(name="Compilers", credit=3)
+        term = models.Term.objects.create(season=3, start_date="2021-09-23")
+        cls.sections = [
+            models.CourseSection.objects.create(
+                course=course,
+                term=term,
+                total_capacity=2,
+                instructor=instructor,
+                first_session_weekday="Sunday",
+                second_session_weekday="Tueseday",
+                hour_schedule=hours,
+                exam_date="2022-01-10",
+            )
+            for hours in ("8-10", "10-12")
+        ]
+
+    def _filled(self, section):
+        section.refresh_from_db(fields=["filled_capacity"])
+        return section.filled_capacity
+
+    def test_counter_follows_course_logs(self):
+        section = self.sections[0]
+        log = models.CourseLog.objects.create(
+            student=self.students[0], section=section
+        )
+        self.assertEqual(self._filled(section), 1)
+        log.delete()
+        self.assertEqual(self._filled(section), 0)
+
+    def test_filled_section_rejects_enrollment(self):
+        section = self.sections[0]
+
+        for student in self.students[:2]:
+            models.CourseLog.objects.create(student=student, section=section)
+
+        with self.assertRaises(ValidationError) as cm:
+            models.CourseLog.objects.create(
+                student=self.students[2], section=section
+            )
+
+        self.assertIn("section", cm.exception.message_dict)
+        self.assertEqual(self._filled(section), 2)
+
+    def test_moving_section_moves_seat(self):
+        first, second = self.sections
+        log = models.CourseLog.objects.create(
+            student=self.students[0], section=first
+        )
+        log = models.CourseLog.objects.get(pk=log.pk)
+        log.section = second
+        log.save()
+        self.assertEqual(self._filled(first), 0)
+        self.assertEqual(self._filled(second), 1)
+
+    def test_rebuild_section_counters(self):
+        section = self.sections[0]
+        models.CourseLog.objects.create(
+            student=self.students[0], section=section
+        )
+        models.CourseSection.objects.filter(pk=section.pk).update(
+            filled_capacity=0
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_section_counters", check=True,
+                         stdout=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_section_counters", stdout=out)
+        self.assertIn("1 mismatched", out.getvalue())
+        self.assertEqual(self._filled(section), 1)
+        call_command("rebuild_section_counters", check=True,
+                     stdout=StringIO())
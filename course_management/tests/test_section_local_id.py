@@ -0,0 +1,121 @@
+import threading
+
+from django.core.exceptions import ValidationError
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from user_management.models import User
+
+
+def create_section(course, term, instructor, **kwargs):
+    fields = {
+        "total_capacity": 30,
+        "first_session_weekday": "Saturday",
+        "second_session_weekday": "Monday",
+        "hour_schedule": "8-10",
+        "exam_date": "2021-06-10",
+        **kwargs,
+    }
+    return models.CourseSection.objects.create(
+        course=course, term=term, instructor=instructor, **fields
+    )
+
+
+class SectionLocalIdTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.course = models.Course.objects.create(name="Compilers", credit=3)
+        cls.other = models.Course.objects.create(name="Databases", credit=3)
+        cls.term = models.Term.objects.create(
+            season=3, start_date="2021-09-23"
+        )
+
+    def test_numbers_per_course_and_term(self):
+        sections = [create_section(course, self.term, self.instructor)
+                    for course in (self.course, self.course, self.other,
+                                   self.course)]
+        self.assertEqual([section.local_id for section in sections],
+                         [1, 2, 1, 3])
+
+    def test_update_keeps_number(self):
+        first = create_section(self.course, self.term, self.instructor)
+        create_section(self.course, self.term, self.instructor)
+        first.total_capacity = 40
+
+        with CaptureQueriesContext(connection) as ctx:
+            first.save()
+
+        self.assertFalse([q for q in ctx.captured_queries
+                          if "coursesectionsequence" in q["sql"]])
+        first.refresh_from_db()
+        self.assertEqual(first.local_id, 1)
+
+    def test_moved_section_renumbered(self):
+        create_section(self.other, self.term, self.instructor)
+        section = create_section(self.course, self.term, self.instructor)
+        section = models.CourseSection.objects.get(pk=section.pk)
+        section.course = self.other
+        section.save(update_fields=["course"])
+        section.refresh_from_db()
+        self.assertEqual(section.local_id, 2)
+
+        term = models.Term.objects.create(season=1, start_date="2022-03-21")
+        section.term = term
+        section.save()
+        section.refresh_from_db()
+        self.assertEqual(section.local_id, 1)
+
+    def test_failed_insert_gives_number_back(self):
+        with self.assertRaises(ValidationError):
+            create_section(self.course, self.term, self.instructor,
+                           hour_schedule="midnight")
+
+        section = create_section(self.course, self.term, self.instructor)
+        self.assertEqual(section.local_id, 1)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class SectionLocalIdConcurrencyTestCase(TransactionTestCase):
+    THREADS = 8
+
+    def test_parallel_creates_get_distinct_numbers(self):
+        create_role_groups()
+        instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        course = models.Course.objects.create(name="Compilers", credit=3)
+        term = models.Term.objects.create(season=3, start_date="2021-09-23")
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def create():
+            try:
+                barrier.wait()
+                create_section(course, term, instructor)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=create)
+                   for idx in range(self.THREADS)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(models.CourseSection.objects.values_list(
+                "local_id", flat=True)),
+            list(range(1, self.THREADS + 1)),
+        )
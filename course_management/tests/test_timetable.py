@@ -0,0 +1,230 @@
+from django.db.models import F
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from common.authentication import clear_token_cache
+from common.tests.base_tests import create_role_groups
+from course_management import models
+from course_management.tests.test_section_local_id import create_section
+from user_management.models import User
+
+Section = models.CourseSection
+
+
+class ScheduleMaskTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.term = models.Term.objects.create(
+            season=1, start_date="2021-03-21"
+        )
+        cls.course = models.Course.objects.create(name="Compilers", credit=3)
+
+    def create(self, **kwargs):
+        return create_section(
+            self.course, self.term, self.instructor, **kwargs
+        )
+
+    def mask(self, first, second, hours):
+        return Section.get_slot_bit(first, hours) | Section.get_slot_bit(
+            second, hours
+        )
+
+    def test_saved(self):
+        section = self.create(hour_schedule="2-4")
+        self.assertEqual(
+            section.schedule_mask, self.mask("Saturday", "Monday", "2-4")
+        )
+        self.assertEqual(
+            Section.get_slots(section.schedule_mask),
+            [("Monday", "2-4"), ("Saturday", "2-4")],
+        )
+        section.hour_schedule = "4-6"
+        section.save(update_fields=["hour_schedule"])
+        section.refresh_from_db()
+        self.assertEqual(
+            section.schedule_mask, self.mask("Saturday", "Monday", "4-6")
+        )
+
+    def test_slot_bits_distinct(self):
+        bits = [
+            Section.get_slot_bit(day, slot)
+            for day, label in Section.DAYS_OF_THE_WEEK
+            for slot, label in Section.HOURS_OF_THE_DAY
+        ]
+        self.assertEqual(len(set(bits)), 35)
+        self.assertNotIn(0, bits)
+        self.assertEqual(Section.get_slot_bit("Someday", "8-10"), 0)
+
+    def test_updated(self):
+        section = self.create()
+        sections = Section.objects.filter(pk=section.pk)
+
+        for kwargs, expected in (
+            ({"hour_schedule": "6-8"}, ("Saturday", "Monday", "6-8")),
+            (
+                {"first_session_weekday": "Sunday", "hour_schedule": "8-10"},
+                ("Sunday", "Monday", "8-10"),
+            ),
+            (
+                {"second_session_weekday": F("first_session_weekday")},
+                ("Sunday", "Sunday", "8-10"),
+            ),
+        ):
+            with self.subTest(kwargs=kwargs):
+                sections.update(**kwargs)
+                section.refresh_from_db()
+                self.assertEqual(section.schedule_mask, self.mask(*expected))
+
+    def test_bulk_updated(self):
+        section = self.create()
+        section.first_session_weekday = "Friday"
+        Section.objects.bulk_update([section], ["first_session_weekday"])
+        section.refresh_from_db()
+        self.assertEqual(
+            section.schedule_mask, self.mask("Friday", "Monday", "8-10")
+        )
+
+    def test_clashing(self):
+        section = self.create()
+        self.create(first_session_weekday="Sunday", hour_schedule="2-4")
+        self.assertEqual(
+            list(
+                Section.objects.clashing(Section.get_slot_bit("Monday", "8-10"))
+            ),
+            [section],
+        )
+
+
+class TimetableViewTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = create_role_groups()
+        cls.student = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        cls.other = User.members.create_user(
+            username="other", password="testpassword"
+        )
+        cls.staff = User.members.create_user(
+            username="staff", password="testpassword"
+        )
+        cls.staff.groups.set([groups["Staff"]])
+        cls.instructor = User.members.create_user(
+            username="instructor", password="testpassword"
+        )
+        cls.instructor.groups.set([groups["Instructor"]])
+        cls.admin = User.members.create_superuser(
+            username="admin", email=None, password="testpassword"
+        )
+        cls.past_term = models.Term.objects.create(
+            season=3, start_date="2020-09-23"
+        )
+        cls.term = models.Term.objects.create(
+            season=1, start_date="2021-03-21"
+        )
+        cls.compilers = models.Course.objects.create(
+            name="Compilers", credit=3
+        )
+        cls.automata = models.Course.objects.create(name="Automata", credit=3)
+        cls.section = create_section(cls.compilers, cls.term, cls.instructor)
+        old = create_section(
+            cls.automata, cls.past_term, cls.instructor, hour_schedule="2-4"
+        )
+
+        for section in (cls.section, old):
+            models.CourseLog.objects.create(
+                student=cls.student, section=section
+            )
+
+        cls.url = reverse("timetable")
+
+    def setUp(self):
+        clear_token_cache()
+        self.login(self.student)
+
+    def login(self, user):
+        token, created = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+
+    def test_own_timetable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["term"], self.term.public_id)
+        self.assertEqual(
+            response.data["schedule_mask"], self.section.schedule_mask
+        )
+        week = response.data["timetable"]
+        entry = {"section": self.section.public_id, "course": "Compilers"}
+        self.assertEqual(week["Saturday"]["8-10"], entry)
+        self.assertEqual(week["Monday"]["8-10"], entry)
+        self.assertIsNone(week["Saturday"]["2-4"])
+
+        response = self.client.get(
+            self.url, {"term": self.past_term.public_id}
+        )
+        self.assertEqual(
+            response.data["timetable"]["Monday"]["2-4"]["course"], "Automata"
+        )
+
+    def test_other_student(self):
+        response = self.client.get(self.url, {"student": self.other.pk})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.login(self.staff)
+        response = self.client.get(self.url, {"student": self.student.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["schedule_mask"], self.section.schedule_mask
+        )
+
+    def test_not_found(self):
+        for params in ({"term": "missing"}, {"student": "x"}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_instructor_double_booked(self):
+        self.login(self.admin)
+        data = {
+            "course": self.automata.pk,
+            "term": self.term.pk,
+            "total_capacity": 30,
+            "instructor": self.instructor.pk,
+            "first_session_weekday": "Wednesday",
+            "second_session_weekday": "Monday",
+            "hour_schedule": "8-10",
+            "exam_date": "2021-06-10",
+        }
+        url = reverse("coursesection-list")
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Compilers", str(response.data["instructor"]))
+
+        data["hour_schedule"] = "10-12"
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Moving a section does not clash with itself.
+        url = reverse(
+            "coursesection-detail",
+            kwargs={"public_id": self.section.public_id},
+        )
+        response = self.client.patch(url, {"second_session_weekday": "Sunday"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["schedule_mask"],
+            Section.get_slot_bit("Saturday", "8-10")
+            | Section.get_slot_bit("Sunday", "8-10"),
+        )
+        response = self.client.patch(
+            url, {"second_session_weekday": "Monday", "hour_schedule": "10-12"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
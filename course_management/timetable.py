@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/course_management/timetable.py
+#
+
+"""
+Weekly timetables of students, made from the schedule masks of the
+sections they take.
+"""
+
+from course_management.models import CourseLog, CourseSection
+
+
+def get_timetable(student, term):
+    """
+    Return the schedule mask of the sections *student* takes in *term*,
+    the OR of theirs, and the week it makes: every weekday maps its hours
+    to the section met then, or None.
+    """
+    mask = 0
+    week = {
+        day: {slot: None for slot, label in CourseSection.HOURS_OF_THE_DAY}
+        for day, label in CourseSection.DAYS_OF_THE_WEEK
+    }
+    sections = CourseLog.objects.filter(
+        student=student, section__term=term
+    ).values_list(
+        "section__public_id",
+        "section__course__name",
+        "section__schedule_mask",
+    )
+
+    for public_id, name, section_mask in sections:
+        mask |= section_mask
+
+        for day, slot in CourseSection.get_slots(section_mask):
+            week[day][slot] = {"section": public_id, "course": name}
+
+    return {"schedule_mask": mask, "timetable": week}
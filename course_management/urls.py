@@ -6,7 +6,7 @@
 from django.urls import path, re_path
 from rest_framework.urlpatterns import format_suffix_patterns
 
-from course_management import views
+from course_management import async_views, views
 
 urlpatterns = [
     re_path(r"course/$", views.course_list, name="course-list"),
@@ -15,10 +15,25 @@ urlpatterns = [
         views.course_detail,
         name="course-detail",
     ),
+    re_path(
+        r"course/(?P<public_id>[-\w]+)/prerequisites/$",
+        views.course_prerequesits,
+        name="course-prerequesits",
+    ),
+    re_path(
+        r"course/(?P<public_id>[-\w]+)/unlocks/$",
+        views.course_unlocks,
+        name="course-unlocks",
+    ),
     re_path(r"term/$", views.term_list, name="term-list"),
     re_path(
         r"term/(?P<public_id>[-\w]+)/$", views.term_detail, name="term-detail"
     ),
+    re_path(
+        r"term/(?P<public_id>[-\w]+)/grades/$",
+        views.term_grades,
+        name="term-grades",
+    ),
     re_path(
         r"coursesection/$", views.coursesection_list, name="coursesection-list"
     ),
@@ -27,17 +42,38 @@ urlpatterns = [
         views.coursesection_detail,
         name="coursesection-detail",
     ),
+    re_path(
+        r"coursesection/(?P<public_id>[-\w]+)/grades/$",
+        views.coursesection_grades,
+        name="coursesection-grades",
+    ),
     re_path(
         r"courselog/bulkupdate/$",
         views.courselog_update,
         name="courselog-bulk_update",
     ),
+    re_path(
+        r"courselog/import/$",
+        views.courselog_import,
+        name="courselog-import",
+    ),
+    re_path(
+        r"courselog/eligibility/$",
+        views.courselog_eligibility,
+        name="courselog-eligibility",
+    ),
     re_path(r"courselog/$", views.courselog_list, name="courselog-list"),
     re_path(
         r"courselog/(?P<public_id>[-\w]+)/$",
         views.courselog_detail,
         name="courselog-detail",
     ),
+    re_path(r"timetable/$", views.timetable_detail, name="timetable"),
+    re_path(
+        r"admission/stats/$",
+        views.admission_stats,
+        name="admission-stats",
+    ),
     re_path(r"complain/$", views.complain_create, name="complain-create"),
     re_path(
         r"complain/(?P<section>[-\w]+)/$",
@@ -49,6 +85,29 @@ urlpatterns = [
         views.complain_detail,
         name="complain-detail",
     ),
+    re_path(
+        r"async/course/$",
+        async_views.async_course_list,
+        name="async-course-list",
+    ),
+    re_path(
+        r"async/course/(?P<public_id>[-\w]+)/$",
+        async_views.async_course_detail,
+        name="async-course-detail",
+    ),
+    re_path(
+        r"async/term/$", async_views.async_term_list, name="async-term-list"
+    ),
+    re_path(
+        r"async/coursesection/$",
+        async_views.async_coursesection_list,
+        name="async-coursesection-list",
+    ),
+    re_path(
+        r"async/courselog/mine/$",
+        async_views.async_my_courselog_list,
+        name="async-courselog-mine",
+    ),
     path("test/", views.test, kwargs={"name": "roya"}, name="test"),
 ]
 
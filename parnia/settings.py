@@ -87,6 +87,16 @@ DATABASES = {
     }
 }
 
+# Model and object versions, counts and serialized representations live
+# here. The per-process default only sees the writes of its own process,
+# point it at a shared backend (Redis, Memcached) when running several.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -134,15 +144,48 @@ AUTH_USER_MODEL = "user_management.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "common.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.BasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    # Login attempts, see user_management.throttling.
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "60/min",
+        "login_username": "10/min",
+    },
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.KeysetPagination",
     "PAGE_SIZE": 5,
     #'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
 
+# Seconds a cached row count of a list response is used, see
+# common.counting.
+COUNT_CACHE_TIMEOUT = 30
+
+# Replace outdated password hashes after the login instead of during it,
+# see user_management.rehash.
+PASSWORD_BACKGROUND_REHASH = True
+
+# Seconds and number of tokens the token authentication keeps in every
+# process, and the cache the processes share them in (None to share none),
+# see common.authentication.
+TOKEN_AUTH_CACHE_TIMEOUT = 30
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_SHARED_CACHE = None
+
+# Seconds a serialized course or term is kept, see
+# common.view_mixins.CachedRepresentationMixin.
+REPRESENTATION_CACHE_TIMEOUT = 3600
+
+# Enrollments run at once in every worker process, waiting in line and
+# seconds waited before a 429, see common.admission.
+ADMISSION_QUEUES = {
+    "enrollment": {"limit": 8, "queue_size": 200, "timeout": 10},
+}
+
+# The share of trace events and spans emitted, see common.tracing.
+TRACE_SAMPLE_RATE = 1.0
+
 LOG_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "logs"))
 not os.path.isdir(LOG_DIR) and os.mkdir(LOG_DIR, 0o0775)
 
@@ -176,7 +219,7 @@ LOGGING = {
             "formatter": "simple",
         },
         "omni_file": {
-            "class": "common.loghandlers.DeferredRotatingFileHandler",
+            "class": "common.loghandlers.AsyncRotatingFileHandler",
             "level": "DEBUG",
             "formatter": "verbose",
             "filename": "/dev/null",
@@ -184,7 +227,7 @@ LOGGING = {
             "backupCount": 5,
         },
         "api_file": {
-            "class": "common.loghandlers.DeferredRotatingFileHandler",
+            "class": "common.loghandlers.AsyncRotatingFileHandler",
             "level": "DEBUG",
             "formatter": "verbose",
             "filename": "/dev/null",
@@ -192,13 +235,23 @@ LOGGING = {
             "backupCount": 5,
         },
         "command_file": {
-            "class": "common.loghandlers.DeferredRotatingFileHandler",
+            "class": "common.loghandlers.AsyncRotatingFileHandler",
             "level": "DEBUG",
             "formatter": "verbose",
             "filename": "/dev/null",
             "maxBytes": 50000000,  # 50 Meg bytes
             "backupCount": 5,
         },
+        "trace_file": {
+            "class": "common.loghandlers.AsyncRotatingFileHandler",
+            "level": "DEBUG",
+            "formatter": "verbose",
+            "filename": os.path.join(LOG_DIR, "trace.log"),
+            "maxBytes": 50000000,  # 50 Meg bytes
+            "backupCount": 5,
+            # Tracing may lose events rather than slow requests down.
+            "overflow": "drop_old",
+        },
     },
     "loggers": {
         "django.request": {
@@ -230,6 +283,12 @@ LOGGING = {
             "level": "ERROR",
             "propagate": True,
         },
+        # Set to DEBUG to trace permission checks, validation and saves.
+        "trace": {
+            "handlers": ("trace_file",),
+            "level": "INFO",
+            "propagate": False,
+        },
         "tests": {
             "handlers": (
                 "omni_file",
@@ -9,15 +9,18 @@ User model.
 __docformat__ = "restructuredtext en"
 import logging
 
+from django.conf import settings
 from django.db import models
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
-from common import generate_public_key
+from common import SORTABLE_KEYS, generate_public_key
 from common.model_mixins import ValidateOnSaveMixin
+from user_management.rehash import schedule_rehash
 
 log = logging.getLogger(__name__)
 
@@ -176,6 +179,14 @@ class User(AbstractUser, ValidateOnSaveMixin, models.Model):
         default=NOT_SELECTED,
     )
 
+    # Users are created in volume, time ordered keys keep the index compact.
+    PUBLIC_ID_SCHEME = SORTABLE_KEYS
+
+    # Group names loaded by get_group_names().
+    _group_names = None
+    # The background rehash scheduled by check_password().
+    _rehash = None
+
     members = UserManager()
     staffs = StaffManager()
     instructors = InstructorManager()
@@ -184,7 +195,7 @@ class User(AbstractUser, ValidateOnSaveMixin, models.Model):
     def clean(self):
         # Populate the public_id on record creation only.
         if self.pk is None and not self.public_id:
-            self.public_id = generate_public_key()
+            self.public_id = generate_public_key(self.PUBLIC_ID_SCHEME)
 		    #log.info("Public ID created %s", self.public_id)
 
             # if self.is_superuser:
@@ -202,6 +213,13 @@ class User(AbstractUser, ValidateOnSaveMixin, models.Model):
         )
         verbose_name = _("User")
         verbose_name_plural = _("Users")
+        indexes = [
+            # The keyset ordering of the user list.
+            models.Index(
+                fields=["last_name", "username", "id"],
+                name="user_name_keyset_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.get_full_name_reversed()
@@ -212,10 +230,54 @@ class User(AbstractUser, ValidateOnSaveMixin, models.Model):
     def get_absolute_url(self):
         return reverse("user-detail", args=[self.public_id])
 
+    def check_password(self, raw_password):
+        """
+        Check *raw_password*, with ``PASSWORD_BACKGROUND_REHASH`` an
+        outdated hash is replaced in the background, see
+        user_management.rehash.
+        """
+        if not getattr(settings, "PASSWORD_BACKGROUND_REHASH", False):
+            return super().check_password(raw_password)
+
+        encoded = self.password
+
+        def setter(raw_password):
+            self._rehash = schedule_rehash(self.pk, raw_password, encoded)
+
+        return check_password(raw_password, encoded, setter)
+
+    def finish_rehash(self):
+        """
+        Wait for the background rehash of the checked password, if any, and
+        load the new hash. A session login stores a hash derived from the
+        password hash, it has to be the final one or the session is lost
+        when the rehash lands.
+        """
+        if self._rehash is None:
+            return
+
+        self._rehash.result()
+        self._rehash = None
+        self.refresh_from_db(fields=["password"])
+
     def get_group(self):
-        groups = set(self.groups.values_list("name", flat=True))
+        groups = set(self.get_group_names())
         return groups or "No groups set yet"
 
+    def get_group_names(self):
+        """
+        Return a frozenset of the user's group names. The names are loaded
+        once and kept on the instance until the groups change.
+        """
+        if self._group_names is None:
+            self._group_names = frozenset(
+                self.groups.values_list("name", flat=True)
+            )
+        return self._group_names
+
+    def clear_group_cache(self):
+        self._group_names = None
+
     def process_groups(self, groups):
         """
         This method adds and removes groups to a member.
@@ -223,6 +285,11 @@ class User(AbstractUser, ValidateOnSaveMixin, models.Model):
         """
         group_list = [group.pk for group in groups]
         self.groups.set(group_list)
+        self.clear_group_cache()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.clear_group_cache()
 
     def get_full_name_or_username(self):
         result = self.get_full_name()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/user_management/rehash.py
+#
+"""
+Move stored password hashes to the configured hasher in the background.
+
+Django re-hashes a password checked against an outdated hash (an older
+hasher or fewer iterations) before ``check_password`` returns, doubling
+the cost of that login. With ``PASSWORD_BACKGROUND_REHASH`` on, the new
+hash is made and stored by a thread of the worker instead, once the
+response is on its way.
+
+A session stores a hash derived from the password hash, a session login
+finishes the rehash of its user first, see ``User.finish_rehash``.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections, connection
+
+log = logging.getLogger(__name__)
+
+_executor = None
+_pid = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _pid
+
+    # Threads do not survive a fork, start one in every worker.
+    with _lock:
+        if _pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="password-rehash"
+            )
+            _pid = os.getpid()
+
+    return _executor
+
+
+def _rehash(user_id, raw_password, encoded):
+    close_old_connections()
+
+    try:
+        # Only replaces the hash that was checked, a password changed in
+        # the meantime stays.
+        get_user_model()._default_manager.filter(
+            pk=user_id, password=encoded
+        ).update(password=make_password(raw_password))
+    except Exception:
+        log.exception("Rehashing the password of user %s failed.", user_id)
+    finally:
+        connection.close()
+
+
+def schedule_rehash(user_id, raw_password, encoded):
+    """
+    Replace the hash *encoded* of the user *user_id* with a hash of
+    *raw_password* made with the configured hasher. Return the future of
+    the rehash.
+    """
+    return _get_executor().submit(_rehash, user_id, raw_password, encoded)
+
+
+def wait_for_rehashes():
+    """
+    Wait until the scheduled rehashes are done.
+    """
+    _get_executor().submit(lambda: None).result()
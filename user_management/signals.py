@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/user_management/signals.py
+#
+
+"""
+User Management signal receivers.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from common.authentication import revoke_token, revoke_user
+from common.model_versions import track_model_versions
+
+UserModel = get_user_model()
+
+track_model_versions(UserModel)
+
+
+@receiver(m2m_changed, sender=UserModel.groups.through)
+def clear_group_cache(sender, instance, action, reverse, **kwargs):
+    """
+    Drop the cached group names of a user whose groups were changed.
+    """
+    if action.startswith("post_") and not reverse:
+        instance.clear_group_cache()
+
+
+@receiver(m2m_changed, sender=UserModel.groups.through)
+def revoke_regrouped_users(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drop the cached tokens of the users whose groups were changed.
+    """
+    if action == "pre_clear" and reverse:
+        # The members are gone once cleared.
+        instance._cleared_user_ids = list(
+            instance.user_set.values_list("pk", flat=True)
+        )
+    elif action.startswith("post_"):
+        if not reverse:
+            users = [instance.pk]
+        elif action == "post_clear":
+            users = instance.__dict__.pop("_cleared_user_ids", ())
+        else:
+            users = pk_set
+
+        for user_id in users:
+            revoke_user(user_id)
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def revoke_user_tokens(sender, instance, **kwargs):
+    """
+    Drop the cached tokens of a changed or deleted user.
+    """
+    revoke_user(instance.pk)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def revoke_changed_token(sender, instance, **kwargs):
+    """
+    Drop a changed or deleted token from the token cache.
+    """
+    revoke_token(instance.key)
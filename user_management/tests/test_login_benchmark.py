@@ -0,0 +1,77 @@
+import base64
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from common.tests.base_tests import create_role_groups, run_benchmarks
+from user_management.models import User
+
+
+def basic(credentials):
+    return "Basic " + base64.b64encode(credentials.encode()).decode()
+
+
+@run_benchmarks
+class LoginLoadBenchmark(TestCase):
+    """
+    Logins per second one worker serves with the configured password
+    hasher: students logging in, a brute-force flood on one username that
+    the throttles turn away, and malformed headers.
+
+    RUN_BENCHMARKS=1 python manage.py test \\
+        user_management.tests.test_login_benchmark
+    """
+
+    STUDENTS = 20
+    FLOOD = 2000
+
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        password = make_password("testpassword")
+        cls.usernames = [f"student{idx}" for idx in range(cls.STUDENTS)]
+
+        for username in cls.usernames:
+            user = User.members.create_user(
+                username=username, password="unused"
+            )
+            user.password = password
+            user.save()
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("login")
+
+    def _rate(self, name, headers, status_code):
+        start = time.perf_counter()
+
+        for idx, header in enumerate(headers):
+            response = self.client.post(
+                self.url,
+                HTTP_AUTHORIZATION=header,
+                # Every student from their own address.
+                REMOTE_ADDR=f"10.0.{idx // 250}.{idx % 250}",
+            )
+            self.assertEqual(response.status_code, status_code)
+
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {len(headers) / elapsed:10,.1f} requests/s")
+
+    def test_logins_per_second(self):
+        print()
+        self._rate(
+            "login",
+            [basic(f"{username}:testpassword") for username in self.usernames],
+            200,
+        )
+        headers = [basic(f"student0:guess{idx}") for idx in range(self.FLOOD)]
+
+        # The username throttle lets the first ten guesses through.
+        for header in headers[:10]:
+            self.client.post(self.url, HTTP_AUTHORIZATION=header)
+
+        self._rate("flood", headers[10:], 429)
+        self._rate("malformed", ["Basic !!!!"] * self.FLOOD, 400)
@@ -0,0 +1,141 @@
+import base64
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from common.tests.base_tests import create_role_groups
+from user_management.models import User
+from user_management.rehash import wait_for_rehashes
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def basic(credentials):
+    return "Basic " + base64.b64encode(credentials.encode()).decode()
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoginViewTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_role_groups()
+        cls.user = User.members.create_user(
+            username="student", password="testpassword"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("login")
+
+    def login(self, credentials, **headers):
+        if isinstance(credentials, str):
+            credentials = basic(credentials)
+        return self.client.post(
+            self.url, HTTP_AUTHORIZATION=credentials, **headers
+        )
+
+    def test_login(self):
+        response = self.login("student:testpassword")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["fullname"], "student")
+
+    def test_wrong_password(self):
+        response = self.login("student:wrong")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_credentials_skip_database(self):
+        for header in ("Basic !!!!", "Basic abc", basic("student"), "Bearer x"):
+            with self.subTest(header=header), self.assertNumQueries(0):
+                response = self.login(header)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_username_throttled(self):
+        for idx in range(10):
+            self.login("student:wrong", REMOTE_ADDR=f"10.0.0.{idx}")
+
+        # From any address, before the password is checked.
+        with self.assertNumQueries(0):
+            response = self.login(
+                "student:testpassword", REMOTE_ADDR="10.0.1.1"
+            )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", response)
+        response = self.login("other:testpassword", REMOTE_ADDR="10.0.1.1")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_address_throttled(self):
+        for idx in range(60):
+            self.login(f"user{idx}:wrong")
+
+        response = self.login("student:testpassword")
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        response = self.login("student:testpassword", REMOTE_ADDR="10.0.1.1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ]
+)
+class BackgroundRehashTest(APITransactionTestCase):
+    def setUp(self):
+        create_role_groups()
+        self.user = User.members.create_user(
+            username="student", password="testpassword"
+        )
+        self.user.password = make_password("testpassword", hasher="md5")
+        self.user.save()
+
+    def hasher(self):
+        self.user.refresh_from_db()
+        return self.user.password.partition("$")[0]
+
+    @override_settings(PASSWORD_BACKGROUND_REHASH=True)
+    def test_rehashed_after_check(self):
+        self.assertTrue(self.user.check_password("testpassword"))
+        self.assertTrue(self.user.password.startswith("md5$"))
+        wait_for_rehashes()
+        self.assertEqual(self.hasher(), "pbkdf2_sha256")
+        self.assertTrue(self.user.check_password("testpassword"))
+
+    @override_settings(PASSWORD_BACKGROUND_REHASH=True)
+    def test_session_kept(self):
+        cache.clear()
+        response = self.client.post(
+            reverse("login"), HTTP_AUTHORIZATION=basic("student:testpassword")
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        wait_for_rehashes()
+        self.assertEqual(self.hasher(), "pbkdf2_sha256")
+        response = self.client.get(response.data["href"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(PASSWORD_BACKGROUND_REHASH=True)
+    def test_changed_password_kept(self):
+        encoded = self.user.password
+        self.user.set_password("changed")
+        self.user.save()
+        self.user.password = encoded
+        self.assertTrue(self.user.check_password("testpassword"))
+        wait_for_rehashes()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("changed"))
+
+    @override_settings(PASSWORD_BACKGROUND_REHASH=False)
+    def test_rehashed_during_check(self):
+        self.assertTrue(self.user.check_password("testpassword"))
+        self.assertEqual(self.hasher(), "pbkdf2_sha256")
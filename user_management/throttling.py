@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# parnia/user_management/throttling.py
+#
+"""
+Login throttles. Both run before the credentials are checked, so a flood
+of guesses is turned away before it reaches the password hasher.
+"""
+
+import hashlib
+
+from common.authentication import parse_basic_credentials
+from common.throttling import SlidingWindowThrottle
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    """
+    Limit the login attempts from a client address.
+    """
+
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format.format(
+            scope=self.scope, ident=self.get_ident(request)
+        )
+
+
+class LoginUsernameThrottle(SlidingWindowThrottle):
+    """
+    Limit the login attempts for a username, from any address.
+    """
+
+    scope = "login_username"
+
+    def get_cache_key(self, request, view):
+        credentials = parse_basic_credentials(
+            request.META.get("HTTP_AUTHORIZATION")
+        )
+
+        if credentials is None:
+            return None
+
+        # Usernames may hold characters cache keys can not.
+        ident = hashlib.md5(credentials[0].lower().encode()).hexdigest()
+        return self.cache_format.format(scope=self.scope, ident=ident)
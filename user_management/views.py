@@ -6,9 +6,6 @@
 User Management API Views
 """
 
-import base64
-import re
-import string
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model, login, logout
@@ -31,6 +28,7 @@ from rest_framework.views import APIView
 
 from rest_condition import C, And, Or, Not
 
+from common.authentication import parse_basic_credentials
 from common.permissions import (
     IsAdminSuperUser,
     IsAdministrator,
@@ -42,10 +40,12 @@ from common.permissions import (
     IsSelf,
 )
 from common.view_mixins import (
+    CompiledPermissionsMixin,
     TrapDjangoValidationErrorCreateMixin,
     TrapDjangoValidationErrorUpdateMixin,
 )
 from user_management.serializers import UserSerializer, LoginSerializer
+from user_management.throttling import LoginIPThrottle, LoginUsernameThrottle
 
 UserModel = get_user_model()
 
@@ -67,7 +67,10 @@ class UserMixin:
 
 
 class UserList(
-    TrapDjangoValidationErrorCreateMixin, UserMixin, ListCreateAPIView
+    CompiledPermissionsMixin,
+    TrapDjangoValidationErrorCreateMixin,
+    UserMixin,
+    ListCreateAPIView,
 ):
     """
     User list endpoint.
@@ -83,6 +86,7 @@ class UserList(
             ),
         ),
     )
+    keyset_ordering = ("last_name", "username", "id")
     # filter_backends = (SearchFilter,)
     # search_fields = ('username', 'first_name', 'last_name', 'email',)
     lookup_field = "public_id"
@@ -92,7 +96,10 @@ user_list = UserList.as_view()
 
 
 class UserDetail(
-    TrapDjangoValidationErrorUpdateMixin, UserMixin, RetrieveUpdateAPIView
+    CompiledPermissionsMixin,
+    TrapDjangoValidationErrorUpdateMixin,
+    UserMixin,
+    RetrieveUpdateAPIView,
 ):
     permission_classes = (
         And(
@@ -118,39 +125,36 @@ user_detail = UserDetail.as_view()
 #
 # Login
 #
-class LoginView(GenericAPIView):
+class LoginView(CompiledPermissionsMixin, GenericAPIView):
     """
     Login view. Performs a login on a POST and provides the user's full
     name and the href to the user's endpoint. Credentials are required to
-    login.
+    login. Attempts are throttled per client address and per username
+    before the credentials are checked.
     """
 
     serializer_class = LoginSerializer
+    # BasicAuthentication would check the same credentials a second time,
+    # before the throttles.
+    authentication_classes = ()
     permission_classes = ()
-
-    CHARS = string.ascii_letters + string.digits + "+/="
-    # The regex below will ignore any additional parameters as per RFC7617.
-    RE_SEARCH = re.compile(
-        r"^.*(Basic +)(?P<enc_creds>[{}]+) *.*$".format(CHARS)
-    )
+    throttle_classes = (LoginIPThrottle, LoginUsernameThrottle)
 
     def post(self, request, *args, **kwargs):
-
-        basic = request.META.get("HTTP_AUTHORIZATION")
-        sre = self.RE_SEARCH.search("" if basic is None else basic)
-        enc_creds = sre.group("enc_creds") if sre is not None else ""
+        # Missing or malformed credentials fail validation as missing,
+        # without a query.
+        credentials = parse_basic_credentials(
+            request.META.get("HTTP_AUTHORIZATION")
+        )
         data = {}
 
-        # Parse out the username and password.
-        if len(enc_creds) > 0:
-            creds = base64.b64decode(bytearray(enc_creds, "utf-8")).decode()
-            username, delm, password = creds.partition(":")
-            data["username"] = username
-            data["password"] = password
+        if credentials is not None:
+            data["username"], data["password"] = credentials
 
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data.get("user")
+        user.finish_rehash()
         login(request, user)
         result = {}
         result["fullname"] = user.get_full_name_or_username()
@@ -178,7 +182,7 @@ login_view = LoginView.as_view()
 #
 # Logout
 #
-class LogoutView(APIView):
+class LogoutView(CompiledPermissionsMixin, APIView):
     """
     Logout view. Performs the logout on a POST. No POST data is required
     to logout.